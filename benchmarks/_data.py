@@ -0,0 +1,69 @@
+"""Synthetic, clustered unit vectors shared by the retrieval benchmarks."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+BLOCK = 100_000
+
+
+def clustered_vectors(
+    n: int, dim: int, *, n_clusters: int = 256, noise: float = 0.6, seed: int = 0
+) -> np.ndarray:
+    """Unit vectors drawn around random centres (closer to real embeddings than pure noise)."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    out = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, BLOCK):
+        m = min(BLOCK, n - start)
+        block = centres[rng.integers(0, n_clusters, m)]
+        block += noise * rng.standard_normal((m, dim)).astype(np.float32)
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        out[start : start + m] = block
+    return out
+
+
+def perturbed_queries(vectors: np.ndarray, nq: int, *, noise: float = 0.3, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    q = vectors[rng.integers(0, len(vectors), nq)].copy()
+    q += noise * rng.standard_normal(q.shape).astype(np.float32) / np.sqrt(q.shape[1])
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    return q
+
+
+def exact_topk(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Ground-truth neighbour ids (full sort, float64 accumulate)."""
+    out = np.empty((len(queries), k), dtype=np.int64)
+    for i, q in enumerate(queries.astype(np.float64)):
+        scores = np.asarray(vectors, dtype=np.float64) @ q
+        out[i] = np.argsort(-scores, kind="stable")[:k]
+    return out
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    hits = sum(len(set(f[:k]) & set(t)) for f, t in zip(found, truth, strict=True))
+    return hits / truth.size
+
+
+def timed(fn, *args, repeat: int = 1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn(*args)
+    return out, (time.perf_counter() - t0) / repeat
+
+
+def cache_path(root: Path, n: int, dim: int) -> Path:
+    return root / f"vectors-{n}x{dim}.npy"
+
+
+def cached_vectors(root: Path, n: int, dim: int) -> np.ndarray:
+    """Generate once, then reopen memory-mapped (the same way workers open an index)."""
+    root.mkdir(parents=True, exist_ok=True)
+    path = cache_path(root, n, dim)
+    if not path.exists():
+        np.save(path, clustered_vectors(n, dim))
+    return np.load(path, mmap_mode="r")
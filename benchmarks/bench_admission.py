@@ -0,0 +1,123 @@
+"""
+Admission control under overload: high-priority and probe latency with shedding off vs on.
+
+Builds a synthetic index, then floods /v1/answer (streamed, normal class, caches off)
+from --flood closed-loop clients in-process, far beyond what one process serves
+promptly. While the flood runs, 4 clients alternate /echo (high class) and /health
+(probe) requests, 10ms apart, for --seconds. Flood clients that get 503 wait
+--backoff-ms (Retry-After is at least 1s) before trying again. Runs once with
+admission control off, once on with --answer-slots slots for the normal class.
+
+    python benchmarks/bench_admission.py --flood 400 --answer-slots 16 --seconds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from bench_hybrid import queries_from, zipf_corpus
+from loadtest import AsgiDriver, Sample, Template, _quiet, _wait_ready, summarize
+
+from ai_rag_agent.app.factory import create_app
+from ai_rag_agent.app.settings import AdmissionClass, settings
+from ai_rag_agent.retrieval.chunks import Chunk
+from ai_rag_agent.retrieval.embedder import HashingEmbedder
+from ai_rag_agent.retrieval.service import Retriever
+
+ECHO = Template("echo", "POST", "/echo", json={"message": "ping"})
+HEALTH = Template("health", "GET", "/health")
+
+
+async def _probe(driver: AsgiDriver, until: float, samples: list[Sample]) -> None:
+    while time.perf_counter() < until:
+        for t in (ECHO, HEALTH):
+            t0 = time.perf_counter()
+            status, _ = await driver(t)
+            samples.append(Sample(t.name, status == 200, time.perf_counter() - t0, None))
+            # Think time: in-process calls that never suspend would otherwise hog the loop
+            await asyncio.sleep(0.01)
+
+
+async def _scenario(args, queries: list[str]) -> tuple[dict, float, int]:
+    app = create_app()
+    _quiet()
+    driver = AsgiDriver(app)
+    answers = [
+        Template("answer", "POST", "/v1/answer", {"stream": "true"}, {"query": q}, stream=True)
+        for q in queries
+    ]
+    stop = asyncio.Event()
+    served = shed = 0
+
+    async def flooder(offset: int) -> None:
+        nonlocal served, shed
+        i = offset
+        while not stop.is_set():
+            status, _ = await driver(answers[i % len(answers)])
+            i += args.flood
+            if status == 503:
+                shed += 1
+                await asyncio.sleep(args.backoff_ms / 1000.0)  # Retry-After is >= 1s
+            else:
+                served += 1
+
+    async with app.router.lifespan_context(app):
+        await _wait_ready(app)
+        flood = [asyncio.create_task(flooder(i)) for i in range(args.flood)]
+        await asyncio.sleep(1.0)  # let the backlog build
+        t0, before = time.perf_counter(), served
+        samples: list[Sample] = []
+        await asyncio.gather(*(_probe(driver, t0 + args.seconds, samples) for _ in range(4)))
+        wall = time.perf_counter() - t0
+        answers_per_s = (served - before) / wall
+        stop.set()
+        await asyncio.gather(*flood)
+    return summarize(samples, wall), answers_per_s, shed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--docs", type=int, default=5000)
+    ap.add_argument("--flood", type=int, default=400)
+    ap.add_argument("--answer-slots", type=int, default=16)
+    ap.add_argument("--seconds", type=float, default=5.0, help="probe window under flood")
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--backoff-ms", type=float, default=1000.0)
+    ap.add_argument("--token-delay-ms", type=float, default=5.0)
+    args = ap.parse_args()
+
+    texts = zipf_corpus(args.docs, 20_000)
+    chunks = [Chunk(id=f"doc{i}#0", doc_id=f"doc{i}", text=t) for i, t in enumerate(texts)]
+    index_dir = Path(tempfile.mkdtemp(prefix="rag-bench-")) / "index"
+    Retriever.build(chunks, HashingEmbedder(dim=256)).save(index_dir)
+    settings.index_dir = str(index_dir)
+    # Caches off: every answer embeds and searches in worker threads, which contend with
+    # the event loop for the GIL, so loop latency grows with the answers in flight
+    settings.stream_token_delay_ms = args.token_delay_ms
+    settings.answer_cache_enabled = settings.embed_cache_enabled = False
+    settings.admission_classes = {
+        **settings.admission_classes,
+        "normal": AdmissionClass(concurrency=args.answer_slots, max_queue=args.answer_slots),
+    }
+    queries = queries_from(texts, args.queries)
+
+    print(
+        f"{'admission':<10} {'echo p50':>9} {'echo p99':>9} {'health p99':>11} "
+        f"{'answers/s':>10} {'shed':>6}"
+    )
+    for enabled in (False, True):
+        settings.admission_enabled = enabled
+        stats, answers_per_s, shed = asyncio.run(_scenario(args, queries))
+        echo, health = stats["echo"], stats["health"]
+        print(
+            f"{'on' if enabled else 'off':<10} {echo['p50_ms']:>9.1f} {echo['p99_ms']:>9.1f} "
+            f"{health['p99_ms']:>11.1f} {answers_per_s:>10.1f} {shed:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Recall@10 vs latency: flat (exact) index against IVF-flat at several nprobe values.
+
+Writes a CSV (and a PNG plot when matplotlib is installed) next to --out.
+
+    python benchmarks/bench_ann.py --n 1000000 --nprobe 1 2 4 8 16 32 64 --out ann.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import tempfile
+import time
+from pathlib import Path
+
+from _data import cached_vectors, exact_topk, perturbed_queries, recall_at_k
+
+from ai_rag_agent.retrieval.index import FlatIndex, SearchParams
+from ai_rag_agent.retrieval.ivf import IVFIndex
+from ai_rag_agent.retrieval.service import default_nlist
+
+
+def _measure(index, queries, k: int, params: SearchParams | None):
+    index.search(queries[:1], k, params)  # warm-up / page-in
+    t0 = time.perf_counter()
+    found = [index.search(q, k, params)[1][0] for q in queries]
+    return found, (time.perf_counter() - t0) * 1000 / len(queries)
+
+
+def _plot(rows: list[dict], out: Path) -> None:
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib not installed; skipping plot")
+        return
+    ivf = [r for r in rows if r["index"] == "ivf"]
+    flat = [r for r in rows if r["index"] == "flat"]
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.plot([r["ms_per_query"] for r in ivf], [r["recall"] for r in ivf], "o-", label="ivf")
+    for r in ivf:
+        ax.annotate(f"nprobe={r['nprobe']}", (r["ms_per_query"], r["recall"]), fontsize=7)
+    ax.plot([r["ms_per_query"] for r in flat], [r["recall"] for r in flat], "s", label="flat")
+    ax.set_xscale("log")
+    ax.set_xlabel("latency per query (ms)")
+    ax.set_ylabel("recall@10")
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(out.with_suffix(".png"), dpi=120)
+    print(f"plot: {out.with_suffix('.png')}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--n", type=int, default=1_000_000)
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--nlist", type=int, default=None)
+    ap.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    ap.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "rag-bench")
+    ap.add_argument("--out", type=Path, default=Path("ann.csv"))
+    args = ap.parse_args()
+
+    vectors = cached_vectors(args.data_dir, args.n, args.dim)
+    queries = perturbed_queries(vectors, args.queries)
+    truth = exact_topk(vectors, queries, args.k)
+
+    nlist = args.nlist or default_nlist(args.n)
+    t0 = time.perf_counter()
+    ivf = IVFIndex.build(vectors, nlist)
+    print(f"ivf build: nlist={nlist} in {time.perf_counter() - t0:.1f}s")
+
+    rows = []
+    found, ms = _measure(FlatIndex(vectors), queries, args.k, None)
+    rows.append({"index": "flat", "nprobe": "", "ms_per_query": ms})
+    rows[-1]["recall"] = recall_at_k(found, truth)
+    for nprobe in args.nprobe:
+        found, ms = _measure(ivf, queries, args.k, SearchParams(nprobe=nprobe))
+        rows.append({"index": "ivf", "nprobe": nprobe, "ms_per_query": ms})
+        rows[-1]["recall"] = recall_at_k(found, truth)
+
+    print(f"{'index':<6} {'nprobe':>6} {'ms/query':>9} {'recall@k':>9}")
+    for r in rows:
+        print(f"{r['index']:<6} {r['nprobe']!s:>6} {r['ms_per_query']:>9.3f} {r['recall']:>9.3f}")
+
+    with args.out.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["index", "nprobe", "ms_per_query", "recall"])
+        writer.writeheader()
+        writer.writerows(rows)
+    _plot(rows, args.out)
+
+
+if __name__ == "__main__":
+    main()
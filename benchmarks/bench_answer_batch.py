@@ -0,0 +1,91 @@
+"""
+Batch answer endpoint: throughput of /v1/answer:batch vs /v1/answer one query at a time.
+
+Builds a synthetic index, then answers the same --queries distinct queries (answer
+cache off) through the ASGI app in-process: once as --clients concurrent clients
+calling the single-query endpoint, once as batch requests of --batch-size queries.
+
+    python benchmarks/bench_answer_batch.py --docs 20000 --queries 2000 --batch-size 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import structlog
+from bench_hybrid import queries_from, zipf_corpus
+
+from ai_rag_agent.app.factory import create_app
+from ai_rag_agent.app.settings import settings
+from ai_rag_agent.retrieval.chunks import Chunk
+from ai_rag_agent.retrieval.embedder import HashingEmbedder
+from ai_rag_agent.retrieval.service import Retriever
+
+
+async def _single(client: httpx.AsyncClient, queries: list[str], clients: int) -> float:
+    todo = iter(queries)
+
+    async def worker():
+        for q in todo:
+            r = await client.post("/v1/answer", params={"stream": "false"}, json={"query": q})
+            r.raise_for_status()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(clients)])
+    return time.perf_counter() - t0
+
+
+async def _batched(client: httpx.AsyncClient, queries: list[str], size: int) -> float:
+    t0 = time.perf_counter()
+    for start in range(0, len(queries), size):
+        body = {"queries": [{"query": q} for q in queries[start : start + size]]}
+        async with client.stream("POST", "/v1/answer:batch", json=body) as r:
+            lines = [json.loads(line) async for line in r.aiter_lines() if line]
+        assert not any("error" in line for line in lines)
+    return time.perf_counter() - t0
+
+
+async def _run(args, queries: list[str]) -> None:
+    app = create_app()
+    # create_app logs to stdout; keep per-request access logs out of the report
+    structlog.configure(logger_factory=structlog.PrintLoggerFactory(file=open(os.devnull, "w")))
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await _single(client, queries[:50], args.clients)  # warm up
+        single = await _single(client, queries, args.clients)
+        batched = await _batched(client, queries, args.batch_size)
+    n = len(queries)
+    print(f"{'endpoint':<26} {'queries/s':>10}")
+    print(f"{'/v1/answer':<26} {n / single:>10.0f}")
+    print(f"{'/v1/answer:batch':<26} {n / batched:>10.0f}   ({single / batched:.2f}x)")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--docs", type=int, default=20_000)
+    ap.add_argument("--queries", type=int, default=2_000)
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--batch-size", type=int, default=500)
+    args = ap.parse_args()
+
+    texts = zipf_corpus(args.docs, 20_000)
+    chunks = [Chunk(id=f"doc{i}#0", doc_id=f"doc{i}", text=t) for i, t in enumerate(texts)]
+    index_dir = Path(tempfile.mkdtemp(prefix="rag-bench-")) / "index"
+    Retriever.build(chunks, HashingEmbedder(dim=256)).save(index_dir)
+    settings.index_dir = str(index_dir)
+    settings.answer_cache_enabled = False
+    settings.answer_batch_concurrency = args.clients
+    asyncio.run(_run(args, queries_from(texts, args.queries)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Micro-batching: throughput vs added latency for different batch settings.
+
+A FixedCostBackend (fixed cost per call + cost per item, limited concurrent calls)
+is driven by --callers concurrent clients issuing single-item requests, first
+unbatched and then through MicroBatcher with each (max_batch_size, max_wait_ms) pair.
+
+    python benchmarks/bench_batching.py --requests 4000 --callers 128
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from ai_rag_agent.ext.batch_backend import FixedCostBackend
+from ai_rag_agent.ext.batching import MicroBatcher
+
+
+async def _drive(call, n: int, callers: int) -> dict:
+    latencies: list[float] = []
+    todo = iter(range(n))
+
+    async def client():
+        for i in todo:
+            t0 = time.perf_counter()
+            await call(str(i))
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(callers)])
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "items_per_s": n / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+    }
+
+
+async def _run(args) -> None:
+    print(
+        f"{'batch':>6} {'wait ms':>8} {'items/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'avg batch':>9}"
+    )
+
+    backend = FixedCostBackend(args.call_ms, args.item_ms, args.backend_concurrency)
+    res = await _drive(backend.run_one, args.requests, args.callers)
+    print(
+        f"{'none':>6} {'-':>8} {res['items_per_s']:>9.0f} "
+        f"{res['p50_ms']:>8.2f} {res['p99_ms']:>8.2f} {1:>9.1f}"
+    )
+
+    for size in args.batch_sizes:
+        for wait in args.wait_ms:
+            backend = FixedCostBackend(args.call_ms, args.item_ms, args.backend_concurrency)
+            batcher = MicroBatcher(backend.run_batch, max_batch_size=size, max_wait_ms=wait)
+            res = await _drive(batcher.submit, args.requests, args.callers)
+            await batcher.aclose()
+            print(
+                f"{size:>6} {wait:>8.1f} {res['items_per_s']:>9.0f} {res['p50_ms']:>8.2f} "
+                f"{res['p99_ms']:>8.2f} {backend.items / backend.calls:>9.1f}"
+            )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--requests", type=int, default=4000)
+    ap.add_argument("--callers", type=int, default=128)
+    ap.add_argument("--call-ms", type=float, default=5.0)
+    ap.add_argument("--item-ms", type=float, default=0.1)
+    ap.add_argument("--backend-concurrency", type=int, default=4)
+    ap.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 128])
+    ap.add_argument("--wait-ms", type=float, nargs="+", default=[0.0, 2.0, 10.0])
+    asyncio.run(_run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Context assembly: SimHash dedup + token-budget packing time vs candidate count.
+
+Candidates are synthetic chunks where --dup-ratio of them are light edits of an
+earlier one. Each size is timed cold (fresh assembler: every chunk tokenised and
+signed) and warm (the same chunks again, served from the per-text caches).
+
+    python benchmarks/bench_context.py --sizes 50 100 250 500 --budget 1024
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from ai_rag_agent.retrieval.context import ContextAssembler
+from ai_rag_agent.retrieval.service import Hit
+
+
+def candidates(n: int, *, dup_ratio: float, words: int = 80, seed: int = 0) -> list[Hit]:
+    rng = np.random.default_rng(seed)
+    texts: list[str] = []
+    for _ in range(n):
+        if texts and rng.random() < dup_ratio:
+            toks = texts[rng.integers(0, len(texts))].split()
+            toks[rng.integers(0, len(toks))] = "edited"
+        else:
+            toks = [f"word{w}" for w in rng.zipf(1.3, words) % 20_000]
+        texts.append(" ".join(toks))
+    return [
+        Hit(chunk_id=f"c{i}", doc_id=f"d{i}", text=t, score=1.0 / (i + 1))
+        for i, t in enumerate(texts)
+    ]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 250, 500])
+    ap.add_argument("--budget", type=int, default=1024)
+    ap.add_argument("--max-chunks", type=int, default=None)
+    ap.add_argument("--dup-ratio", type=float, default=0.3)
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    print(
+        f"{'candidates':>10} {'cold ms':>8} {'warm ms':>8} {'packed':>6} "
+        f"{'dups':>5} {'tokens':>6} {'saved':>6}"
+    )
+    for n in args.sizes:
+        hits = candidates(n, dup_ratio=args.dup_ratio)
+        # No chunk cap: the budget alone decides, so every candidate is examined
+        assembler = ContextAssembler(args.budget)
+        t0 = time.perf_counter()
+        assembler.assemble(hits, args.max_chunks)
+        cold = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            ctx = assembler.assemble(hits, args.max_chunks)
+        warm = (time.perf_counter() - t0) / args.repeat
+        print(
+            f"{n:>10} {cold * 1000:>8.2f} {warm * 1000:>8.3f} {len(ctx.hits):>6} "
+            f"{ctx.duplicates:>5} {ctx.tokens:>6} {ctx.tokens_saved:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Upstream HTTP calls: latency with a pooled keep-alive client vs a new client per call.
+
+Serves ext.upstream_stub.StubUpstream (--latency-ms per request) with uvicorn in a
+child process, then makes --calls calls from --concurrency concurrent callers, all
+through measured_call: once opening an httpx.AsyncClient per call (new TCP connection,
+client and SSL context each time), once through the pooled UpstreamClient.
+
+    python benchmarks/bench_http_pool.py --calls 2000 --concurrency 16 --latency-ms 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import statistics
+import time
+
+import httpx
+import uvicorn
+from prometheus_client import REGISTRY
+
+from ai_rag_agent.app.settings import UpstreamConfig
+from ai_rag_agent.ext.http_client import UpstreamClient
+from ai_rag_agent.ext.upstream_stub import StubUpstream
+from ai_rag_agent.resilience.policies import measured_call
+
+TARGET = "bench-upstream"
+
+
+def _serve(sock: socket.socket, latency_ms: float) -> None:
+    config = uvicorn.Config(StubUpstream(latency_ms), log_level="warning", lifespan="off")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+async def _unpooled(base_url: str) -> None:
+    async def one() -> httpx.Response:
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            return await client.post("/embed", json={"texts": ["q"]})
+
+    (await measured_call(TARGET, one())).raise_for_status()
+
+
+async def _run(call, calls: int, concurrency: int) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    todo = iter(range(calls))
+
+    async def caller():
+        for _ in todo:
+            t0 = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - t0
+
+
+def _report(label: str, latencies: list[float], wall: float, conns: str) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+    print(
+        f"{label:<10} {statistics.median(ordered) * 1e3:>8.2f} {p99 * 1e3:>8.2f} "
+        f"{len(latencies) / wall:>9.0f} {conns:>12}"
+    )
+
+
+async def _bench(args, base_url: str) -> None:
+    print(f"{'client':<10} {'p50 ms':>8} {'p99 ms':>8} {'calls/s':>9} {'new conns':>12}")
+    await _run(lambda: _unpooled(base_url), args.concurrency, args.concurrency)  # warm-up
+    lat, wall = await _run(lambda: _unpooled(base_url), args.calls, args.concurrency)
+    _report("unpooled", lat, wall, str(args.calls))
+
+    config = UpstreamConfig(base_url=base_url, max_keepalive_connections=args.concurrency)
+    client = UpstreamClient(TARGET, config)
+
+    async def pooled() -> None:
+        await client.post("/embed", json={"texts": ["q"]}, timeout_s=1.0)
+
+    await _run(pooled, args.concurrency, args.concurrency)
+    opened = REGISTRY.get_sample_value(
+        "upstream_http_connections_opened_total", {"upstream": TARGET}
+    )
+    lat, wall = await _run(pooled, args.calls, args.concurrency)
+    now = REGISTRY.get_sample_value("upstream_http_connections_opened_total", {"upstream": TARGET})
+    _report("pooled", lat, wall, f"{(now or 0) - (opened or 0):.0f}")
+    await client.aclose()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--calls", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--latency-ms", type=float, default=2.0)
+    args = ap.parse_args()
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = multiprocessing.get_context("fork").Process(
+        target=_serve, args=(sock, args.latency_ms), daemon=True
+    )
+    server.start()
+    base_url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+    for _ in range(100):
+        try:
+            httpx.get(f"{base_url}/ping")
+            break
+        except httpx.TransportError:
+            time.sleep(0.05)
+    try:
+        asyncio.run(_bench(args, base_url))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Lexical (BM25) vs vector vs hybrid retrieval: index size and per-query latency.
+
+Builds a synthetic corpus with Zipf-distributed words (so a handful of stop-word-like
+terms have very long posting lists) and times BM25 with and without MaxScore
+pruning, the flat vector index and RRF hybrid search through the Retriever.
+
+    python benchmarks/bench_hybrid.py --docs 100000 --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from ai_rag_agent.retrieval.chunks import Chunk
+from ai_rag_agent.retrieval.embedder import HashingEmbedder
+from ai_rag_agent.retrieval.index import SearchParams
+from ai_rag_agent.retrieval.service import Retriever
+
+
+def zipf_corpus(n: int, vocab: int, *, avg_len: int = 60, seed: int = 0) -> list[str]:
+    rng = np.random.default_rng(seed)
+    p = 1.0 / np.arange(1, vocab + 1)
+    p /= p.sum()
+    lens = rng.poisson(avg_len, n) + 1
+    words = rng.choice(vocab, size=int(lens.sum()), p=p)
+    bounds = np.concatenate([[0], np.cumsum(lens)])
+    return [
+        " ".join(f"w{w}" for w in words[a:b]) for a, b in zip(bounds[:-1], bounds[1:], strict=True)
+    ]
+
+
+def queries_from(texts: list[str], nq: int, *, terms: int = 4, seed: int = 1) -> list[str]:
+    """Queries mixing a few words of a random document (common and rare alike)."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for row in rng.integers(0, len(texts), nq):
+        words = texts[row].split()
+        out.append(" ".join(rng.choice(words, size=min(terms, len(words)), replace=False)))
+    return out
+
+
+def _ms_per_query(fn, queries: list[str]) -> float:
+    t0 = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - t0) / len(queries) * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--docs", type=int, default=100_000)
+    ap.add_argument("--vocab", type=int, default=50_000)
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--queries", type=int, default=200)
+    args = ap.parse_args()
+
+    texts = zipf_corpus(args.docs, args.vocab)
+    chunks = [Chunk(id=f"doc{i}#0", doc_id=f"doc{i}", text=t) for i, t in enumerate(texts)]
+    queries = queries_from(texts, args.queries)
+
+    t0 = time.perf_counter()
+    retriever = Retriever.build(chunks, HashingEmbedder(dim=args.dim))
+    print(f"build: {len(chunks)} docs in {time.perf_counter() - t0:.1f}s")
+
+    bm25 = retriever.lexical
+    assert bm25 is not None
+    tokens = int(np.asarray(bm25.doc_lens).sum())
+    print(
+        f"bm25: {bm25.nbytes / 1e6:.1f} MB, {len(bm25.terms)} terms, "
+        f"{bm25.nbytes / (tokens / 1e6) / 1e6:.2f} MB per million tokens"
+    )
+    print(f"vectors: {retriever.index.vectors.nbytes / 1e6:.1f} MB")
+
+    runs = {
+        "lexical (exhaustive)": lambda q: bm25.search_one(q, args.k, prune=False),
+        "lexical (maxscore)": lambda q: bm25.search_one(q, args.k),
+        "vector": lambda q: retriever.search(q, args.k, SearchParams(mode="vector")),
+        "hybrid (rrf)": lambda q: retriever.search(q, args.k, SearchParams(mode="hybrid")),
+    }
+    print(f"{'mode':<22} {'ms/query':>9}")
+    for label, fn in runs.items():
+        fn(queries[0])  # warm up
+        print(f"{label:<22} {_ms_per_query(fn, queries):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
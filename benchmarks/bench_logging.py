@@ -0,0 +1,107 @@
+"""
+Access logging: per-request cost on the event loop, synchronous print vs queue-backed sink.
+
+Calls observability.access_log.log_access --requests times with the app's processor chain,
+writing to a stream that spends --write-latency-us per write (a backpressured stdout
+pipe). Modes: synchronous PrintLogger + JSONRenderer (the old setup), the background
+QueueLogSink, and the sink with 1% access-log sampling of successful requests.
+
+    python benchmarks/bench_logging.py --requests 20000 --write-latency-us 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import logging
+import time
+
+import structlog
+
+from ai_rag_agent.app.settings import settings
+from ai_rag_agent.observability import access_log
+from ai_rag_agent.observability.log_sink import QueueLoggerFactory, QueueLogSink
+
+SCOPE = {
+    "type": "http",
+    "method": "POST",
+    "path": "/v1/answer",
+    "headers": [(b"user-agent", b"bench/1.0")],
+}
+
+
+class SlowStream(io.StringIO):
+    def __init__(self, latency_us: float) -> None:
+        super().__init__()
+        self.latency_s = latency_us / 1e6
+        self.writes = 0
+
+    def write(self, s: str) -> int:
+        self.writes += 1
+        end = time.perf_counter() + self.latency_s
+        while time.perf_counter() < end:  # a blocked write() holds the caller
+            pass
+        self.seek(0)  # keep memory flat
+        return super().write(s)
+
+
+def _configure(factory, render: bool) -> None:
+    processors = [
+        structlog.contextvars.merge_contextvars,
+        structlog.processors.TimeStamper(fmt="iso", utc=True),
+        structlog.processors.add_log_level,
+        structlog.processors.EventRenamer("message"),
+        structlog.processors.dict_tracebacks,
+    ]
+    if render:
+        processors.append(structlog.processors.JSONRenderer())
+    structlog.configure(
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
+        context_class=dict,
+        logger_factory=factory,
+    )
+    access_log.logger = structlog.get_logger()
+
+
+def _run(n: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(n):
+        access_log.log_access(
+            SCOPE,
+            request_id=f"req-{i}",
+            status_code=200,
+            duration_s=0.012,
+            ttfb_s=0.004,
+            bytes_sent=512,
+        )
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--requests", type=int, default=20_000)
+    ap.add_argument("--write-latency-us", type=float, default=50.0)
+    ap.add_argument("--sample-rate", type=float, default=0.01)
+    args = ap.parse_args()
+
+    print(f"{'mode':<22} {'us/request':>10} {'writes':>8} {'dropped':>8}")
+
+    stream = SlowStream(args.write_latency_us)
+    _configure(structlog.PrintLoggerFactory(file=stream), render=True)
+    us = _run(args.requests)
+    print(f"{'sync print':<22} {us:>10.2f} {stream.writes:>8} {0:>8}")
+
+    sampled = f"queue sink {args.sample_rate:.0%} sampled"
+    for label, rate in (("queue sink", 1.0), (sampled, args.sample_rate)):
+        settings.access_log_sample_rate = rate
+        stream = SlowStream(args.write_latency_us)
+        sink = QueueLogSink(stream, max_lines=args.requests)
+        _configure(QueueLoggerFactory(sink), render=False)
+        us = _run(args.requests)
+        sink.close()
+        print(f"{label:<22} {us:>10.2f} {stream.writes:>8} {sink.dropped:>8}")
+
+
+if __name__ == "__main__":
+    main()
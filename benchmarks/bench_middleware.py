@@ -0,0 +1,134 @@
+"""
+Microbenchmark: pure-ASGI RequestContextMiddleware vs the old two-layer
+BaseHTTPMiddleware stack (RequestIDMiddleware + AccessLogMiddleware).
+
+Drives an in-process FastAPI app through httpx's ASGI transport so only the
+middleware/framework cost is measured (no sockets). Log output goes to /dev/null.
+
+    python benchmarks/bench_middleware.py --requests 5000 --concurrency 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+import httpx
+import structlog
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import StreamingResponse
+
+from ai_rag_agent.app.middleware import RequestContextMiddleware
+
+
+# --- Legacy stack (verbatim behaviour of the replaced middlewares) ---
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        req_id = request.headers.get("x-request-id", str(uuid.uuid4()))
+        structlog.contextvars.bind_contextvars(request_id=req_id)
+        try:
+            response = await call_next(request)
+        finally:
+            structlog.contextvars.clear_contextvars()
+        response.headers["x-request-id"] = req_id
+        return response
+
+
+class LegacyAccessLogMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        duration_ms = (time.perf_counter() - start) * 1000.0
+        structlog.get_logger().info(
+            "http_access",
+            method=request.method,
+            path=request.url.path,
+            status_code=response.status_code,
+            duration_ms=round(duration_ms, 2),
+            user_agent=request.headers.get("user-agent"),
+            request_id=response.headers.get("x-request-id"),
+        )
+        return response
+
+
+def _build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def gen():
+            for _ in range(16):
+                yield b"token "
+
+        return StreamingResponse(gen(), media_type="text/plain")
+
+    if stack == "legacy":
+        app.add_middleware(LegacyRequestIDMiddleware)
+        app.add_middleware(LegacyAccessLogMiddleware)
+    else:
+        app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+async def _run(app: FastAPI, path: str, n: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one():
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.get(path)
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - t0)
+
+        # warm-up
+        await asyncio.gather(*[one() for _ in range(min(200, n))])
+        latencies.clear()
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(n)])
+        wall = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "rps": n / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--requests", type=int, default=3000)
+    ap.add_argument("--concurrency", type=int, default=32)
+    args = ap.parse_args()
+
+    structlog.configure(
+        processors=[structlog.contextvars.merge_contextvars, structlog.processors.JSONRenderer()],
+        logger_factory=structlog.PrintLoggerFactory(file=open(os.devnull, "w")),
+    )
+
+    print(f"{'stack':<8} {'path':<8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for path in ("/ping", "/stream"):
+        for stack in ("legacy", "asgi"):
+            res = asyncio.run(_run(_build_app(stack), path, args.requests, args.concurrency))
+            print(
+                f"{stack:<8} {path:<8} {res['rps']:>9.0f} "
+                f"{res['p50_ms']:>8.2f} {res['p99_ms']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Quantized vector storage: resident memory, latency and recall@k per mode
+(float32 flat, int8 scalar, 1-bit binary), each with full-precision rescoring.
+
+Every mode is saved to disk and then measured in a fresh process that opens it with
+mmap. RSS is split into anon (private to the worker) and file (page cache mapped from
+the index files: shared between workers and reclaimable; note some kernels map whole
+large folios around each rescored row, which inflates this column for sparse reads).
+
+    python benchmarks/bench_quantization.py --n 1000000 --dim 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import tempfile
+import time
+from pathlib import Path
+
+from _data import cached_vectors, exact_topk, perturbed_queries, recall_at_k
+
+from ai_rag_agent.retrieval.index import SearchParams
+from ai_rag_agent.retrieval.service import INDEX_KINDS
+
+MODES = ("flat", "int8", "binary")
+
+
+def _rss_mb() -> dict[str, float]:
+    out = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon:", "RssFile:")):
+                out[line.split(":")[0]] = int(line.split()[1]) / 1024
+    return out
+
+
+def _worker(path: str, mode: str, queries, truth, k: int, rescore: int | None, conn) -> None:
+    before = _rss_mb()
+    index = INDEX_KINDS[mode].load(Path(path), mmap=True)
+    params = SearchParams(rescore=rescore)
+    index.search(queries[:1], k, params)
+    t0 = time.perf_counter()
+    found = [index.search(q, k, params)[1][0] for q in queries]
+    ms = (time.perf_counter() - t0) * 1000 / len(queries)
+    after = _rss_mb()
+    conn.send(
+        {
+            "anon_mb": after["RssAnon"] - before["RssAnon"],
+            "file_mb": after["RssFile"] - before["RssFile"],
+            "ms_per_query": ms,
+            "recall": recall_at_k(found, truth),
+        }
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--n", type=int, default=1_000_000)
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("--rescore", type=int, default=None, help="override k*rescore candidates")
+    ap.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "rag-bench")
+    args = ap.parse_args()
+
+    vectors = cached_vectors(args.data_dir, args.n, args.dim)
+    queries = perturbed_queries(vectors, args.queries)
+    truth = exact_topk(vectors, queries, args.k)
+    ctx = mp.get_context("spawn")
+
+    print(
+        f"{'mode':<7} {'codes MB':>9} {'anon MB':>8} {'file MB':>8} {'ms/query':>9} {'recall@k':>9}"
+    )
+    for mode in MODES:
+        path = args.data_dir / f"index-{mode}-{args.n}x{args.dim}"
+        if not (path / "vectors.npy").exists():
+            path.mkdir(parents=True, exist_ok=True)
+            INDEX_KINDS[mode].build(vectors).save(path)
+        codes = path / ("vectors.npy" if mode == "flat" else "quant.codes.npy")
+
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(
+            target=_worker,
+            args=(str(path), mode, queries, truth, args.k, args.rescore, child),
+        )
+        proc.start()
+        res = parent.recv()
+        proc.join()
+        print(
+            f"{mode:<7} {codes.stat().st_size / 2**20:>9.1f} {res['anon_mb']:>8.1f} "
+            f"{res['file_mb']:>8.1f} {res['ms_per_query']:>9.3f} {res['recall']:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Token streaming: concurrent stream capacity per worker, per-token sends vs coalesced frames.
+
+Runs --streams concurrent streams in one event loop, each generating --tokens tokens at
+--rate tokens/s, through Starlette's StreamingResponse (one ASGI send per token, like
+the old stub) and through TokenStreamResponse. The fake server spends --send-cost-us
+of CPU per send (transport write + syscall). Capacity is estimated as the number of
+streams one core could sustain at that token rate: streams * ideal duration / CPU time.
+
+    python benchmarks/bench_streaming.py --streams 100 500 1000 --rate 50 --tokens 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from starlette.responses import StreamingResponse
+
+from ai_rag_agent.app.streaming import TokenStreamResponse
+
+
+async def _tokens(n: int, delay_s: float):
+    for i in range(n):
+        yield f"tok{i} "
+        await asyncio.sleep(delay_s)
+
+
+def _spin(us: float) -> None:
+    end = time.perf_counter() + us / 1e6
+    while time.perf_counter() < end:
+        pass
+
+
+async def _serve(response, send_cost_us: float) -> int:
+    sends = 0
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal sends
+        if message["type"] == "http.response.body":
+            sends += 1
+            _spin(send_cost_us)
+
+    await response({"type": "http"}, receive, send)
+    return sends
+
+
+def _build(engine: str, n: int, delay_s: float, flush_ms: float):
+    if engine == "per-token":
+
+        async def encoded():
+            async for tok in _tokens(n, delay_s):
+                yield tok.encode()
+
+        return StreamingResponse(encoded(), media_type="text/plain")
+    return TokenStreamResponse(_tokens(n, delay_s), flush_interval_s=flush_ms / 1000.0)
+
+
+async def _run(engine: str, streams: int, args) -> dict:
+    delay_s = 1.0 / args.rate
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    sends = await asyncio.gather(
+        *[
+            _serve(_build(engine, args.tokens, delay_s, args.flush_ms), args.send_cost_us)
+            for _ in range(streams)
+        ]
+    )
+    wall, cpu = time.perf_counter() - t0, time.process_time() - cpu0
+    ideal = args.tokens * delay_s
+    return {
+        "slowdown": wall / ideal,
+        "sends_per_stream": sum(sends) / streams,
+        "cpu_us_per_token": cpu / (streams * args.tokens) * 1e6,
+        "capacity": streams * ideal / cpu,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--streams", type=int, nargs="+", default=[100, 500, 1000])
+    ap.add_argument("--tokens", type=int, default=100)
+    ap.add_argument("--rate", type=float, default=50.0, help="tokens/s per stream")
+    ap.add_argument("--flush-ms", type=float, default=20.0)
+    ap.add_argument("--send-cost-us", type=float, default=15.0)
+    args = ap.parse_args()
+
+    print(
+        f"{'engine':<10} {'streams':>7} {'slowdown':>8} {'sends/stream':>12} "
+        f"{'cpu us/tok':>10} {'capacity':>9}"
+    )
+    for streams in args.streams:
+        for engine in ("per-token", "framed"):
+            r = asyncio.run(_run(engine, streams, args))
+            print(
+                f"{engine:<10} {streams:>7} {r['slowdown']:>8.2f} {r['sends_per_stream']:>12.1f} "
+                f"{r['cpu_us_per_token']:>10.1f} {r['capacity']:>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Flat vector index benchmark: QPS and recall@k at 100k and 1M vectors.
+
+Vectors are generated once into --data-dir and reopened with np.memmap, the same way
+a uvicorn worker opens a saved index. Recall is measured against a float64 full sort.
+
+    python benchmarks/bench_vector_index.py --sizes 100000 1000000 --dim 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from _data import cached_vectors, exact_topk, perturbed_queries, recall_at_k, timed
+
+from ai_rag_agent.retrieval.index import FlatIndex
+
+
+def _search_batches(index, queries, batch: int, nb: int, k: int):
+    return [index.search(queries[i * batch : (i + 1) * batch], k)[1] for i in range(nb)]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--queries", type=int, default=256)
+    ap.add_argument("--batch", type=int, nargs="+", default=[1, 16, 64])
+    ap.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "rag-bench")
+    args = ap.parse_args()
+
+    print(f"{'n':>9} {'batch':>6} {'QPS':>9} {'ms/query':>9} {'recall@k':>9} {'open ms':>8}")
+    for n in args.sizes:
+        t0 = time.perf_counter()
+        vectors = cached_vectors(args.data_dir, n, args.dim)
+        open_ms = (time.perf_counter() - t0) * 1000
+        index = FlatIndex(vectors)
+        queries = perturbed_queries(vectors, args.queries)
+        truth = exact_topk(vectors, queries[:32], args.k)
+        index.search(queries[:1], args.k)  # fault pages in once
+
+        for batch in args.batch:
+            nb = max(1, len(queries) // batch)
+            results, secs = timed(_search_batches, index, queries, batch, nb, args.k)
+            found = [row for ids in results for row in ids][:32]
+            qps = nb * batch / secs
+            print(
+                f"{n:>9} {batch:>6} {qps:>9.0f} {1000 / qps:>9.3f} "
+                f"{recall_at_k(found, truth):>9.3f} {open_ms:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
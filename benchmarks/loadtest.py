@@ -0,0 +1,392 @@
+"""
+Load test: replay a JSONL workload against create_app() and gate on latency regressions.
+
+`run` replays --workload (one request template per line: name, method, path, params,
+json, stream, expect, weight) from --concurrency closed-loop clients, either
+in-process (--driver asgi: the ASGI app called directly, so streamed bodies are timed
+as they are sent) or over uvicorn on localhost in a child process (--driver uvicorn).
+A synthetic index of --docs documents is built first. Per endpoint name it reports
+throughput, p50/p95/p99 latency and, for streams, time to first byte, and with --out
+saves them as JSON.
+
+`compare` checks a results file against a baseline and exits 1 when any endpoint's
+latency grew, or its throughput fell, by more than --tolerance (latency changes under
+--min-delta-ms are ignored as noise), or when its error rate rose.
+
+    python benchmarks/loadtest.py run --driver asgi --requests 2000 --out base.json
+    python benchmarks/loadtest.py run --driver asgi --requests 2000 --out new.json
+    python benchmarks/loadtest.py compare base.json new.json --tolerance 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+
+import httpx
+from bench_hybrid import zipf_corpus
+
+from ai_rag_agent.app.factory import create_app
+from ai_rag_agent.app.settings import settings
+from ai_rag_agent.observability.logging import get_log_sink
+from ai_rag_agent.retrieval.chunks import Chunk
+from ai_rag_agent.retrieval.embedder import HashingEmbedder
+from ai_rag_agent.retrieval.service import Retriever
+
+WORKLOAD = Path(__file__).with_name("workloads") / "api.jsonl"
+LATENCY = ("p50_ms", "p95_ms", "p99_ms")
+
+
+@dataclass
+class Template:
+    name: str
+    method: str
+    path: str
+    params: dict[str, Any] = field(default_factory=dict)
+    json: Any = None
+    stream: bool = False
+    expect: list[int] = field(default_factory=lambda: [200])
+    weight: int = 1
+
+    @property
+    def target(self) -> str:
+        query = urlencode(self.params)
+        return f"{self.path}?{query}" if query else self.path
+
+
+def load_workload(path: Path) -> list[Template]:
+    with path.open() as f:
+        return [Template(**json.loads(line)) for line in f if line.strip()]
+
+
+def schedule(templates: list[Template], n: int, seed: int = 0) -> list[Template]:
+    """``n`` requests in the workload's weighted mix, in a reproducible order."""
+    rng = random.Random(seed)
+    return rng.choices(templates, weights=[t.weight for t in templates], k=n)
+
+
+class AsgiDriver:
+    """Calls the ASGI app directly; TTFB is when the first non-empty body chunk is sent."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, t: Template) -> tuple[int, float | None]:
+        body = b"" if t.json is None else json.dumps(t.json).encode()
+        path, _, query = t.target.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": t.method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", b"loadtest"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("loadtest", 80),
+        }
+        sent = False
+        status = 0
+        ttfb: float | None = None
+        t0 = time.perf_counter()
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.Event().wait()  # the client never disconnects
+
+        async def send(message):
+            nonlocal status, ttfb
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and message.get("body"):
+                if ttfb is None:
+                    ttfb = time.perf_counter() - t0
+
+        await self.app(scope, receive, send)
+        return status, ttfb if t.stream else None
+
+
+class HttpDriver:
+    """Real HTTP over a pooled keep-alive client; TTFB is the first received body chunk."""
+
+    def __init__(self, client: httpx.AsyncClient) -> None:
+        self.client = client
+
+    async def __call__(self, t: Template) -> tuple[int, float | None]:
+        t0 = time.perf_counter()
+        ttfb: float | None = None
+        async with self.client.stream(t.method, t.target, json=t.json) as r:
+            async for chunk in r.aiter_raw():
+                if chunk and ttfb is None:
+                    ttfb = time.perf_counter() - t0
+        return r.status_code, ttfb if t.stream else None
+
+
+@dataclass
+class Sample:
+    name: str
+    ok: bool
+    latency_s: float
+    ttfb_s: float | None
+
+
+async def replay(driver, requests: list[Template], concurrency: int) -> tuple[list[Sample], float]:
+    samples: list[Sample] = []
+    todo = iter(requests)
+
+    async def client() -> None:
+        for t in todo:
+            t0 = time.perf_counter()
+            try:
+                status, ttfb = await driver(t)
+            except Exception:
+                status, ttfb = 0, None
+            samples.append(Sample(t.name, status in t.expect, time.perf_counter() - t0, ttfb))
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return samples, time.perf_counter() - t0
+
+
+def _pct(values: list[float], prefix: str = "") -> dict[str, float]:
+    ordered = sorted(values)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {f"{prefix}{k}": at(q) for k, q in zip(LATENCY, (0.50, 0.95, 0.99), strict=True)}
+
+
+def summarize(samples: list[Sample], wall_s: float) -> dict[str, dict[str, float]]:
+    """Per endpoint name, plus ``_total``: requests, errors, rps and latency percentiles."""
+    groups: dict[str, list[Sample]] = {"_total": samples}
+    for s in samples:
+        groups.setdefault(s.name, []).append(s)
+    out = {}
+    for name, group in sorted(groups.items()):
+        errors = sum(not s.ok for s in group)
+        stats = {
+            "requests": len(group),
+            "errors": errors,
+            "error_rate": round(errors / len(group), 4),
+            "rps": round(len(group) / wall_s, 1),
+            **_pct([s.latency_s for s in group]),
+        }
+        ttfbs = [s.ttfb_s for s in group if s.ttfb_s is not None]
+        if ttfbs:
+            stats.update(_pct(ttfbs, prefix="ttfb_"))
+        out[name] = stats
+    return out
+
+
+def _quiet() -> None:
+    # Access logs are still rendered (part of the cost measured), just not printed
+    get_log_sink().stream = open(os.devnull, "w")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def _wait_ready(app) -> None:
+    while not app.state.readiness.ready:
+        if app.state.readiness.error is not None:
+            raise RuntimeError(f"warm-up failed: {app.state.readiness.error}")
+        await asyncio.sleep(0.05)
+
+
+async def _run_asgi(args, requests: list[Template]):
+    app = create_app()
+    _quiet()
+    driver = AsgiDriver(app)
+    async with app.router.lifespan_context(app):
+        await _wait_ready(app)
+        await replay(driver, requests[: args.warmup], args.concurrency)
+        return await replay(driver, requests[args.warmup :], args.concurrency)
+
+
+def _serve(sock: socket.socket) -> None:
+    import uvicorn
+
+    app = create_app()
+    _quiet()
+    config = uvicorn.Config(app, log_level="warning", access_log=False)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+async def _run_uvicorn(args, requests: list[Template]):
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = multiprocessing.get_context("fork").Process(target=_serve, args=(sock,), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    if (await client.get("/ready")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("server did not become ready")
+                await asyncio.sleep(0.1)
+            driver = HttpDriver(client)
+            await replay(driver, requests[: args.warmup], args.concurrency)
+            return await replay(driver, requests[args.warmup :], args.concurrency)
+    finally:
+        server.terminate()
+        server.join()
+
+
+def _git_rev() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def run(args) -> None:
+    texts = zipf_corpus(args.docs, 20_000)
+    chunks = [Chunk(id=f"doc{i}#0", doc_id=f"doc{i}", text=t) for i, t in enumerate(texts)]
+    index_dir = Path(tempfile.mkdtemp(prefix="rag-loadtest-")) / "index"
+    Retriever.build(chunks, HashingEmbedder(dim=256)).save(index_dir)
+    settings.index_dir = str(index_dir)
+    settings.answer_cache_enabled = args.answer_cache
+    settings.stream_token_delay_ms = args.token_delay_ms
+
+    templates = load_workload(args.workload)
+    requests = schedule(templates, args.warmup + args.requests, seed=args.seed)
+    runner = _run_asgi if args.driver == "asgi" else _run_uvicorn
+    samples, wall = asyncio.run(runner(args, requests))
+    results = {
+        "meta": {
+            "driver": args.driver,
+            "workload": str(args.workload),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "docs": args.docs,
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        },
+        "endpoints": summarize(samples, wall),
+    }
+    _print_results(results["endpoints"])
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2) + "\n")
+
+
+def _print_results(endpoints: dict[str, dict[str, float]]) -> None:
+    print(
+        f"{'endpoint':<16} {'reqs':>6} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'ttfb p50':>9} {'ttfb p99':>9}"
+    )
+    for name, s in endpoints.items():
+        ttfb = f"{s['ttfb_p50_ms']:>9.2f} {s['ttfb_p99_ms']:>9.2f}" if "ttfb_p50_ms" in s else ""
+        print(
+            f"{name:<16} {s['requests']:>6} {s['errors']:>5} {s['rps']:>8.1f} "
+            f"{s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f} {ttfb}"
+        )
+
+
+def regressions(
+    baseline: dict, current: dict, tolerance: float, min_delta_ms: float = 1.0
+) -> list[str]:
+    """Human-readable regressions of ``current`` against ``baseline`` (results files)."""
+    found = []
+    for name, base in baseline["endpoints"].items():
+        new = current["endpoints"].get(name)
+        if new is None:
+            found.append(f"{name}: missing from the current run")
+            continue
+        for metric in (*LATENCY, *(f"ttfb_{m}" for m in LATENCY)):
+            if metric not in base or metric not in new:
+                continue
+            b, n = base[metric], new[metric]
+            if n > b * (1 + tolerance) and n - b > min_delta_ms:
+                found.append(f"{name}: {metric} {b:.2f} -> {n:.2f} (+{(n / b - 1) * 100:.0f}%)")
+        if new["rps"] < base["rps"] * (1 - tolerance):
+            found.append(
+                f"{name}: rps {base['rps']:.1f} -> {new['rps']:.1f} "
+                f"({(new['rps'] / base['rps'] - 1) * 100:.0f}%)"
+            )
+        if new["error_rate"] > base["error_rate"]:
+            found.append(f"{name}: error_rate {base['error_rate']} -> {new['error_rate']}")
+    return found
+
+
+def compare(args) -> None:
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    for key in ("driver", "workload", "concurrency", "docs", "cpus"):
+        was, now = baseline["meta"].get(key), current["meta"].get(key)
+        if was != now:
+            print(f"warning: {key} differs ({was} vs {now})")
+    found = regressions(baseline, current, args.tolerance, args.min_delta_ms)
+    for line in found:
+        print(f"REGRESSION {line}")
+    if found:
+        sys.exit(1)
+    print(f"no regressions beyond {args.tolerance:.0%} in {len(baseline['endpoints'])} endpoints")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    r = sub.add_parser("run", help="replay a workload and report latency")
+    r.add_argument("--workload", type=Path, default=WORKLOAD)
+    r.add_argument("--driver", choices=["asgi", "uvicorn"], default="asgi")
+    r.add_argument("--requests", type=int, default=2000)
+    r.add_argument("--warmup", type=int, default=100)
+    r.add_argument("--concurrency", type=int, default=16)
+    r.add_argument("--docs", type=int, default=5000)
+    r.add_argument("--token-delay-ms", type=float, default=1.0)
+    r.add_argument("--answer-cache", action=argparse.BooleanOptionalAction, default=False)
+    r.add_argument("--seed", type=int, default=0)
+    r.add_argument("--out", help="write results JSON here")
+    r.set_defaults(func=run)
+
+    c = sub.add_parser("compare", help="exit 1 if CURRENT regressed against BASELINE")
+    c.add_argument("baseline")
+    c.add_argument("current")
+    c.add_argument("--tolerance", type=float, default=0.15, help="allowed relative change")
+    c.add_argument("--min-delta-ms", type=float, default=1.0)
+    c.set_defaults(func=compare)
+
+    args = ap.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
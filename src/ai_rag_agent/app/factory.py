@@ -1,29 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 
-from ..observability.access_log import AccessLogMiddleware
-from ..observability.logging import setup_logging
+from ..observability.logging import flush_logs, setup_logging
+from ..observability.loop_monitor import LoopMonitor
 from ..observability.metrics import setup_metrics
 from ..observability.tracing import setup_tracing
-from .middleware import RequestIDMiddleware
+from ..resilience.admission import AdmissionController
+from .middleware import AdmissionMiddleware, RequestContextMiddleware
 from .routers import answer as answer_router
 from .routers import echo as echo_router
 from .routers import health as health_router
 from .routers import resilience_demo as resilience_demo_router
 from .settings import settings
+from .warmup import Readiness, warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background: /health answers at once, /ready once this is done
+    app.state.readiness = readiness = Readiness(ready=not settings.warmup_enabled)
+    task = asyncio.create_task(warm_up(readiness)) if settings.warmup_enabled else None
+    monitor = None
+    if settings.loop_monitor_enabled:
+        monitor = LoopMonitor(
+            settings.loop_lag_interval_ms / 1000.0, settings.loop_block_threshold_ms / 1000.0
+        )
+        monitor.start()
+    yield
+    if monitor is not None:
+        await monitor.stop()
+    if task is not None:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    from ..ext.http_client import close_upstream_clients  # httpx: only needed here
+    from ..storage.store import close_document_store
+
+    await close_upstream_clients()  # close pooled upstream connections
+    await close_document_store()
+    # Write out what the background log sink still holds: a blocking write, off the loop
+    await asyncio.to_thread(flush_logs)
 
 
 def create_app() -> FastAPI:
     setup_logging()
-    app = FastAPI(title=settings.name, version=settings.version, debug=settings.debug)
+    app = FastAPI(
+        title=settings.name, version=settings.version, debug=settings.debug, lifespan=lifespan
+    )
 
     setup_tracing(app, service_name=settings.name)
-    # if settings.enable_tracing:
-    #     setup_tracing(app, service_name=settings.name)
 
     setup_metrics(app)
 
-    app.add_middleware(RequestIDMiddleware)
-    app.add_middleware(AccessLogMiddleware)
+    # Inside the request context (added first = innermost): shed before any route runs
+    if settings.admission_enabled:
+        app.add_middleware(
+            AdmissionMiddleware, controller=AdmissionController.from_settings(settings)
+        )
+    # Single pure-ASGI layer: request ID, log context, span tag and access log
+    app.add_middleware(RequestContextMiddleware)
 
     app.include_router(health_router.router, tags=["health"])
     app.include_router(echo_router.router, tags=["echo"])
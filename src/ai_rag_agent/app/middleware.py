@@ -1,19 +1,134 @@
+import json
+import time
 import uuid
-from typing import Callable
 
 import structlog
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from ..observability.access_log import header, log_access, tag_span
+from ..resilience.admission import AdmissionController, Shed
+from ..resilience.deadline import (
+    DEADLINE_HEADER,
+    parse_timeout_ms,
+    remaining,
+    reset_deadline,
+    set_deadline,
+)
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        req_id = request.headers.get("x-request-id", str(uuid.uuid4()))
+_REQUEST_ID_HEADER = b"x-request-id"
+_DEADLINE_HEADER = DEADLINE_HEADER.encode("latin-1")
+
+
+class RequestContextMiddleware:
+    """
+    Pure-ASGI request context + access log middleware.
+
+    Assigns the request ID (inbound ``x-request-id`` or a fresh UUID), binds it to the
+    structlog contextvars, sets the request deadline from ``x-request-timeout-ms`` (if
+    sent) for the resilience policies, tags the active span and writes one
+    ``http_access`` line once the response body has been fully sent. Unlike
+    ``BaseHTTPMiddleware`` it does not wrap the response in an extra task/stream, so
+    streamed answers pass straight through and their duration covers the whole body,
+    not just the headers.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        req_id = header(scope, _REQUEST_ID_HEADER) or str(uuid.uuid4())
+        raw_req_id = req_id.encode("latin-1")
         structlog.contextvars.bind_contextvars(request_id=req_id)
+        tag_span(req_id)
+        timeout_s = parse_timeout_ms(header(scope, _DEADLINE_HEADER))
+        deadline_token = set_deadline(timeout_s) if timeout_s is not None else None
+
+        status_code = 500
+        ttfb_s: float | None = None
+        bytes_sent = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, ttfb_s, bytes_sent
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *(h for h in message.get("headers", ()) if h[0] != _REQUEST_ID_HEADER),
+                    (_REQUEST_ID_HEADER, raw_req_id),
+                ]
+            elif message["type"] == "http.response.body":
+                if ttfb_s is None:
+                    ttfb_s = time.perf_counter() - start
+                bytes_sent += len(message.get("body", b""))
+            await send(message)
+
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         finally:
+            log_access(
+                scope,
+                request_id=req_id,
+                status_code=status_code,
+                duration_s=time.perf_counter() - start,
+                ttfb_s=ttfb_s,
+                bytes_sent=bytes_sent,
+            )
             structlog.contextvars.clear_contextvars()
-        response.headers["x-request-id"] = req_id
-        return response
+            if deadline_token is not None:
+                reset_deadline(deadline_token)
+
+
+class AdmissionMiddleware:
+    """
+    Pure-ASGI admission control: every request holds a slot in its route's priority
+    class for its whole duration. Installed inside ``RequestContextMiddleware``, so the
+    wait budget is the class's ``queue_timeout_s`` capped by the request's deadline
+    (``x-request-timeout-ms``) when it sent one, and shed requests still get a request
+    ID and an access-log line. A shed request gets 503 with ``Retry-After`` before the
+    app sees it.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        priority = self.controller.classify(scope["path"]) if scope["type"] == "http" else None
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        budget_s = priority.queue_timeout_s
+        left = remaining()
+        if left is not None:
+            budget_s = min(budget_s, left)
+        try:
+            await priority.acquire(budget_s)
+        except Shed as e:
+            await _overloaded(send, e)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            priority.release(time.perf_counter() - start)
+
+
+async def _overloaded(send: Send, shed: Shed) -> None:
+    body = json.dumps({"detail": "overloaded", "priority": shed.priority, "reason": shed.reason})
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(shed.retry_after).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body.encode()})
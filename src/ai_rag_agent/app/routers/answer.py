@@ -1,13 +1,32 @@
 import asyncio
-from typing import AsyncIterator, Optional
+import json
+from functools import lru_cache
+from typing import AsyncIterator, Literal, Optional
 
-from fastapi import APIRouter, Query
-from pydantic import BaseModel
+import structlog
+from fastapi import APIRouter, Query, Response
+from pydantic import BaseModel, Field
 from starlette.responses import StreamingResponse
 
+from ...cache.answer_cache import get_answer_cache
+from ...ext.batching import MicroBatcher
+from ...observability.pipeline_metrics import STAGE_LATENCY
+from ...retrieval.context import get_context_assembler
+from ...retrieval.index import SearchParams
+from ...retrieval.rerank import get_reranker
+from ...retrieval.service import Hit, load_retriever
+from ...storage.store import get_document_store, hydrate_hits
+from ..settings import settings
+from ..streaming import TokenStreamResponse
+
 
 class AnswerIn(BaseModel):
     query: str
+    top_k: Optional[int] = Field(default=None, ge=1, le=50)
+    # ANN recall/latency knob (IVF lists probed); ignored by the flat index
+    nprobe: Optional[int] = Field(default=None, ge=1, le=4096)
+    # Lexical (BM25), vector or both fused; defaults to settings.retrieval_mode
+    mode: Optional[Literal["vector", "lexical", "hybrid"]] = None
 
 
 class AnswerOut(BaseModel):
@@ -15,23 +34,213 @@ class AnswerOut(BaseModel):
     citations: list[str]
 
 
+class AnswerBatchIn(BaseModel):
+    queries: list[AnswerIn] = Field(min_length=1, max_length=1000)
+    # Queries answered at once; defaults to settings.answer_batch_concurrency
+    concurrency: Optional[int] = Field(default=None, ge=1, le=256)
+
+
 router = APIRouter(prefix="/v1")
+log = structlog.get_logger()
+
+PLACEHOLDER = "This is a placeholder answer. RAG coming next."
+
+# Ranked candidates kept per answer chunk, so near-duplicates and chunks over the
+# token budget can be replaced by the next best ones
+CONTEXT_SPARES = 2
 
 
-async def _stream_stub(text: str) -> AsyncIterator[bytes]:
-    # Simulate token streaming; replace later with model streaming
+async def _stream_stub(text: str) -> AsyncIterator[str]:
+    # Simulate model token streaming (one word per token); replace with the model
+    delay_s = settings.stream_token_delay_ms / 1000.0
     for part in text.split(" "):
-        yield (part + " ").encode("utf-8")
-        await asyncio.sleep(0.02)
+        yield part + " "
+        await asyncio.sleep(delay_s)
+
+
+SearchItem = tuple[str, int, SearchParams]
+
+
+async def _search_many(items: list[SearchItem]) -> list[list[Hit]]:
+    """Batch function for the shared search batcher: one search_batch per (k, params)."""
+    retriever = await load_retriever()
+    out: list[list[Hit]] = [[] for _ in items]
+    if retriever is None:
+        return out
+    groups: dict[tuple[int, SearchParams], list[int]] = {}
+    for i, (_, depth, params) in enumerate(items):
+        groups.setdefault((depth, params), []).append(i)
+    for (depth, params), rows in groups.items():
+        queries = [items[i][0] for i in rows]
+        found = await asyncio.to_thread(retriever.search_batch, queries, depth, params)
+        for i, hits in zip(rows, found, strict=True):
+            out[i] = hits
+    store = get_document_store()
+    if store is not None:  # one fetch for the whole batch
+        with STAGE_LATENCY.labels(stage="hydrate").time():
+            out = await hydrate_hits(store, out)
+    return out
+
+
+@lru_cache(maxsize=1)
+def _search_batcher() -> MicroBatcher[SearchItem, list[Hit]]:
+    # Shared by every in-flight batch request, so their queries embed and scan together
+    return MicroBatcher(
+        _search_many,
+        max_batch_size=settings.answer_batch_search_size,
+        max_wait_ms=settings.answer_batch_search_wait_ms,
+        target="retrieval",
+    )
+
+
+async def _retrieve(payload: AnswerIn, batched: bool = False) -> list[Hit]:
+    retriever = await load_retriever()
+    if retriever is None:
+        return []
+    k = payload.top_k or settings.retrieval_top_k
+    params = SearchParams(
+        nprobe=payload.nprobe or settings.ivf_nprobe, mode=payload.mode or settings.retrieval_mode
+    )
+    keep = k * CONTEXT_SPARES
+    reranker = get_reranker()
+    depth = max(keep, settings.rerank_candidates) if reranker is not None else keep
+    with STAGE_LATENCY.labels(stage="retrieve").time():
+        if batched:
+            hits = await _search_batcher().submit((payload.query, depth, params))
+        else:
+            # Scoring is NumPy work (releases the GIL); keep it off the event loop
+            hits = await asyncio.to_thread(retriever.search, payload.query, depth, params)
+            store = get_document_store()
+            if store is not None:
+                with STAGE_LATENCY.labels(stage="hydrate").time():
+                    (hits,) = await hydrate_hits(store, [hits])
+    if reranker is None:
+        return hits
+    with STAGE_LATENCY.labels(stage="rerank").time():
+        return await reranker.rerank(payload.query, hits, keep)
+
+
+def _assemble(payload: AnswerIn, hits: list[Hit]) -> list[Hit]:
+    """Dedup and pack the candidates into the token budget; only these get cited."""
+    with STAGE_LATENCY.labels(stage="assemble").time():
+        context = get_context_assembler().assemble(
+            hits, max_chunks=payload.top_k or settings.retrieval_top_k
+        )
+    return context.hits
+
+
+def _compose(hits: list[Hit]) -> AnswerOut:
+    # Extractive stand-in for generation: best passage, cite every chunk in the context
+    with STAGE_LATENCY.labels(stage="generate").time():
+        if not hits:
+            return AnswerOut(answer=PLACEHOLDER, citations=[])
+        return AnswerOut(
+            answer=hits[0].text, citations=list(dict.fromkeys(h.chunk_id for h in hits))
+        )
+
+
+def _build(payload: AnswerIn, hits: list[Hit]) -> AnswerOut:
+    return _compose(_assemble(payload, hits))
+
+
+async def _generate(payload: AnswerIn, batched: bool = False) -> AnswerOut:
+    hits = await _retrieve(payload, batched)
+    # Token counting and near-duplicate signatures are CPU work: keep it off the event loop
+    return await asyncio.to_thread(_build, payload, hits)
+
+
+def _variant(payload: AnswerIn) -> str:
+    # Request knobs that change the answer; cached entries only match the same variant
+    return (
+        f"k={payload.top_k or settings.retrieval_top_k};nprobe={payload.nprobe or ''};"
+        f"mode={payload.mode or settings.retrieval_mode};"
+        f"rerank={settings.rerank_scorer if settings.rerank_enabled else 'off'};"
+        f"ctx={settings.context_token_budget}"
+    )
+
+
+async def _answer(payload: AnswerIn, batched: bool = False) -> tuple[AnswerOut, str]:
+    """Answer from cache when possible. Returns (answer, cache status for x-cache)."""
+    # The cache shares the retriever's embedder: open the index off the loop first
+    await load_retriever()
+    cache = get_answer_cache()
+    if cache is None:
+        return await _generate(payload, batched), "off"
+    variant = _variant(payload)
+    vector = None
+    if not cache.fresh_exact(payload.query, variant):
+        # Semantic lookup (and the put after a miss) need the query embedding: off the loop
+        vector = await asyncio.to_thread(cache.embed_query, payload.query)
+    cached = cache.get(payload.query, variant, vector)
+    if cached is not None:
+        return AnswerOut(answer=cached.answer, citations=list(cached.citations)), cached.layer
+    out = await _generate(payload, batched)
+    if out.citations:  # never cache the no-hit placeholder
+        cache.put(payload.query, out.answer, out.citations, variant, vector)
+    return out, "miss"
 
 
 @router.post("/answer")
-async def answer(payload: AnswerIn, stream: Optional[bool] = Query(default=True)):
+async def answer(
+    payload: AnswerIn,
+    response: Response,
+    stream: Optional[bool] = Query(default=True),
+    format: Literal["text", "sse"] = Query(default="text"),
+):
     """
-    RAG stub. If stream=true (default), returns a streaming response.
-    Otherwise, returns a JSON AnswerOut. Replace with real RAG soon.
+    RAG stub. If stream=true (default), returns a streaming response: plain text, or
+    Server-Sent Events with format=sse. Tokens are coalesced into frames (see
+    TokenStreamResponse). Otherwise, returns a JSON AnswerOut with citations from
+    the retrieved chunks. Cached answers are replayed through the same streaming
+    path as fresh ones.
     """
-    canned = "This is a placeholder answer. RAG coming next."
+    out, cache_status = await _answer(payload)
+    headers = {"x-cache": cache_status}
     if stream:
-        return StreamingResponse(_stream_stub(canned), media_type="text/plain; charset=utf-8")
-    return AnswerOut(answer=canned, citations=[])
+        return TokenStreamResponse(
+            _stream_stub(out.answer),
+            sse=format == "sse",
+            max_frame_bytes=settings.stream_max_frame_bytes,
+            flush_interval_s=settings.stream_flush_interval_ms / 1000.0,
+            max_buffered_tokens=settings.stream_max_buffered_tokens,
+            headers=headers,
+        )
+    response.headers.update(headers)
+    return out
+
+
+async def _batch_lines(queries: list[AnswerIn], concurrency: int) -> AsyncIterator[bytes]:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(index: int, payload: AnswerIn) -> bytes:
+        async with sem:
+            try:
+                out, cache_status = await _answer(payload, batched=True)
+                line = {"index": index, **out.model_dump(), "cache": cache_status}
+            except Exception as e:  # one bad query must not sink the rest of the batch
+                log.warning("batch_query_failed", index=index, error=repr(e))
+                line = {"index": index, "error": type(e).__name__}
+        return (json.dumps(line) + "\n").encode("utf-8")
+
+    tasks = [asyncio.create_task(one(i, q)) for i, q in enumerate(queries)]
+    try:
+        for done in asyncio.as_completed(tasks):
+            yield await done
+    finally:  # client went away: stop the queries that have not finished
+        for task in tasks:
+            task.cancel()
+        # Wait for them to unwind, so no answer is still running after the response ends
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@router.post("/answer:batch")
+async def answer_batch(payload: AnswerBatchIn):
+    """
+    Answer many queries in one request. Results stream back as NDJSON, one line per
+    query in completion order (not submission order); ``index`` is the query's
+    position in ``queries``. Concurrent queries share batched retrieval.
+    """
+    concurrency = payload.concurrency or settings.answer_batch_concurrency
+    return StreamingResponse(
+        _batch_lines(payload.queries, concurrency), media_type="application/x-ndjson"
+    )
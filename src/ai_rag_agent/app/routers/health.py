@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response, status
 from pydantic import BaseModel
 
 
@@ -7,6 +7,12 @@ class HealthOut(BaseModel):
     version: str
 
 
+class ReadyOut(BaseModel):
+    status: str  # starting | ready | failed
+    steps: dict[str, float]
+    error: str | None = None
+
+
 router = APIRouter()
 
 
@@ -16,3 +22,15 @@ async def health() -> HealthOut:
     from ..settings import settings
 
     return HealthOut(status="ok", version=settings.version)
+
+
+@router.get("/ready", response_model=ReadyOut)
+async def ready(request: Request, response: Response) -> ReadyOut:
+    # Readiness: 503 until the lifespan warm-up has loaded the index and caches
+    readiness = getattr(request.app.state, "readiness", None)
+    if readiness is None:  # lifespan not run
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return ReadyOut(status="starting", steps={})
+    if not readiness.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadyOut(status=readiness.status, steps=readiness.steps, error=readiness.error)
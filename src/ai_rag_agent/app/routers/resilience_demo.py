@@ -1,15 +1,23 @@
+from typing import Literal, Optional
+
 import structlog
 from aiobreaker import CircuitBreakerError
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 
 from ...ext.flaky_service import flaky_op
 from ...resilience.policies import (
+    FLAKY_HEDGE,
     FLAKY_SEMAPHORE,
+    LimiterRejected,
     TimeoutError,
     call_flaky_with_retry,
     flaky_through_breaker,
+    get_policy_registry,
+    hedged_call,
+    measured_call,
     resilient_call,
     with_bulkhead,
+    with_limiter,
     with_timeout,
 )
 
@@ -38,6 +46,8 @@ async def demo_retry(
             mode=mode, fail_times=fail_times, key=key, timeout_s=timeout_ms / 1000
         )
         return {"ok": True, "result": result}
+    except (CircuitBreakerError, LimiterRejected) as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
     except TimeoutError as e:
         raise HTTPException(status_code=504, detail=str(e)) from e
     except RuntimeError as e:
@@ -62,22 +72,140 @@ async def demo_breaker(mode: str = "fail", timeout_ms: int = 300):
 
 
 @router.get("/demo-bulkhead")
-async def demo_bulkhead(concurrency: int = 10, sleep_ms: int = 1000):
+async def demo_bulkhead(
+    concurrency: int = Query(10, ge=1, le=1000),
+    sleep_ms: int = 1000,
+    mode: Literal["static", "adaptive"] = "adaptive",
+    shift_ms: Optional[int] = None,
+):
     """
-    Spawns N concurrent calls to a slow op; semaphore limits in-flight to 5.
-    Returns total time; with bulkhead, time ≈ ceil(N/5) * sleep_ms.
+    Spawns N concurrent calls to a slow op through the flaky-op target's adaptive
+    limiter (the policy registry's, so /metrics reports the limit shown here). With
+    shift_ms it runs three waves (sleep_ms, shift_ms, sleep_ms) and reports the lowest
+    and final limit of each, showing it back off when the latency jumps and recover
+    once the baseline catches up.
+
+    mode=static goes through the old fixed semaphore of 5 instead, for comparison:
+    time ≈ ceil(N/5) * sleep_ms.
     """
     import asyncio
     import time
 
     start = time.perf_counter()
 
-    async def one():
-        return await with_bulkhead(flaky_op(mode="slow", sleep_ms=sleep_ms), FLAKY_SEMAPHORE)
+    if mode == "static":
+
+        async def one():
+            return await with_bulkhead(flaky_op(mode="slow", sleep_ms=sleep_ms), FLAKY_SEMAPHORE)
+
+        await asyncio.gather(*[one() for _ in range(concurrency)])
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return {"concurrency": concurrency, "elapsed_ms": round(elapsed_ms)}
 
-    await asyncio.gather(*[one() for _ in range(concurrency)])
+    limiter = get_policy_registry().get("flaky-op").limiter
+    waves = [sleep_ms] if shift_ms is None else [sleep_ms, shift_ms, sleep_ms]
+    phases = []
+    for wave_ms in waves:
+        seen: list[int] = []
+
+        async def limited(wave_ms=wave_ms, seen=seen):
+            try:
+                return await with_limiter(flaky_op(mode="slow", sleep_ms=wave_ms), limiter)
+            finally:
+                seen.append(limiter.limit)
+
+        t0 = time.perf_counter()
+        results = await asyncio.gather(
+            *[limited() for _ in range(concurrency)], return_exceptions=True
+        )
+        phases.append(
+            {
+                "sleep_ms": wave_ms,
+                "elapsed_ms": round((time.perf_counter() - t0) * 1000),
+                "rejected": sum(isinstance(r, LimiterRejected) for r in results),
+                "min_limit": min(seen),
+                "limit": limiter.limit,
+            }
+        )
     elapsed_ms = (time.perf_counter() - start) * 1000
-    return {"concurrency": concurrency, "elapsed_ms": round(elapsed_ms)}
+    return {
+        "concurrency": concurrency,
+        "elapsed_ms": round(elapsed_ms),
+        "mode": mode,
+        "phases": phases,
+    }
+
+
+def _percentiles(latencies_s: list[float]) -> dict:
+    ordered = sorted(latencies_s)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+
+    return {"p50_ms": at(0.50), "p95_ms": at(0.95), "p99_ms": at(0.99)}
+
+
+@router.get("/demo-hedge")
+async def demo_hedge(
+    n: int = Query(200, ge=1, le=5000),
+    concurrency: int = Query(4, ge=1, le=100),
+    sleep_ms: int = 20,
+    tail_ms: int = 500,
+    tail_p: float = 0.03,
+    timeout_ms: int = 2000,
+):
+    """
+    Runs n long-tailed flaky_op calls without hedging, then n with hedged_call, and
+    returns both latency profiles. Every attempt goes through the flaky-op target's
+    limiter and breaker; the unhedged wave also warms FLAKY_HEDGE's p95 estimate.
+    """
+    import asyncio
+    import time
+
+    attempts = 0
+
+    def make_call():
+        nonlocal attempts
+        attempts += 1
+        op = flaky_op(mode="long_tail", sleep_ms=sleep_ms, tail_ms=tail_ms, tail_p=tail_p)
+        return measured_call("flaky-op", op, timeout_s=timeout_ms / 1000)
+
+    async def run(hedge: bool) -> list[float]:
+        todo = iter(range(n))
+        latencies: list[float] = []
+
+        async def client():
+            for _ in todo:
+                t0 = time.perf_counter()
+                if hedge:
+                    await hedged_call(make_call, FLAKY_HEDGE)
+                else:
+                    await make_call()
+                    FLAKY_HEDGE.observe(time.perf_counter() - t0)
+                latencies.append(time.perf_counter() - t0)
+
+        await asyncio.gather(*[client() for _ in range(concurrency)])
+        return latencies
+
+    try:
+        baseline = await run(hedge=False)
+        attempts = 0
+        hedged = await run(hedge=True)
+    except CircuitBreakerError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="circuit open"
+        ) from e
+    except LimiterRejected as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
+    return {
+        "n": n,
+        "unhedged": _percentiles(baseline),
+        "hedged": _percentiles(hedged),
+        "hedges_sent": attempts - n,
+        "hedge_delay_ms": round((FLAKY_HEDGE.hedge_delay() or 0) * 1000, 1),
+    }
 
 
 @router.get("/demo-fallback")
@@ -0,0 +1,183 @@
+"""
+Pre-fork server: one supervisor binds the listening socket, then forks ``--workers``
+uvicorn workers that accept on it.
+
+The supervisor prepares a run directory before any worker imports the app:
+``metrics/`` becomes ``PROMETHEUS_MULTIPROC_DIR``, so ``/metrics`` on any worker
+reports the sum over all of them, and ``resilience.state`` holds the breaker and
+limiter state every worker shares (resilience.shared_state). Dead workers are
+replaced, and SIGTERM/SIGINT are passed on for a graceful shutdown.
+
+    rag-serve --workers 4 --port 8000
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+
+from .settings import settings
+
+APP = "ai_rag_agent.main:app"
+# A worker that dies sooner than this after starting is restarted after a pause
+MIN_WORKER_LIFETIME_S = 1.0
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+def available_cpus(cpu_max: str = CGROUP_CPU_MAX) -> int:
+    """
+    CPUs this process may use: its affinity mask, capped by the cgroup v2 CPU quota
+    (a container or pod CPU limit) rounded up. os.cpu_count() is the host's count.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        cpus = os.cpu_count() or 1
+    try:
+        with open(cpu_max) as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass  # no cgroup v2 limit
+    return max(1, cpus)
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _prepare(run_dir: str, shared_state: bool) -> None:
+    metrics_dir = os.path.join(run_dir, "metrics")
+    shutil.rmtree(metrics_dir, ignore_errors=True)  # stale files would be summed in
+    os.makedirs(metrics_dir)
+    # Read by prometheus_client when it is first imported, i.e. in the workers
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+    if shared_state:
+        path = os.path.join(run_dir, "resilience.state")
+        if os.path.exists(path):
+            os.remove(path)  # breakers start closed on every launch
+        os.environ["APP_RESILIENCE_SHARED_STATE"] = path
+        settings.resilience_shared_state = path
+
+
+def _run_worker(sock: socket.socket, args: argparse.Namespace) -> None:
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(sig, signal.SIG_DFL)
+    import uvicorn
+
+    config = uvicorn.Config(
+        APP,
+        log_level=args.log_level,
+        timeout_graceful_shutdown=settings.worker_graceful_timeout_s,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(sock: socket.socket, args: argparse.Namespace) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(sock, args)
+        except BaseException:
+            code = 1
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)  # never return into the supervisor's loop
+    return pid
+
+
+def supervise(sock: socket.socket, args: argparse.Namespace) -> int:
+    from prometheus_client import multiprocess
+
+    workers: dict[int, float] = {}
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(args.workers):
+        workers[_spawn(sock, args)] = time.monotonic()
+    print(
+        f"rag-serve: {args.workers} workers on {args.host}:{sock.getsockname()[1]}",
+        file=sys.stderr,
+        flush=True,
+    )
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, None)
+        if started is None:
+            continue
+        multiprocess.mark_process_dead(pid)  # drop its live gauges from /metrics
+        if stopping:
+            continue
+        print(f"rag-serve: worker {pid} exited ({status}), restarting", file=sys.stderr)
+        if time.monotonic() - started < MIN_WORKER_LIFETIME_S:
+            time.sleep(MIN_WORKER_LIFETIME_S)  # don't spin on a worker that can't start
+        if not stopping:
+            workers[_spawn(sock, args)] = time.monotonic()
+    return 0
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(
+        prog="rag-serve", description="Serve the API from pre-forked uvicorn workers."
+    )
+    ap.add_argument("--host", default=settings.host)
+    ap.add_argument("--port", type=int, default=settings.port)
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=settings.workers,
+        help="0: one per available CPU, within the cgroup quota (default: 1)",
+    )
+    ap.add_argument("--run-dir", default=None, help="metrics and shared state (default: a tmpdir)")
+    ap.add_argument(
+        "--no-shared-state",
+        action="store_true",
+        help="keep breakers and limits per worker",
+    )
+    ap.add_argument("--log-level", default="info")
+    args = ap.parse_args(argv)
+    args.workers = args.workers or available_cpus()
+
+    run_dir = args.run_dir or tempfile.mkdtemp(prefix="rag-serve-")
+    _prepare(run_dir, shared_state=not args.no_shared_state)
+    sock = _bind(args.host, args.port)
+    try:
+        sys.exit(supervise(sock, args))
+    finally:
+        sock.close()
+
+
+if __name__ == "__main__":
+    main()
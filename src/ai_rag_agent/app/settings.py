@@ -1,6 +1,50 @@
+from typing import Annotated, Any
+
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class TargetPolicy(BaseModel):
+    """Resilience settings for one upstream target (resilience.policies.PolicyRegistry)."""
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    timeout_s: float = 1.0
+    breaker_fail_max: int = 5
+    breaker_reset_s: float = 30.0
+    adaptive: bool = True  # AIMD limit between 1 and max_concurrency; else fixed at concurrency
+    concurrency: int = 10
+    max_concurrency: int = 100
+    max_queue: int = 50
+    queue_timeout_s: float = 1.0
+    retry_attempts: int = 3
+    retry_budget_ratio: float = 0.2
+    retry_budget_max: float = 10.0  # burst of retries the budget allows
+
+
+class UpstreamConfig(BaseModel):
+    """Connection pool for one HTTP upstream (ext.http_client.UpstreamClient)."""
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    base_url: str
+    max_connections: int = 100  # per host: the pool holds one upstream
+    max_keepalive_connections: int = 20
+    keepalive_expiry_s: float = 30.0
+    connect_timeout_s: float = 1.0
+    http2: bool = False  # needs the optional h2 package; falls back to HTTP/1.1
+
+
+class AdmissionClass(BaseModel):
+    """Slots and queue for one admission priority class (resilience.admission)."""
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    concurrency: int = 64  # requests in progress, streamed bodies included
+    max_queue: int = 128
+    queue_timeout_s: float = 2.0  # wait budget when the request sends no deadline
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_prefix="APP_", extra="ignore")
 
@@ -8,8 +52,120 @@ class Settings(BaseSettings):
     version: str = "0.1.0"
     debug: bool = True
 
-    enable_tracing: bool = False
+    enable_tracing: bool = False  # OpenTelemetry is only imported when enabled
     otel_endpoint: str | None = None
 
+    # Event-loop monitor: lag histogram, and a logged stack when one callback holds the
+    # loop longer than loop_block_threshold_ms
+    loop_monitor_enabled: bool = True
+    loop_lag_interval_ms: float = 100.0
+    loop_block_threshold_ms: float = 100.0
+
+    # Startup: load the index, reranker and caches in a background task after the
+    # server starts; /ready reports 503 until it has finished
+    warmup_enabled: bool = True
+
+    # Logging: lines are rendered and written in batches by a background thread
+    log_queue_enabled: bool = True
+    log_queue_max_lines: int = 10_000  # oldest lines are dropped beyond this
+    log_batch_size: int = 256
+    log_flush_interval_ms: float = 50.0
+    # Access log: errors (>= 400) and requests slower than access_log_slow_ms are always
+    # logged, other requests with probability access_log_sample_rate
+    access_log_sample_rate: float = 1.0
+    access_log_slow_ms: float = 1000.0
+
+    # Retrieval: directory written by Retriever.save(); memory-mapped at startup
+    index_dir: str | None = None
+    retrieval_top_k: int = 4
+    ivf_nprobe: int = 8  # default lists probed per query for IVF indexes
+    retrieval_mode: str = "hybrid"  # vector | lexical | hybrid (needs the BM25 index)
+
+    # Document store: system of record for chunk text, metadata and embeddings; hits
+    # resolve their text from it in one batched query. none: serve from the index files
+    store_backend: str = "none"  # none | sqlite | postgres
+    store_sqlite_path: str = "data/store.sqlite3"
+    store_postgres_dsn: str = "postgresql://rag:rag@db:5432/rag"
+    store_pool_min_size: int = 1
+    store_pool_max_size: int = 10
+
+    # Embedding cache: LRU in memory over an optional SQLite file shared by workers,
+    # keyed by normalised text + model; used by queries and rag-ingest
+    embed_cache_enabled: bool = True
+    embed_cache_memory_entries: int = 10_000
+    embed_cache_path: str | None = None
+    embed_cache_max_entries: int = 1_000_000  # on disk; oldest writes evicted first
+
+    # Rerank: rescore the top rerank_candidates hits (in a thread pool), keep top_k
+    rerank_enabled: bool = True
+    rerank_scorer: str = "overlap"  # key of retrieval.rerank.SCORERS
+    rerank_candidates: int = 20
+    rerank_batch_size: int = 8
+    rerank_margin: float = 0.1  # early exit once a batch trails the k-th score by this
+    rerank_cache_size: int = 50_000
+    rerank_workers: int = 2
+
+    # Context assembly: near-duplicate removal (SimHash bits) and token-budget packing
+    context_token_budget: int = 1024
+    context_dedup_distance: int = 3
+    context_overhead_tokens: int = 4  # per chunk: separator and citation header
+
+    # Batch answers (/v1/answer:batch): queries in flight per request, and the shared
+    # retrieval micro-batcher that coalesces their searches
+    answer_batch_concurrency: int = 16
+    answer_batch_search_size: int = 32
+    answer_batch_search_wait_ms: float = 2.0
+
+    # Token streaming: tokens are coalesced into frames of up to stream_max_frame_bytes,
+    # each sent at most stream_flush_interval_ms after its first token
+    stream_max_frame_bytes: int = 4096
+    stream_flush_interval_ms: float = 20.0
+    stream_max_buffered_tokens: int = 1024  # backpressure: generation pauses when full
+    stream_token_delay_ms: float = 20.0  # pace of the stand-in model
+
+    # Answer cache: exact + semantic (cosine >= similarity) layers, LRU + TTL
+    answer_cache_enabled: bool = True
+    answer_cache_max_entries: Annotated[int, Field(ge=1)] = 10_000  # disable: answer_cache_enabled
+    answer_cache_max_bytes: int = 64 * 2**20
+    answer_cache_ttl_s: float = 600.0
+    answer_cache_similarity: float = 0.95
+
+    # Resilience: per-target overrides of resilience_defaults, as JSON, e.g.
+    # APP_RESILIENCE_TARGETS='{"tenant-a": {"timeout_s": 0.5, "concurrency": 4}}'
+    resilience_defaults: TargetPolicy = TargetPolicy()
+    resilience_targets: dict[str, dict[str, Any]] = {
+        "flaky-op": {"breaker_fail_max": 2, "breaker_reset_s": 2.0, "concurrency": 5},
+    }
+    # HTTP upstreams: one pooled client each, calls go through the target's policies, e.g.
+    # APP_UPSTREAMS='{"llm": {"base_url": "https://llm.internal", "http2": true}}'
+    upstreams: dict[str, UpstreamConfig] = {}
+    # File shared by all workers for breaker state and adaptive limits (rag-serve sets it)
+    resilience_shared_state: str | None = None
+    resilience_shared_slots: int = 1024  # max targets in the file
+
+    # Admission control: each request takes a slot in its route's priority class (longest
+    # matching path prefix in admission_routes, else admission_default_class), or is shed
+    # with 503 + Retry-After when its estimated queue wait exceeds its deadline. Probes
+    # (/health, /ready, /metrics) are always admitted
+    admission_enabled: bool = True
+    admission_classes: dict[str, AdmissionClass] = {
+        "high": AdmissionClass(concurrency=256, max_queue=512, queue_timeout_s=0.5),
+        "normal": AdmissionClass(concurrency=64, max_queue=128, queue_timeout_s=2.0),
+        "low": AdmissionClass(concurrency=16, max_queue=32, queue_timeout_s=5.0),
+    }
+    admission_routes: dict[str, str] = {
+        "/echo": "high",
+        "/v1/answer:batch": "low",
+        "/v1/answer": "normal",
+        "/v1/demo-": "low",
+    }
+    admission_default_class: str = "normal"
+
+    # Server (rag-serve): pre-forked uvicorn workers sharing one listening socket
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1  # 0: one per CPU the container may use
+    worker_graceful_timeout_s: int = 30
+
 
 settings = Settings()
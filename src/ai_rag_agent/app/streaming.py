@@ -0,0 +1,232 @@
+import asyncio
+import time
+from typing import AsyncIterator, Mapping
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from ..observability.stream_metrics import (
+    STREAM_FRAMES,
+    STREAM_TOKEN_RATE,
+    STREAM_TOKENS,
+    STREAM_TTFT,
+    STREAMS,
+    STREAMS_ACTIVE,
+)
+
+
+class _FrameBuffer:
+    """
+    Tokens waiting to be sent, shared by the producer and the response.
+
+    The events only change on transitions (a frame starts, a frame fills up, the
+    buffer fills up or drains), so buffering a token is a list append and wakes no one.
+    """
+
+    def __init__(self, max_frame_bytes: int, max_tokens: int) -> None:
+        self.max_frame_bytes = max_frame_bytes
+        self.max_tokens = max_tokens
+        self.parts: list[bytes] = []
+        self.size = 0
+        self.first_at = 0.0  # loop time the pending frame started
+        self.closed = False
+        self.error: BaseException | None = None
+        self.ready = asyncio.Event()  # a frame has started, or the stream is over
+        self.full = asyncio.Event()  # a frame's worth is buffered, or the stream is over
+        self.space = asyncio.Event()  # below max_tokens: the producer may continue
+        self.space.set()
+
+    def put(self, token: bytes) -> bool:
+        """Buffer a token; True when the producer must wait for ``space``."""
+        if not self.parts:
+            self.first_at = asyncio.get_running_loop().time()
+            self.ready.set()
+        self.parts.append(token)
+        self.size += len(token)
+        if self.size >= self.max_frame_bytes:
+            self.full.set()
+        if len(self.parts) >= self.max_tokens:
+            self.space.clear()
+            return True
+        return False
+
+    def take(self) -> list[bytes]:
+        """The oldest tokens, up to one frame's worth."""
+        cut, total = len(self.parts), 0
+        for i, part in enumerate(self.parts):
+            total += len(part)
+            if total >= self.max_frame_bytes:
+                cut = i + 1
+                break
+        frame, self.parts = self.parts[:cut], self.parts[cut:]
+        self.size -= sum(len(p) for p in frame)
+        if not self.closed:
+            if self.parts:
+                self.first_at = asyncio.get_running_loop().time()
+            else:
+                self.ready.clear()
+            if self.size < self.max_frame_bytes:
+                self.full.clear()
+        self.space.set()
+        return frame
+
+    def close(self, error: BaseException | None = None) -> None:
+        self.closed = True
+        self.error = error
+        self.ready.set()
+        self.full.set()
+
+
+def sse_event(data: bytes, event: str | None = None) -> bytes:
+    """One Server-Sent Event; multi-line data becomes one ``data:`` field per line."""
+    head = b"event: " + event.encode() + b"\n" if event else b""
+    return head + b"".join(b"data: " + line + b"\n" for line in data.split(b"\n")) + b"\n"
+
+
+class TokenStreamResponse(StreamingResponse):
+    """
+    Streams model tokens, coalesced into frames.
+
+    A producer task pulls ``tokens`` into a bounded buffer while the response drains
+    it: a frame is sent once it holds ``max_frame_bytes`` or ``flush_interval_s`` after
+    its first token, whichever comes first. So a fast model costs one ASGI send per
+    frame instead of per token, while a slow one still sees each token within the
+    flush interval.
+
+    The buffer bound (``max_buffered_tokens``) is the backpressure: when the client
+    reads slower than the model writes, the producer blocks and generation pauses. On
+    client disconnect (or any send failure) the producer is cancelled and the token
+    iterator closed, so nothing is generated for a reader that has gone.
+
+    With ``sse`` every frame is a ``data`` event, and the stream ends with an
+    ``event: done`` (or ``event: error``) event.
+    """
+
+    def __init__(
+        self,
+        tokens: AsyncIterator[str],
+        *,
+        sse: bool = False,
+        max_frame_bytes: int = 4096,
+        flush_interval_s: float = 0.02,
+        max_buffered_tokens: int = 1024,
+        route: str = "answer",
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        headers = dict(headers or {})
+        if sse:
+            headers.setdefault("cache-control", "no-cache")
+            headers.setdefault("x-accel-buffering", "no")  # keep reverse proxies from buffering
+        media_type = "text/event-stream" if sse else "text/plain; charset=utf-8"
+        super().__init__(tokens, headers=headers, media_type=media_type)
+        self.tokens = tokens
+        self.sse = sse
+        self.max_frame_bytes = max_frame_bytes
+        self.flush_interval_s = flush_interval_s
+        self.max_buffered_tokens = max_buffered_tokens
+        self.route = route
+        self._frames = 0
+        self._tokens = 0
+        self._started = 0.0
+        self._first_token: float | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._started = time.perf_counter()
+        STREAMS_ACTIVE.labels(route=self.route).inc()
+        outcome = "error"
+        pump = asyncio.create_task(self._pump(send))
+        watch = asyncio.create_task(_wait_disconnect(receive))
+        try:
+            await asyncio.wait((pump, watch), return_when=asyncio.FIRST_COMPLETED)
+            if pump.done():
+                pump.result()  # re-raise a failure of the stream itself
+                outcome = "completed"
+            else:
+                outcome = "disconnected"
+        except OSError:  # the server failed to write: the client is gone
+            outcome = "disconnected"
+        finally:
+            for task in (pump, watch):
+                task.cancel()
+            await asyncio.gather(pump, watch, return_exceptions=True)
+            self._record(outcome)
+        if self.background is not None:
+            await self.background()
+
+    async def _pump(self, send: Send) -> None:
+        buf = _FrameBuffer(self.max_frame_bytes, self.max_buffered_tokens)
+        producer = asyncio.create_task(self._produce(buf))
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": self.status_code,
+                    "headers": self.raw_headers,
+                }
+            )
+            await self._drain(buf, send)
+            if self.sse:
+                event = "error" if buf.error is not None else "done"
+                await self._send(send, sse_event(b"{}", event))
+            elif buf.error is not None:
+                raise buf.error  # plain text: abort the body so the client sees truncation
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+    async def _drain(self, buf: _FrameBuffer, send: Send) -> None:
+        while True:
+            await buf.ready.wait()
+            if not buf.parts:
+                return  # closed and fully sent
+            if not buf.full.is_set():
+                # One timer per frame, not per token: the frame goes out when it is
+                # full, the stream ends, or the interval since its first token is up
+                try:
+                    async with asyncio.timeout_at(buf.first_at + self.flush_interval_s):
+                        await buf.full.wait()
+                except TimeoutError:
+                    pass
+            parts = buf.take()
+            self._tokens += len(parts)
+            body = b"".join(parts)
+            await self._send(send, sse_event(body) if self.sse else body)
+
+    async def _send(self, send: Send, body: bytes) -> None:
+        await send({"type": "http.response.body", "body": body, "more_body": True})
+        self._frames += 1
+
+    async def _produce(self, buf: _FrameBuffer) -> None:
+        try:
+            async for token in self.tokens:
+                if self._first_token is None:  # when the model produced it, not when sent
+                    self._first_token = time.perf_counter()
+                if buf.put(token.encode("utf-8")):
+                    await buf.space.wait()
+            buf.close()
+        except Exception as e:
+            buf.close(e)
+        finally:
+            aclose = getattr(self.tokens, "aclose", None)
+            if aclose is not None:
+                await aclose()  # stop the generator now, not whenever it is collected
+
+    def _record(self, outcome: str) -> None:
+        route = self.route
+        STREAMS_ACTIVE.labels(route=route).dec()
+        STREAMS.labels(route=route, outcome=outcome).inc()
+        STREAM_FRAMES.labels(route=route).observe(self._frames)
+        STREAM_TOKENS.labels(route=route).inc(self._tokens)
+        if self._first_token is not None:
+            STREAM_TTFT.labels(route=route).observe(self._first_token - self._started)
+            elapsed = time.perf_counter() - self._first_token
+            if elapsed > 0 and self._tokens > 1:
+                STREAM_TOKEN_RATE.labels(route=route).observe(self._tokens / elapsed)
+
+
+async def _wait_disconnect(receive: Receive) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
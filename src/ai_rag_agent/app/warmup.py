@@ -0,0 +1,78 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+import structlog
+
+log = structlog.get_logger()
+
+WARMUP_QUERY = "warm up"
+
+
+@dataclass
+class Readiness:
+    """Warm-up progress, served by ``/ready``; set on ``app.state`` by the lifespan."""
+
+    ready: bool = False
+    error: str | None = None
+    steps: dict[str, float] = field(default_factory=dict)  # step -> seconds
+
+    @property
+    def status(self) -> str:
+        if self.error is not None:
+            return "failed"
+        return "ready" if self.ready else "starting"
+
+
+def _open_retriever() -> None:
+    from ..retrieval.service import open_retriever
+
+    retriever = open_retriever()
+    if retriever is not None:
+        # One query pages in the memory-mapped index and the embedder's code paths
+        retriever.search(WARMUP_QUERY, k=1)
+
+
+def _reranker() -> None:
+    from ..retrieval.rerank import get_reranker
+
+    get_reranker()
+
+
+def _context_assembler() -> None:
+    from ..retrieval.context import get_context_assembler
+
+    get_context_assembler()
+
+
+def _answer_cache() -> None:
+    from ..cache.answer_cache import get_answer_cache
+
+    get_answer_cache()
+
+
+STEPS = [
+    ("retriever", _open_retriever),
+    ("reranker", _reranker),
+    ("context", _context_assembler),
+    ("answer_cache", _answer_cache),
+]
+
+
+async def warm_up(readiness: Readiness) -> None:
+    """
+    Build the process-wide singletons (index, reranker, caches) in a thread, so the
+    server accepts connections, and answers ``/health``, while they load.
+    """
+    start = time.perf_counter()
+    try:
+        for name, step in STEPS:
+            t0 = time.perf_counter()
+            await asyncio.to_thread(step)
+            readiness.steps[name] = round(time.perf_counter() - t0, 4)
+    except Exception as e:
+        readiness.error = repr(e)
+        log.exception("warmup_failed", steps=readiness.steps)
+        return
+    readiness.ready = True
+    log.info("warmup_done", duration_s=round(time.perf_counter() - start, 4), **readiness.steps)
@@ -0,0 +1,209 @@
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable
+
+import numpy as np
+
+from ..observability.cache_metrics import (
+    CACHE_BYTES,
+    CACHE_ENTRIES,
+    CACHE_EVICTIONS,
+    CACHE_HITS,
+    CACHE_MISSES,
+)
+from ..retrieval.index import topk
+
+_WS_RE = re.compile(r"\s+")
+_ENTRY_OVERHEAD = 256  # rough per-entry bookkeeping (dict slots, dataclass, key)
+
+
+def normalize_query(query: str) -> str:
+    return _WS_RE.sub(" ", query).strip().casefold()
+
+
+@dataclass(frozen=True)
+class CachedAnswer:
+    answer: str
+    citations: tuple[str, ...]
+    layer: str = "exact"  # which layer served it: exact | semantic
+
+
+@dataclass
+class _Entry:
+    answer: str
+    citations: tuple[str, ...]
+    variant: str
+    slot: int
+    expires_at: float
+    nbytes: int
+
+
+class AnswerCache:
+    """
+    Answer cache with an exact layer and a semantic (near-duplicate) layer.
+
+    Exact: keyed by the normalised query plus a ``variant`` string describing the
+    request knobs that change the answer (top_k, nprobe, ...). Semantic: query
+    embeddings of live entries sit in one preallocated matrix, so a lookup is a single
+    mat-vec; the best entry with the same variant and cosine >= ``threshold`` is reused.
+    Entries expire after ``ttl_s`` (expired rows are masked out of the semantic
+    search) and are evicted LRU-first to stay within ``max_entries`` and ``max_bytes``.
+
+    ``get``/``put`` embed the query themselves unless given its ``embed_query``
+    vector; callers on the event loop compute that in a worker thread, and only when
+    ``fresh_exact`` says the exact layer can't answer.
+    """
+
+    name = "answer"
+
+    def __init__(
+        self,
+        embed: Callable[[str], np.ndarray],
+        dim: int,
+        *,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 2**20,
+        ttl_s: float = 600.0,
+        threshold: float = 0.95,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self._embed = embed
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.threshold = threshold
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()  # LRU order: oldest first
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._live = np.zeros(max_entries, dtype=bool)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._slot_keys: list[str | None] = [None] * max_entries
+        self._free = list(range(max_entries - 1, -1, -1))
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(query: str, variant: str) -> str:
+        return f"{variant}\x1f{normalize_query(query)}"
+
+    def embed_query(self, query: str) -> np.ndarray:
+        return self._embed(normalize_query(query))
+
+    def fresh_exact(self, query: str, variant: str = "") -> bool:
+        """Whether the exact layer holds a live entry (so ``get`` needs no embedding)."""
+        entry = self._entries.get(self._key(query, variant))
+        return entry is not None and entry.expires_at > self._clock()
+
+    def get(
+        self, query: str, variant: str = "", vector: np.ndarray | None = None
+    ) -> CachedAnswer | None:
+        now = self._clock()
+        key = self._key(query, variant)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            self._evict(key, "expired")
+            entry = None
+        layer = "exact"
+        if entry is None and self.threshold <= 1.0 and self._live.any():
+            if vector is None:
+                vector = self.embed_query(query)
+            entry, key = self._nearest(vector, variant, now)
+            layer = "semantic"
+        if entry is None:
+            CACHE_MISSES.labels(cache=self.name).inc()
+            return None
+        self._entries.move_to_end(key)
+        CACHE_HITS.labels(cache=self.name, layer=layer).inc()
+        return CachedAnswer(entry.answer, entry.citations, layer)
+
+    def _nearest(self, vector: np.ndarray, variant: str, now: float) -> tuple[_Entry | None, str]:
+        scores = self._vectors @ vector
+        # Expired rows can't win: a stale best match must not hide a fresh one
+        scores[~self._live | (self._expires <= now)] = -np.inf
+        best, slots = topk(scores[None, :], 8)
+        for score, slot in zip(best[0], slots[0], strict=True):
+            if score < self.threshold:
+                break
+            key = self._slot_keys[slot]
+            assert key is not None
+            entry = self._entries[key]
+            if entry.variant == variant:
+                return entry, key
+        return None, ""
+
+    def put(
+        self,
+        query: str,
+        answer: str,
+        citations: list[str],
+        variant: str = "",
+        vector: np.ndarray | None = None,
+    ) -> None:
+        key = self._key(query, variant)
+        if key in self._entries:
+            self._evict(key, "replaced")
+        cites = tuple(citations)
+        nbytes = (
+            len(answer.encode())
+            + sum(len(c) for c in cites)
+            + self._vectors.shape[1] * 4
+            + _ENTRY_OVERHEAD
+        )
+        if nbytes > self.max_bytes:
+            return
+        while self._entries and (not self._free or self.nbytes + nbytes > self.max_bytes):
+            self._evict(next(iter(self._entries)), "capacity")
+
+        slot = self._free.pop()
+        expires_at = self._clock() + self.ttl_s
+        self._vectors[slot] = self.embed_query(query) if vector is None else vector
+        self._live[slot] = True
+        self._expires[slot] = expires_at
+        self._slot_keys[slot] = key
+        self._entries[key] = _Entry(answer, cites, variant, slot, expires_at, nbytes)
+        self.nbytes += nbytes
+        self._publish()
+
+    def _evict(self, key: str, reason: str) -> None:
+        entry = self._entries.pop(key)
+        self._live[entry.slot] = False
+        self._slot_keys[entry.slot] = None
+        self._free.append(entry.slot)
+        self.nbytes -= entry.nbytes
+        CACHE_EVICTIONS.labels(cache=self.name, reason=reason).inc()
+        self._publish()
+
+    def _publish(self) -> None:
+        CACHE_ENTRIES.labels(cache=self.name).set(len(self._entries))
+        CACHE_BYTES.labels(cache=self.name).set(self.nbytes)
+
+
+@lru_cache(maxsize=1)
+def get_answer_cache() -> AnswerCache | None:
+    """Process-wide cache sharing the retriever's embedder; None when disabled/no index."""
+    from ..app.settings import settings
+    from ..retrieval.service import get_retriever
+    from .embedding_cache import CachedEmbedder
+
+    retriever = get_retriever()
+    if not settings.answer_cache_enabled or retriever is None:
+        return None
+    embedder = retriever.embedder
+    if isinstance(embedder, CachedEmbedder):
+        # get/put run on the event loop: no SQLite reads or writes from there
+        embedder = CachedEmbedder(embedder.inner, embedder.cache, disk=False)
+    return AnswerCache(
+        embedder.embed_one,
+        retriever.embedder.dim,
+        max_entries=settings.answer_cache_max_entries,
+        max_bytes=settings.answer_cache_max_bytes,
+        ttl_s=settings.answer_cache_ttl_s,
+        threshold=settings.answer_cache_similarity,
+    )
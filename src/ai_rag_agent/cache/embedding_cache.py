@@ -0,0 +1,212 @@
+import hashlib
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from ..observability.cache_metrics import (
+    CACHE_BYTES,
+    CACHE_ENTRIES,
+    CACHE_EVICTIONS,
+    CACHE_HITS,
+    CACHE_MISSES,
+)
+from ..retrieval.embedder import Embedder
+
+_WS_RE = re.compile(r"\s+")
+_SQL_VARS = 500  # keys per IN (...) query
+
+
+def content_key(text: str, model_id: str) -> bytes:
+    """16-byte key of whitespace-normalised text, namespaced by embedding model."""
+    norm = _WS_RE.sub(" ", text).strip()
+    return hashlib.blake2b(f"{model_id}\0{norm}".encode(), digest_size=16).digest()
+
+
+class SqliteVectorStore:
+    """
+    On-disk tier: fixed-width float32 records keyed by ``content_key`` in one SQLite
+    table (WAL, so every server worker can share the file). Beyond ``max_entries`` the
+    oldest writes are evicted first. Calls are serialised: the connection is shared by
+    the threads that embed.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int = 1_000_000) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, keys: Sequence[bytes]) -> dict[bytes, bytes]:
+        found: dict[bytes, bytes] = {}
+        with self._lock:
+            for i in range(0, len(keys), _SQL_VARS):
+                part = keys[i : i + _SQL_VARS]
+                marks = ",".join("?" * len(part))
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", part
+                )
+                found.update(rows)
+        return found
+
+    def put_many(self, items: Sequence[tuple[bytes, bytes]]) -> int:
+        """Insert or refresh ``items``; returns how many old records were evicted."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            # A replaced row gets a new, highest rowid: rowid order is write order
+            self._db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?)", items)
+            # Keep the last max_entries rowids (no count(*): that scans the table)
+            return self._db.execute(
+                "DELETE FROM embeddings WHERE rowid <= (SELECT max(rowid) FROM embeddings) - ?",
+                (self.max_entries,),
+            ).rowcount
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache: an in-process LRU of up to ``memory_entries`` vectors in
+    front of an optional ``SqliteVectorStore``. ``get_many``/``put_many`` take a whole
+    batch, so a batch costs one memory pass and at most one disk query. Disk hits are
+    promoted to memory; puts go to both tiers. With ``disk=False`` a call uses the
+    memory tier only, and the memory lock is never held across disk I/O, so such calls
+    are safe from the event loop.
+    """
+
+    name = "embedding"
+
+    def __init__(self, memory_entries: int = 10_000, disk: SqliteVectorStore | None = None):
+        self.memory_entries = memory_entries
+        self.disk = disk
+        self._memory: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()  # searches embed from worker threads
+        self._hits = {
+            layer: CACHE_HITS.labels(cache=self.name, layer=layer) for layer in ("memory", "disk")
+        }
+        self._misses = CACHE_MISSES.labels(cache=self.name)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get_many(
+        self, keys: Sequence[bytes], dim: int, *, disk: bool = True
+    ) -> list[np.ndarray | None]:
+        out: list[np.ndarray | None] = [None] * len(keys)
+        cold: list[int] = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                vec = self._memory.get(key)
+                if vec is None:
+                    cold.append(i)
+                else:
+                    self._memory.move_to_end(key)
+                    out[i] = vec
+        self._hits["memory"].inc(len(keys) - len(cold))
+        if not cold or not disk or self.disk is None:
+            self._misses.inc(len(cold))
+            return out
+        found = self.disk.get_many([keys[i] for i in cold])
+        promoted = 0
+        with self._lock:
+            for i in cold:
+                blob = found.get(keys[i])
+                if blob is not None and len(blob) == dim * 4:  # other width: other model
+                    vec = out[i] = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(keys[i], vec)
+                    promoted += 1
+        self._hits["disk"].inc(promoted)
+        self._misses.inc(len(cold) - promoted)
+        return out
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray, *, disk: bool = True) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            for key, vec in zip(keys, vectors, strict=True):
+                self._remember(key, vec.copy())
+        if disk and self.disk is not None:
+            evicted = self.disk.put_many(
+                [(k, v.tobytes()) for k, v in zip(keys, vectors, strict=True)]
+            )
+            if evicted:
+                CACHE_EVICTIONS.labels(cache=self.name, reason="disk_capacity").inc(evicted)
+        self._publish()
+
+    def _remember(self, key: bytes, vec: np.ndarray) -> None:
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._memory[key] = vec
+        self._bytes += vec.nbytes
+        while len(self._memory) > self.memory_entries:
+            _, evicted = self._memory.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            CACHE_EVICTIONS.labels(cache=self.name, reason="lru").inc()
+
+    def _publish(self) -> None:
+        CACHE_ENTRIES.labels(cache=self.name).set(len(self._memory))
+        CACHE_BYTES.labels(cache=self.name).set(self._bytes)
+
+
+class CachedEmbedder:
+    """
+    ``Embedder`` that serves repeated texts from an ``EmbeddingCache``; with
+    ``disk=False``, from its memory tier only (for callers on the event loop).
+    """
+
+    def __init__(self, embedder: Embedder, cache: EmbeddingCache, *, disk: bool = True) -> None:
+        self.inner = embedder
+        self.cache = cache
+        self.disk = disk
+        self.dim = embedder.dim
+        self.model_id = embedder.model_id
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        keys = [content_key(t, self.model_id) for t in texts]
+        cached = self.cache.get_many(keys, self.dim, disk=self.disk)
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        todo: dict[bytes, list[int]] = {}  # duplicates in one batch are embedded once
+        for i, vec in enumerate(cached):
+            if vec is None:
+                todo.setdefault(keys[i], []).append(i)
+            else:
+                out[i] = vec
+        if todo:
+            rows = [positions[0] for positions in todo.values()]
+            fresh = self.inner.embed([texts[i] for i in rows])
+            for vec, positions in zip(fresh, todo.values(), strict=True):
+                out[positions] = vec
+            self.cache.put_many(list(todo), fresh, disk=self.disk)
+        return out
+
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Process-wide embedding cache; None when disabled."""
+    from ..app.settings import settings
+
+    if not settings.embed_cache_enabled:
+        return None
+    path = settings.embed_cache_path
+    disk = SqliteVectorStore(path, settings.embed_cache_max_entries) if path else None
+    return EmbeddingCache(settings.embed_cache_memory_entries, disk)
@@ -0,0 +1,28 @@
+import asyncio
+
+
+class FixedCostBackend:
+    """
+    Local stand-in for a batched inference backend (embeddings, generation).
+
+    Each call costs ``call_ms`` (network round trip, kernel launch, ...) plus
+    ``item_ms`` per item, so batching amortises the fixed part. ``max_concurrency``
+    models a backend that can only serve so many calls at once.
+    """
+
+    def __init__(self, call_ms: float = 5.0, item_ms: float = 0.1, max_concurrency: int = 4):
+        self.call_ms = call_ms
+        self.item_ms = item_ms
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.calls = 0
+        self.items = 0
+
+    async def run_batch(self, items: list[str]) -> list[str]:
+        async with self._slots:
+            self.calls += 1
+            self.items += len(items)
+            await asyncio.sleep((self.call_ms + self.item_ms * len(items)) / 1000.0)
+            return [f"out:{x}" for x in items]
+
+    async def run_one(self, item: str) -> str:
+        return (await self.run_batch([item]))[0]
@@ -0,0 +1,149 @@
+import asyncio
+import contextvars
+import time
+from collections import deque
+from typing import Awaitable, Callable, Generic, Sequence, TypeVar
+
+import structlog
+
+from ..observability.resilience_metrics import BATCH_QUEUE_WAIT, BATCH_SIZE
+from ..resilience import deadline
+from ..resilience.policies import DeadlineExceeded, with_bulkhead, with_timeout
+
+T = TypeVar("T")
+R = TypeVar("R")
+log = structlog.get_logger()
+
+BatchFn = Callable[[list[T]], Awaitable[Sequence[R]]]
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Dynamic micro-batcher: coalesces concurrent single-item ``submit`` calls into one
+    ``batch_fn`` call of up to ``max_batch_size`` items, waiting at most ``max_wait_ms``
+    after the first item for the batch to fill. Each caller gets its own result (or
+    the batch's exception).
+
+    Dispatches run as separate tasks, so several batches can be in flight; pass
+    ``semaphore`` to cap them with the bulkhead and ``timeout_s`` to bound each
+    batch call with ``with_timeout``.
+
+    The runner and dispatch tasks run in empty contexts, not the first caller's: a
+    batch runs under the tightest request deadline among its callers, and callers
+    whose deadline has already passed fail without joining it.
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchFn,
+        *,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        timeout_s: float | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+        target: str = "batch",
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.timeout_s = timeout_s
+        self.semaphore = semaphore
+        self.target = target
+        self._pending: deque[tuple[T, asyncio.Future, float, float | None]] = deque()
+        self._wakeup: asyncio.Event | None = None
+        self._runner: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._runner is None or self._runner.done():
+            self._start(loop)
+        fut: asyncio.Future = loop.create_future()
+        self._pending.append((item, fut, time.perf_counter(), deadline.expires_at()))
+        assert self._wakeup is not None
+        self._wakeup.set()
+        return await fut
+
+    def _start(self, loop: asyncio.AbstractEventLoop) -> None:
+        # (Re)bind to the current loop, e.g. after a test client created a fresh one
+        self._loop = loop
+        self._pending.clear()
+        self._wakeup = asyncio.Event()
+        self._runner = loop.create_task(
+            self._run(), name=f"micro-batcher:{self.target}", context=contextvars.Context()
+        )
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                flush_at = self._pending[0][2] + self.max_wait_s
+                while len(self._pending) < self.max_batch_size:
+                    remaining = flush_at - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    self._wakeup.clear()
+                batch = [
+                    self._pending.popleft()
+                    for _ in range(min(self.max_batch_size, len(self._pending)))
+                ]
+                task = asyncio.create_task(self._dispatch(batch), context=contextvars.Context())
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list[tuple[T, asyncio.Future, float, float | None]]) -> None:
+        now = time.monotonic()
+        live = []
+        for entry in batch:
+            fut, expires = entry[1], entry[3]
+            if fut.cancelled():
+                continue
+            if expires is not None and expires <= now:
+                fut.set_exception(DeadlineExceeded("request deadline already passed"))
+                continue
+            live.append(entry)
+        if not live:
+            return
+        now = time.perf_counter()
+        for _, _, enqueued, _ in live:
+            BATCH_QUEUE_WAIT.labels(target=self.target).observe(now - enqueued)
+        BATCH_SIZE.labels(target=self.target).observe(len(live))
+        deadlines = [expires for _, _, _, expires in live if expires is not None]
+        if deadlines:  # this task's own context: set for the batch call only
+            deadline.set_deadline(min(deadlines) - time.monotonic())
+
+        call: Awaitable[Sequence[R]] = self.batch_fn([item for item, _, _, _ in live])
+        if self.timeout_s is not None:
+            call = with_timeout(call, timeout_s=self.timeout_s)
+        if self.semaphore is not None:
+            call = with_bulkhead(call, self.semaphore)
+        try:
+            results = await call
+            if len(results) != len(live):
+                raise ValueError(f"batch_fn returned {len(results)} results for {len(live)}")
+        except Exception as e:
+            for _, fut, _, _ in live:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut, _, _), result in zip(live, results, strict=True):
+            if not fut.done():
+                fut.set_result(result)
+
+    async def aclose(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+        for _, fut, _, _ in self._pending:
+            fut.cancel()
+        self._pending.clear()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
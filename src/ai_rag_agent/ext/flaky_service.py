@@ -1,14 +1,26 @@
 import asyncio
+import random
 
 
-async def flaky_op(mode: str = "ok", sleep_ms: int = 0, fail_times: int = 0, key: str = "global"):
+async def flaky_op(
+    mode: str = "ok",
+    sleep_ms: int = 0,
+    fail_times: int = 0,
+    key: str = "global",
+    tail_ms: int = 0,
+    tail_p: float = 0.05,
+):
     """
     Demo external operation:
       - mode="ok": returns "ok" after optional sleep
       - mode="slow": sleeps then returns
       - mode="fail": raises
       - mode="fail_then_ok": fails 'fail_times' calls (per key) then succeeds
+      - mode="long_tail": sleeps 'sleep_ms', but 'tail_ms' for a 'tail_p' fraction of calls
     """
+    if mode == "long_tail":
+        await asyncio.sleep((tail_ms if random.random() < tail_p else sleep_ms) / 1000.0)
+        return {"status": "ok"}
     await asyncio.sleep(max(sleep_ms, 0) / 1000.0)
     if mode == "ok" or mode == "slow":
         return {"status": "ok"}
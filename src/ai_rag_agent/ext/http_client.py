@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Mapping
+
+import httpx
+import structlog
+
+from ..observability.http_metrics import (
+    UPSTREAM_CONNECTIONS,
+    UPSTREAM_CONNECTIONS_REUSED,
+    UPSTREAM_REQUESTS,
+)
+from ..resilience.policies import measured_call
+
+if TYPE_CHECKING:
+    from ..app.settings import UpstreamConfig
+
+log = structlog.get_logger()
+
+
+class UpstreamStatusError(RuntimeError):
+    """The upstream answered 5xx; a RuntimeError, so the breaker counts it as a failure."""
+
+    def __init__(self, upstream: str, response: httpx.Response) -> None:
+        super().__init__(f"{upstream}: HTTP {response.status_code}")
+        self.upstream = upstream
+        self.response = response
+
+
+class _ConnectionTrace:
+    # httpcore trace hook: did this request open a connection or reuse a pooled one?
+    def __init__(self) -> None:
+        self.opened = False
+        self.sent = False
+
+    async def __call__(self, event: str, info: dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.started":
+            self.opened = True
+        elif event.endswith("send_request_headers.started"):
+            self.sent = True
+
+
+class UpstreamClient:
+    """
+    Long-lived pooled ``httpx.AsyncClient`` for one upstream, named like its resilience
+    target. Connections are kept alive (up to ``max_keepalive_connections`` idle, for
+    ``keepalive_expiry_s``) and capped at ``max_connections``, so steady traffic pays
+    the TCP/TLS handshake once per connection rather than once per call.
+
+    Every request is one ``measured_call`` on the target: limiter slot, breaker,
+    timeout and latency metrics. A 5xx raises ``UpstreamStatusError``, which the
+    breaker counts; other responses are returned as they are.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: UpstreamConfig,
+        *,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.name = name
+        self.config = config
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._requests = {
+            status: UPSTREAM_REQUESTS.labels(upstream=name, status=status)
+            for status in ("1xx", "2xx", "3xx", "4xx", "5xx")
+        }
+        self._opened = UPSTREAM_CONNECTIONS.labels(upstream=name)
+        self._reused = UPSTREAM_CONNECTIONS_REUSED.labels(upstream=name)
+
+    def _build(self) -> httpx.AsyncClient:
+        http2 = self.config.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                log.warning("http2_unavailable", upstream=self.name, hint="pip install h2")
+                http2 = False
+        cfg = self.config
+        return httpx.AsyncClient(
+            base_url=cfg.base_url,
+            limits=httpx.Limits(
+                max_connections=cfg.max_connections,
+                max_keepalive_connections=cfg.max_keepalive_connections,
+                keepalive_expiry=cfg.keepalive_expiry_s,
+            ),
+            # The whole call is bounded by the target's timeout (measured_call)
+            timeout=httpx.Timeout(None, connect=cfg.connect_timeout_s),
+            http2=http2,
+            transport=self._transport,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None:
+            self._client, self._loop = self._build(), loop
+        elif self._loop is not loop:
+            # Pooled connections belong to the loop that opened them and can only be
+            # closed there: replacing the client would leak them (and their sockets)
+            raise RuntimeError(
+                f"upstream {self.name!r}: client is open on another event loop; "
+                "aclose() it on that loop first"
+            )
+        return self._client
+
+    async def request(
+        self, method: str, url: str, *, timeout_s: float | None = None, **kwargs: Any
+    ) -> httpx.Response:
+        client = self.client  # outside measured_call: misuse is not an upstream failure
+        return await measured_call(self.name, self._send(client, method, url, kwargs), timeout_s)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def _send(
+        self, client: httpx.AsyncClient, method: str, url: str, kwargs: dict[str, Any]
+    ) -> httpx.Response:
+        trace = _ConnectionTrace()
+        kwargs["extensions"] = {**kwargs.get("extensions", {}), "trace": trace}
+        try:
+            response = await client.request(method, url, **kwargs)
+        finally:
+            if trace.opened:
+                self._opened.inc()
+            elif trace.sent:  # (transports without httpcore report neither)
+                self._reused.inc()
+        self._requests[f"{min(response.status_code // 100, 5)}xx"].inc()
+        if response.status_code >= 500:
+            raise UpstreamStatusError(self.name, response)
+        return response
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            client, self._client, self._loop = self._client, None, None
+            await client.aclose()
+
+
+class UpstreamClients:
+    """Configured upstreams -> UpstreamClient, each built on first use."""
+
+    def __init__(self, configs: Mapping[str, UpstreamConfig]) -> None:
+        self.configs = dict(configs)
+        self._clients: dict[str, UpstreamClient] = {}
+
+    def get(self, name: str) -> UpstreamClient:
+        client = self._clients.get(name)
+        if client is None:
+            if name not in self.configs:
+                raise KeyError(f"unknown upstream {name!r} (configure it in APP_UPSTREAMS)")
+            client = self._clients[name] = UpstreamClient(name, self.configs[name])
+        return client
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(c.aclose() for c in self._clients.values()))
+
+
+@lru_cache(maxsize=1)
+def get_upstream_clients() -> UpstreamClients:
+    from ..app.settings import settings
+
+    return UpstreamClients(settings.upstreams)
+
+
+async def close_upstream_clients() -> None:
+    if get_upstream_clients.cache_info().currsize:
+        await get_upstream_clients().aclose()
@@ -0,0 +1,41 @@
+import asyncio
+import json
+
+
+class StubUpstream:
+    """
+    Local stand-in for an HTTP model server (embeddings, generation), as a bare ASGI app.
+
+    Every request waits ``latency_ms`` and answers ``{"ok": true, "path": ...}``;
+    ``/status/<code>`` answers with that status instead. ``connections`` collects the
+    client (host, port) pairs seen, i.e. the TCP connections callers opened.
+    """
+
+    def __init__(self, latency_ms: float = 2.0) -> None:
+        self.latency_s = latency_ms / 1000.0
+        self.requests = 0
+        self.connections: set[tuple[str, int]] = set()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            while (await receive())["type"] != "lifespan.shutdown":
+                await send({"type": "lifespan.startup.complete"})
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+        self.requests += 1
+        if scope.get("client"):
+            self.connections.add(tuple(scope["client"]))
+        while (await receive()).get("more_body"):
+            pass
+        await asyncio.sleep(self.latency_s)
+        path = scope["path"]
+        status = int(path.rsplit("/", 1)[1]) if path.startswith("/status/") else 200
+        body = json.dumps({"ok": status < 400, "path": path}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
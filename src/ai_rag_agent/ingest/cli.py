@@ -0,0 +1,70 @@
+import argparse
+
+from ..app.settings import settings
+from ..cache.embedding_cache import EmbeddingCache, SqliteVectorStore
+from ..observability.logging import setup_logging
+from ..storage.store import build_document_store
+from .pipeline import DEFAULT_PATTERNS, ingest
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(
+        prog="rag-ingest", description="Chunk, embed and index a directory of documents."
+    )
+    ap.add_argument("root", help="directory to walk")
+    ap.add_argument(
+        "--index-dir", default=settings.index_dir, help="output index (default: $APP_INDEX_DIR)"
+    )
+    ap.add_argument("--kind", default="flat", choices=["flat", "ivf", "int8", "binary"])
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--batch-size", type=int, default=256)
+    ap.add_argument("--workers", type=int, default=None, help="embedding processes (0=inline)")
+    ap.add_argument("--pattern", action="append", help=f"glob(s), default {DEFAULT_PATTERNS}")
+    ap.add_argument("--max-chars", type=int, default=1200)
+    ap.add_argument("--overlap", type=int, default=200)
+    ap.add_argument(
+        "--embed-cache",
+        default=settings.embed_cache_path,
+        help="SQLite embedding cache shared with the server (default: $APP_EMBED_CACHE_PATH)",
+    )
+    ap.add_argument(
+        "--store",
+        default=settings.store_backend,
+        choices=["none", "sqlite", "postgres"],
+        help="also write chunks and vectors to this document store (default: $APP_STORE_BACKEND)",
+    )
+    ap.add_argument(
+        "--metrics-port", type=int, default=None, help="serve Prometheus /metrics while running"
+    )
+    args = ap.parse_args(argv)
+    if not args.index_dir:
+        ap.error("--index-dir is required when APP_INDEX_DIR is not set")
+
+    setup_logging()
+    if args.metrics_port:
+        from prometheus_client import start_http_server
+
+        start_http_server(args.metrics_port)
+
+    ingest(
+        args.root,
+        args.index_dir,
+        kind=args.kind,
+        dim=args.dim,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        patterns=tuple(args.pattern or DEFAULT_PATTERNS),
+        max_chars=args.max_chars,
+        overlap=args.overlap,
+        embed_cache=EmbeddingCache(
+            settings.embed_cache_memory_entries,
+            SqliteVectorStore(args.embed_cache, settings.embed_cache_max_entries),
+        )
+        if args.embed_cache
+        else None,
+        store=build_document_store(args.store),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Streaming corpus ingestion: walk -> read -> chunk -> hash -> embed (batched, process
+pool) -> bulk index write (and bulk document-store write).
+
+Every stage is a generator, so only the batches currently in flight are held in memory
+besides the output vectors. Chunks whose content hash is already in the previous index
+reuse its stored vector instead of being re-embedded; with an embedding cache, so do
+chunks embedded by any earlier run (or query) with the same model.
+"""
+
+import asyncio
+import os
+import re
+import shutil
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+import structlog
+
+from ..cache.embedding_cache import EmbeddingCache, content_key
+from ..observability.ingest_metrics import (
+    INGEST_BYTES,
+    INGEST_CHUNKS,
+    INGEST_CHUNKS_PER_SECOND,
+    INGEST_DOCUMENTS,
+    INGEST_EMBED_BATCH_SECONDS,
+    INGEST_MB_PER_SECOND,
+    INGEST_RUNNING,
+)
+from ..retrieval.bm25 import BM25Index
+from ..retrieval.chunks import Chunk, ChunkStore
+from ..retrieval.embedder import HashingEmbedder
+from ..retrieval.ivf import IVFIndex
+from ..retrieval.service import Retriever, build_index
+from ..storage.store import DocumentStore
+
+log = structlog.get_logger()
+
+DEFAULT_PATTERNS = ("*.md", "*.txt", "*.rst")
+STORE_BATCH = 5000  # chunks per bulk document-store write
+_PARA_RE = re.compile(r"\n\s*\n")
+
+
+@dataclass(frozen=True)
+class Document:
+    doc_id: str
+    text: str
+    nbytes: int
+
+
+@dataclass
+class IngestStats:
+    documents: int = 0
+    bytes: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    reused: int = 0
+    cached: int = 0
+    stored: int = 0
+    pruned: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_s(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes / 2**20 / self.seconds if self.seconds else 0.0
+
+    def tick(self) -> None:
+        self.seconds = time.perf_counter() - self.started
+        INGEST_CHUNKS_PER_SECOND.set(self.chunks_per_s)
+        INGEST_MB_PER_SECOND.set(self.mb_per_s)
+
+
+# --- Stages ---
+def iter_documents(root: Path, patterns: Sequence[str] = DEFAULT_PATTERNS) -> Iterator[Document]:
+    paths = sorted({p for pattern in patterns for p in root.rglob(pattern) if p.is_file()})
+    for path in paths:
+        raw = path.read_bytes()
+        yield Document(
+            doc_id=path.relative_to(root).as_posix(),
+            text=raw.decode("utf-8", errors="replace"),
+            nbytes=len(raw),
+        )
+
+
+def split_text(text: str, max_chars: int = 1200, overlap: int = 200) -> Iterator[str]:
+    """Pack paragraphs into chunks of at most ``max_chars``; split oversized ones."""
+    buf = ""
+    for para in (p.strip() for p in _PARA_RE.split(text)):
+        if not para:
+            continue
+        if len(para) > max_chars:
+            if buf:
+                yield buf
+                buf = ""
+            step = max(1, max_chars - overlap)
+            for start in range(0, len(para), step):
+                yield para[start : start + max_chars]
+                if start + max_chars >= len(para):
+                    break
+            continue
+        if buf and len(buf) + 2 + len(para) > max_chars:
+            yield buf
+            buf = ""
+        buf = f"{buf}\n\n{para}" if buf else para
+    if buf:
+        yield buf
+
+
+def content_hash(text: str, model_id: str) -> str:
+    """Hash of whitespace-normalised text, namespaced by embedding model."""
+    return content_key(text, model_id).hex()
+
+
+def iter_chunks(
+    docs: Iterable[Document], model_id: str, stats: IngestStats, **split_kw
+) -> Iterator[Chunk]:
+    for doc in docs:
+        stats.documents += 1
+        stats.bytes += doc.nbytes
+        INGEST_DOCUMENTS.inc()
+        INGEST_BYTES.inc(doc.nbytes)
+        for n, text in enumerate(split_text(doc.text, **split_kw)):
+            yield Chunk(
+                id=f"{doc.doc_id}#{n}",
+                doc_id=doc.doc_id,
+                text=text,
+                content_hash=content_hash(text, model_id),
+            )
+
+
+def batched(items: Iterable[Chunk], size: int) -> Iterator[list[Chunk]]:
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def embed_texts(texts: list[str], dim: int) -> tuple[np.ndarray, float]:
+    """Process-pool task (module-level so it pickles)."""
+    t0 = time.perf_counter()
+    vectors = HashingEmbedder(dim=dim).embed(texts)
+    return vectors, time.perf_counter() - t0
+
+
+class _InlineExecutor(Executor):
+    """Runs tasks in the calling thread (``workers=0``: tests, single-core boxes)."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        fut: Future = Future()
+        fut.set_result(fn(*args, **kwargs))
+        return fut
+
+
+# --- Driver ---
+def _previous(index_dir: Path, model_id: str) -> tuple[Retriever | None, dict[str, int]]:
+    if not (index_dir / "meta.json").exists():
+        return None, {}
+    try:
+        prev = Retriever.load(index_dir, mmap=True)
+    except ValueError as e:
+        log.warning("ingest_previous_index_unusable", error=str(e))
+        return None, {}
+    if prev.embedder.model_id != model_id:
+        return prev, {}
+    return prev, {h: row for row, h in enumerate(prev.chunks.hashes) if h}
+
+
+async def _store_chunks(store: DocumentStore, chunks: list[Chunk], vectors: np.ndarray) -> int:
+    for start in range(0, len(chunks), STORE_BATCH):
+        end = start + STORE_BATCH
+        await store.put_chunks(chunks[start:end], vectors[start:end])
+    return len(chunks)
+
+
+def _swap_in(staging: Path, target: Path) -> None:
+    """Replace ``target`` with ``staging``. Open memmaps keep the old inodes alive."""
+    backup = target.with_name(target.name + ".old")
+    if backup.exists():
+        shutil.rmtree(backup)
+    if target.exists():
+        target.rename(backup)
+    staging.rename(target)
+    if backup.exists():
+        shutil.rmtree(backup)
+
+
+def ingest(
+    root: str | Path,
+    index_dir: str | Path,
+    *,
+    kind: str = "flat",
+    dim: int = 256,
+    batch_size: int = 256,
+    workers: int | None = None,
+    patterns: Sequence[str] = DEFAULT_PATTERNS,
+    max_chars: int = 1200,
+    overlap: int = 200,
+    embed_cache: EmbeddingCache | None = None,
+    store: DocumentStore | None = None,
+) -> IngestStats:
+    """
+    Ingest every matching file under ``root`` into a fresh index at ``index_dir``.
+
+    ``workers=None`` uses one process per CPU; ``workers=0`` embeds inline. The new index
+    is written to a staging directory and swapped in only once complete. Chunks not in
+    the previous index are looked up in ``embed_cache`` (one bulk lookup per batch), and
+    freshly embedded vectors are added to it. With a ``store``, chunks and vectors are
+    upserted into it before the swap and chunks gone from the corpus deleted after it,
+    so the live index never returns an id the store lacks.
+    """
+    root, index_dir = Path(root), Path(index_dir)
+    embedder = HashingEmbedder(dim=dim)
+    stats = IngestStats()
+    prev, known = _previous(index_dir, embedder.model_id)
+
+    chunks_out: list[Chunk] = []
+    blocks: list[np.ndarray] = []
+    inflight: deque[tuple[list[Chunk], np.ndarray, np.ndarray, Future | None]] = deque()
+    n_workers = workers if workers is not None else (os.cpu_count() or 1)
+    executor: Executor = ProcessPoolExecutor(n_workers) if n_workers else _InlineExecutor()
+    max_inflight = 2 * max(n_workers, 1)  # bounded: backpressure on the file walk
+    last_log = 0.0
+
+    def drain_one() -> None:
+        nonlocal last_log
+        batch, vectors, todo, fut = inflight.popleft()
+        if fut is not None:
+            fresh, secs = fut.result()
+            vectors[todo] = fresh
+            INGEST_EMBED_BATCH_SECONDS.observe(secs)
+            if embed_cache is not None:
+                embed_cache.put_many([bytes.fromhex(batch[i].content_hash) for i in todo], fresh)
+        chunks_out.extend(batch)
+        blocks.append(vectors)
+        stats.chunks += len(batch)
+        stats.tick()
+        if stats.seconds - last_log >= 5.0:
+            last_log = stats.seconds
+            log.info(
+                "ingest_progress",
+                documents=stats.documents,
+                chunks=stats.chunks,
+                chunks_per_s=round(stats.chunks_per_s, 1),
+                mb_per_s=round(stats.mb_per_s, 2),
+            )
+
+    INGEST_RUNNING.set(1)
+    try:
+        with executor:
+            docs = iter_documents(root, patterns)
+            stream = iter_chunks(
+                docs, embedder.model_id, stats, max_chars=max_chars, overlap=overlap
+            )
+            for batch in batched(stream, batch_size):
+                vectors = np.empty((len(batch), dim), dtype=np.float32)
+                rows = np.array([known.get(c.content_hash, -1) for c in batch], dtype=np.int64)
+                hit = rows >= 0
+                if hit.any():
+                    assert prev is not None
+                    vectors[hit] = prev.index.reconstruct(rows[hit])
+                todo = np.flatnonzero(~hit)
+                cached = 0
+                if embed_cache is not None and len(todo):
+                    keys = [bytes.fromhex(batch[i].content_hash) for i in todo]
+                    found = embed_cache.get_many(keys, dim)
+                    known_vecs = [j for j, vec in enumerate(found) if vec is not None]
+                    for j in known_vecs:
+                        vectors[todo[j]] = found[j]
+                    cached = len(known_vecs)
+                    missing = [i for i, vec in zip(todo, found, strict=True) if vec is None]
+                    todo = np.array(missing, dtype=np.int64)
+                fut = (
+                    executor.submit(embed_texts, [batch[i].text for i in todo], dim)
+                    if len(todo)
+                    else None
+                )
+                inflight.append((batch, vectors, todo, fut))
+                stats.reused += int(hit.sum())
+                stats.cached += cached
+                stats.embedded += len(todo)
+                INGEST_CHUNKS.labels(outcome="reused").inc(int(hit.sum()))
+                INGEST_CHUNKS.labels(outcome="cached").inc(cached)
+                INGEST_CHUNKS.labels(outcome="embedded").inc(len(todo))
+                while len(inflight) >= max_inflight:
+                    drain_one()
+            while inflight:
+                drain_one()
+
+        vectors = np.concatenate(blocks) if blocks else np.zeros((0, dim), np.float32)
+        if kind == IVFIndex.kind and prev is not None and prev.index.kind == kind and known:
+            # Keep the trained centroids; new vectors are just assigned to lists
+            index = IVFIndex.empty(prev.index.centroids)
+            index.add(vectors)
+        else:
+            index = build_index(kind, vectors)
+
+        staging = index_dir.with_name(index_dir.name + ".staging")
+        if staging.exists():
+            shutil.rmtree(staging)
+        lexical = BM25Index.build(c.text for c in chunks_out)
+        Retriever(embedder, index, ChunkStore.from_chunks(chunks_out), lexical).save(staging)
+        if store is None:
+            _swap_in(staging, index_dir)
+        else:
+            with asyncio.Runner() as runner:
+                stats.stored = runner.run(_store_chunks(store, chunks_out, vectors))
+                _swap_in(staging, index_dir)
+                stats.pruned = runner.run(store.retain({c.id for c in chunks_out}))
+                runner.run(store.aclose())
+    finally:
+        INGEST_RUNNING.set(0)
+
+    stats.tick()
+    log.info(
+        "ingest_done",
+        index_dir=str(index_dir),
+        documents=stats.documents,
+        chunks=stats.chunks,
+        embedded=stats.embedded,
+        reused=stats.reused,
+        cached=stats.cached,
+        stored=stats.stored,
+        pruned=stats.pruned,
+        seconds=round(stats.seconds, 2),
+        chunks_per_s=round(stats.chunks_per_s, 1),
+        mb_per_s=round(stats.mb_per_s, 2),
+    )
+    return stats
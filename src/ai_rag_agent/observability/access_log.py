@@ -1,38 +1,74 @@
 # src/ai_rag_agent/observability/access_log.py
-import time
+import random
 
 import structlog
-from opentelemetry import trace  # <-- add
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.types import Scope
+
+from ..app.settings import settings
+from .log_metrics import ACCESS_LOG_SAMPLED_OUT
 
 logger = structlog.get_logger()
 
 
-class AccessLogMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start = time.perf_counter()
-        response = await call_next(request)
-        duration_ms = (time.perf_counter() - start) * 1000.0
-
-        # Prefer the ID set by RequestIDMiddleware; fall back to inbound header if needed
-        req_id = response.headers.get("x-request-id") or request.headers.get("x-request-id")
-
-        # Attach the request_id (and optionally other fields) to the active span
-        span = trace.get_current_span()
-        if span is not None and span.is_recording():
-            span.set_attribute("request_id", req_id or "")
-            # Optional: avoid duplicating attrs OpenTelemetry FastAPI instrumentation already sets
-            # span.set_attribute("http.duration_ms", round(duration_ms, 2))
-
-        # Log a single JSON line for the request
-        logger.info(
-            "http_access",
-            method=request.method,
-            path=request.url.path,
-            status_code=response.status_code,
-            duration_ms=round(duration_ms, 2),
-            user_agent=request.headers.get("user-agent"),
-            request_id=req_id,  # explicit; also present via structlog contextvars
-        )
-        return response
+def tag_span(request_id: str) -> None:
+    """Attach the request_id to the active span (no-op when tracing is off)."""
+    if not settings.enable_tracing:
+        return
+    from opentelemetry import trace
+
+    span = trace.get_current_span()
+    if span is not None and span.is_recording():
+        span.set_attribute("request_id", request_id)
+
+
+def header(scope: Scope, name: bytes) -> str | None:
+    """First value of a request header from an ASGI scope; ``name`` is lower-case."""
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def sample_rate(status_code: int, duration_s: float) -> float:
+    """Probability of logging a request: errors and slow requests are always kept."""
+    if status_code >= 400 or duration_s * 1000.0 >= settings.access_log_slow_ms:
+        return 1.0
+    return settings.access_log_sample_rate
+
+
+def log_access(
+    scope: Scope,
+    *,
+    request_id: str,
+    status_code: int,
+    duration_s: float,
+    ttfb_s: float | None,
+    bytes_sent: int,
+) -> None:
+    """
+    Log a single JSON line for the request.
+
+    ``duration_ms`` covers the full response, including every streamed body chunk;
+    ``ttfb_ms`` is the time until the first body chunk was handed to the server.
+    Successful fast requests are sampled (see ``sample_rate``); sampled lines carry
+    ``sample_rate`` so counts can be re-weighted downstream.
+    """
+    rate = sample_rate(status_code, duration_s)
+    extra = {}
+    if rate < 1.0:
+        if random.random() >= rate:
+            ACCESS_LOG_SAMPLED_OUT.inc()
+            return
+        extra["sample_rate"] = rate
+    logger.info(
+        "http_access",
+        method=scope.get("method"),
+        path=scope.get("path"),
+        status_code=status_code,
+        duration_ms=round(duration_s * 1000.0, 2),
+        ttfb_ms=round(ttfb_s * 1000.0, 2) if ttfb_s is not None else None,
+        bytes_sent=bytes_sent,
+        user_agent=header(scope, b"user-agent"),
+        request_id=request_id,  # explicit; also present via structlog contextvars
+        **extra,
+    )
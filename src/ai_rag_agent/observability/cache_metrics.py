@@ -0,0 +1,12 @@
+from prometheus_client import Counter, Gauge
+
+CACHE_HITS = Counter("cache_hits_total", "Cache hits", ["cache", "layer"])
+CACHE_MISSES = Counter("cache_misses_total", "Cache misses", ["cache"])
+CACHE_EVICTIONS = Counter("cache_evictions_total", "Cache evictions", ["cache", "reason"])
+# Summed over live workers under rag-serve (each worker has its own caches)
+CACHE_ENTRIES = Gauge(
+    "cache_entries", "Entries currently cached", ["cache"], multiprocess_mode="livesum"
+)
+CACHE_BYTES = Gauge(
+    "cache_bytes", "Estimated bytes held by the cache", ["cache"], multiprocess_mode="livesum"
+)
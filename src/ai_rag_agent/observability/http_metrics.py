@@ -0,0 +1,15 @@
+from prometheus_client import Counter
+
+UPSTREAM_REQUESTS = Counter(
+    "upstream_http_requests_total", "HTTP requests to upstreams", ["upstream", "status"]
+)
+UPSTREAM_CONNECTIONS = Counter(
+    "upstream_http_connections_opened_total",
+    "New TCP connections opened to upstreams",
+    ["upstream"],
+)
+UPSTREAM_CONNECTIONS_REUSED = Counter(
+    "upstream_http_connections_reused_total",
+    "Requests sent on an already open keep-alive connection",
+    ["upstream"],
+)
@@ -0,0 +1,13 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+INGEST_DOCUMENTS = Counter("ingest_documents_total", "Documents read by ingestion")
+INGEST_BYTES = Counter("ingest_bytes_total", "Document bytes read by ingestion")
+INGEST_CHUNKS = Counter(
+    "ingest_chunks_total", "Chunks processed by ingestion", ["outcome"]
+)  # outcome: embedded | reused (previous index) | cached (embedding cache)
+INGEST_CHUNKS_PER_SECOND = Gauge("ingest_chunks_per_second", "Ingestion throughput (chunks/s)")
+INGEST_MB_PER_SECOND = Gauge("ingest_megabytes_per_second", "Ingestion throughput (MB/s)")
+INGEST_EMBED_BATCH_SECONDS = Histogram(
+    "ingest_embed_batch_seconds", "Wall time to embed one ingestion batch"
+)
+INGEST_RUNNING = Gauge("ingest_running", "1 while an ingestion run is in progress")
@@ -0,0 +1,10 @@
+from prometheus_client import Counter
+
+LOG_LINES_WRITTEN = Counter("log_lines_written_total", "Log lines written by the log sink")
+LOG_LINES_DROPPED = Counter(
+    "log_lines_dropped_total", "Log lines dropped (sink buffer full or stream unwritable)"
+)
+LOG_BATCHES = Counter("log_batches_total", "Batched writes made by the log sink")
+ACCESS_LOG_SAMPLED_OUT = Counter(
+    "access_log_sampled_out_total", "Access log lines skipped by sampling"
+)
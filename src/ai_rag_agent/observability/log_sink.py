@@ -0,0 +1,118 @@
+import atexit
+import json
+import sys
+import threading
+from collections import deque
+from typing import Any, TextIO
+
+import structlog
+
+from .log_metrics import LOG_BATCHES, LOG_LINES_DROPPED, LOG_LINES_WRITTEN
+
+
+class QueueLogSink:
+    """
+    Bounded, drop-oldest buffer of log events, rendered and written by one thread.
+
+    ``put`` only appends the event dict to a deque: JSON rendering and the write to
+    ``stream`` (which may block when stdout is backpressured) happen in the writer
+    thread, in batches of up to ``batch_size`` lines per ``write``/``flush``. When
+    ``max_lines`` events are already waiting, the oldest is dropped and counted in
+    ``log_lines_dropped_total``. ``close`` (also registered with ``atexit``) drains
+    what is left.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO = sys.stdout,
+        *,
+        max_lines: int = 10_000,
+        batch_size: int = 256,
+        flush_interval_s: float = 0.05,
+        renderer: Any = None,
+    ) -> None:
+        self.stream = stream
+        self.max_lines = max_lines
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.render = renderer or structlog.processors.JSONRenderer()
+        self.dropped = 0
+        self._events: deque[dict[str, Any]] = deque()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._lock = threading.Lock()  # serialises drains (writer thread vs close)
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, event: dict[str, Any]) -> None:
+        if len(self._events) >= self.max_lines:
+            try:
+                self._events.popleft()
+            except IndexError:  # drained by the writer meanwhile
+                pass
+            else:
+                self.dropped += 1
+                LOG_LINES_DROPPED.inc()
+        self._events.append(event)
+        if self._closed:  # writer stopped (interpreter shutdown): write inline
+            self._drain()
+        elif len(self._events) >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval_s)
+            self._wakeup.clear()
+            self._drain()
+
+    def _drain(self) -> None:
+        with self._lock:
+            while self._events:
+                lines: list[str] = []
+                while self._events and len(lines) < self.batch_size:
+                    event = self._events.popleft()
+                    try:
+                        lines.append(str(self.render(None, "", event)))
+                    except Exception as e:  # one bad event must not stop the writer
+                        lines.append(json.dumps({"message": "log_render_failed", "error": str(e)}))
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except (OSError, ValueError):  # closed or broken stream: count as dropped
+                    LOG_LINES_DROPPED.inc(len(lines))
+                    continue
+                LOG_LINES_WRITTEN.inc(len(lines))
+                LOG_BATCHES.inc()
+
+    def flush(self) -> None:
+        self._drain()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self._drain()
+        atexit.unregister(self.close)
+
+
+class QueueLogger:
+    """structlog logger that hands the processed event dict to a ``QueueLogSink``."""
+
+    def __init__(self, sink: QueueLogSink) -> None:
+        self._sink = sink
+
+    def msg(self, **event: Any) -> None:
+        self._sink.put(event)
+
+    log = debug = info = warn = warning = error = err = critical = exception = fatal = msg
+
+
+class QueueLoggerFactory:
+    def __init__(self, sink: QueueLogSink) -> None:
+        self.sink = sink
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return QueueLogger(self.sink)
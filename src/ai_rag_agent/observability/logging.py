@@ -1,24 +1,54 @@
 import logging
 import sys
+from functools import lru_cache
+from typing import Any
 
 import structlog
 
+from .log_sink import QueueLoggerFactory, QueueLogSink
+
+
+@lru_cache(maxsize=1)
+def get_log_sink() -> QueueLogSink:
+    """Process-wide background log writer (stdout)."""
+    from ..app.settings import settings
+
+    return QueueLogSink(
+        sys.stdout,
+        max_lines=settings.log_queue_max_lines,
+        batch_size=settings.log_batch_size,
+        flush_interval_s=settings.log_flush_interval_ms / 1000.0,
+    )
+
+
+def flush_logs() -> None:
+    if get_log_sink.cache_info().currsize:
+        get_log_sink().flush()
+
 
 def setup_logging(level: str = "INFO") -> None:
+    from ..app.settings import settings
+
     timestamper = structlog.processors.TimeStamper(fmt="iso", utc=True)
+    processors: list[Any] = [
+        structlog.contextvars.merge_contextvars,  # include contextvars (e.g., request_id)
+        timestamper,
+        structlog.processors.add_log_level,
+        structlog.processors.EventRenamer("message"),
+        structlog.processors.dict_tracebacks,
+    ]
+    if settings.log_queue_enabled:
+        # The sink renders JSON in its writer thread; the event loop only enqueues
+        logger_factory: Any = QueueLoggerFactory(get_log_sink())
+    else:
+        processors.append(structlog.processors.JSONRenderer())
+        logger_factory = structlog.PrintLoggerFactory(file=sys.stdout)
 
     structlog.configure(
-        processors=[
-            structlog.contextvars.merge_contextvars,  # include contextvars (e.g., request_id)
-            timestamper,
-            structlog.processors.add_log_level,
-            structlog.processors.EventRenamer("message"),
-            structlog.processors.dict_tracebacks,
-            structlog.processors.JSONRenderer(),
-        ],
+        processors=processors,
         wrapper_class=structlog.make_filtering_bound_logger(getattr(logging, level)),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(file=sys.stdout),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
 
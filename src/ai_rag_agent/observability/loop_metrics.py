@@ -0,0 +1,10 @@
+from prometheus_client import Counter, Histogram
+
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer callback (scheduling lag)",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+LOOP_BLOCKED = Counter(
+    "event_loop_blocked_total", "Times one callback held the event loop past the threshold"
+)
@@ -0,0 +1,110 @@
+import asyncio
+import selectors
+import sys
+import threading
+import time
+import traceback
+from contextvars import Context
+
+import structlog
+
+from .loop_metrics import LOOP_BLOCKED, LOOP_LAG
+
+log = structlog.get_logger()
+
+_REQUEST_ID_VAR = "structlog_request_id"  # bound by RequestContextMiddleware
+_SELECTORS = selectors.__file__
+
+
+def _request_id(loop: asyncio.AbstractEventLoop) -> str | None:
+    # The task the loop is running right now (None for a plain callback)
+    task = asyncio.current_task(loop)
+    if task is None:
+        return None
+    get_context = getattr(task, "get_context", None)  # Task.get_context: Python 3.12+
+    if get_context is None:
+        return None
+    ctx: Context = get_context()
+    for var, value in ctx.items():
+        if var.name == _REQUEST_ID_VAR:
+            return value
+    return None
+
+
+class LoopMonitor:
+    """
+    Event-loop lag probe plus a blocking-call watchdog.
+
+    A task sleeps ``interval_s`` in a loop and records how late it woke up in
+    ``event_loop_lag_seconds``: every callback that ran in between delayed it. A daemon
+    thread checks the task's heartbeat; when the loop has not come back for
+    ``block_threshold_s`` beyond the interval, it captures the loop thread's stack (the
+    code that is blocking it, caught in the act) and logs ``event_loop_blocked`` once
+    per stall, with the ``request_id`` of the task running at the time.
+
+    Cost: one timer callback per interval on the loop and one thread wakeup per half
+    threshold; see benchmarks/bench_loop_monitor.py.
+    """
+
+    def __init__(self, interval_s: float = 0.1, block_threshold_s: float = 0.1) -> None:
+        self.interval_s = interval_s
+        self.block_threshold_s = block_threshold_s
+        self.blocked = 0
+        self._beat = time.perf_counter()
+        self._reported = 0.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread = 0
+        self._task: asyncio.Task | None = None
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._probe(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+
+    async def _probe(self) -> None:
+        interval = self.interval_s
+        while True:
+            start = time.perf_counter()
+            self._beat = start
+            await asyncio.sleep(interval)
+            LOOP_LAG.observe(max(0.0, time.perf_counter() - start - interval))
+
+    def _watch(self) -> None:
+        limit = self.interval_s + self.block_threshold_s
+        while not self._stop.wait(self.block_threshold_s / 2):
+            beat = self._beat
+            stalled = time.perf_counter() - beat
+            if stalled > limit and beat != self._reported:
+                self._reported = beat
+                self._report(stalled)
+
+    def _report(self, stalled_s: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None or frame.f_code.co_filename == _SELECTORS:
+            return  # idle in select(): the probe is just late being scheduled
+        assert self._loop is not None
+        self.blocked += 1
+        LOOP_BLOCKED.inc()
+        log.warning(
+            "event_loop_blocked",
+            blocked_ms=round((stalled_s - self.interval_s) * 1000.0, 1),
+            request_id=_request_id(self._loop),
+            stack="".join(traceback.format_stack(frame)),
+        )
@@ -1,5 +1,11 @@
+import os
+
 from prometheus_fastapi_instrumentator import Instrumentator
 
+# Under rag-serve each worker writes its own metric files: scrape-time callbacks can't
+# be read from there, so gauges must be set on every change instead
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
 
 def setup_metrics(app) -> None:
     Instrumentator().instrument(app).expose(app, endpoint="/metrics", include_in_schema=False)
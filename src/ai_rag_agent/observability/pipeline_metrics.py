@@ -0,0 +1,25 @@
+from prometheus_client import Counter, Histogram
+
+STAGE_LATENCY = Histogram(
+    "rag_stage_seconds",
+    "Latency of each /v1/answer pipeline stage",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+RERANK_CANDIDATES = Counter(
+    "rerank_candidates_total",
+    "Rerank candidates by outcome (cached, scored, or skipped by early exit)",
+    ["outcome"],
+)
+_TOKEN_BUCKETS = (0, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+CONTEXT_TOKENS = Histogram(
+    "rag_context_tokens", "Tokens packed into the prompt context", buckets=_TOKEN_BUCKETS
+)
+CONTEXT_TOKENS_SAVED = Histogram(
+    "rag_context_tokens_saved",
+    "Tokens of candidates left out of the context (near-duplicates or over budget)",
+    buckets=_TOKEN_BUCKETS,
+)
+CONTEXT_DROPPED = Counter(
+    "rag_context_dropped_total", "Candidate chunks left out of the context", ["reason"]
+)
@@ -4,4 +4,87 @@ RETRY_ATTEMPTS = Counter("external_retry_attempts_total", "Retry attempts", ["ta
 TIMEOUTS = Counter("external_timeouts_total", "Timeouts", ["target"])
 ERRORS = Counter("external_errors_total", "Errors", ["target", "kind"])
 LATENCY = Histogram("external_latency_seconds", "External op latency", ["target"])
-BREAKER_OPEN = Gauge("circuit_breaker_open", "Breaker open=1, closed=0", ["target"])
+BREAKER_OPEN = Gauge(
+    "circuit_breaker_open",
+    "Breaker open=1, closed=0",
+    ["target"],
+    multiprocess_mode="livemax",  # open in any worker
+)
+BATCH_SIZE = Histogram(
+    "external_batch_size",
+    "Items per dispatched micro-batch",
+    ["target"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+BATCH_QUEUE_WAIT = Histogram(
+    "external_batch_queue_wait_seconds",
+    "Time an item waited for its micro-batch to dispatch",
+    ["target"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+LIMITER_LIMIT = Gauge(
+    "adaptive_limiter_limit",
+    "Current adaptive concurrency limit (per worker)",
+    ["target"],
+    multiprocess_mode="liveall",
+)
+LIMITER_INFLIGHT = Gauge(
+    "adaptive_limiter_inflight",
+    "Calls holding a limiter slot",
+    ["target"],
+    multiprocess_mode="livesum",
+)
+LIMITER_QUEUE_DEPTH = Gauge(
+    "adaptive_limiter_queue_depth",
+    "Calls waiting for a limiter slot",
+    ["target"],
+    multiprocess_mode="livesum",
+)
+LIMITER_REJECTIONS = Counter(
+    "adaptive_limiter_rejections_total",
+    "Calls shed by the adaptive limiter",
+    ["target", "reason"],
+)
+HEDGES = Counter(
+    "external_hedges_total",
+    "Hedge decisions for slow calls (sent, or skipped for lack of budget)",
+    ["target", "outcome"],
+)
+HEDGE_WINS = Counter(
+    "external_hedge_wins_total",
+    "Which attempt answered first when a hedge was sent",
+    ["target", "attempt"],
+)
+RETRY_BUDGET_EXHAUSTED = Counter(
+    "external_retry_budget_exhausted_total",
+    "Retries skipped because the target's retry budget was empty",
+    ["target"],
+)
+DEADLINE_EXCEEDED = Counter(
+    "request_deadline_exceeded_total",
+    "Calls cut short or not started because the request deadline ran out",
+    ["stage"],
+)
+ADMISSION_INFLIGHT = Gauge(
+    "admission_inflight",
+    "Requests holding an admission slot, per priority class",
+    ["priority"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Requests waiting for an admission slot, per priority class",
+    ["priority"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "admission_queue_wait_seconds",
+    "Time an admitted request waited for its slot",
+    ["priority"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+ADMISSION_SHED = Counter(
+    "admission_shed_total",
+    "Requests rejected with 503 by admission control",
+    ["priority", "reason"],
+)
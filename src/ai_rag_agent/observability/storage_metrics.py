@@ -0,0 +1,27 @@
+from prometheus_client import Gauge, Histogram
+
+STORE_POOL_WAIT = Histogram(
+    "store_pool_wait_seconds",
+    "Time spent waiting for a document-store connection",
+    ["backend"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+# Saturation is in_use / max; summed over live workers under rag-serve (a pool each)
+STORE_POOL_IN_USE = Gauge(
+    "store_pool_connections_in_use",
+    "Document-store connections checked out of the pool",
+    ["backend"],
+    multiprocess_mode="livesum",
+)
+STORE_POOL_MAX = Gauge(
+    "store_pool_connections_max",
+    "Document-store pool capacity",
+    ["backend"],
+    multiprocess_mode="livesum",
+)
+STORE_QUERY_LATENCY = Histogram(
+    "store_query_seconds",
+    "Document-store operation latency (connection held)",
+    ["backend", "op"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
@@ -0,0 +1,25 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+STREAMS = Counter("stream_total", "Finished token streams by outcome", ["route", "outcome"])
+STREAMS_ACTIVE = Gauge(
+    "stream_active", "Token streams currently open", ["route"], multiprocess_mode="livesum"
+)
+STREAM_TTFT = Histogram(
+    "stream_time_to_first_token_seconds",
+    "Time from response start to the first token from the model",
+    ["route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+STREAM_TOKEN_RATE = Histogram(
+    "stream_tokens_per_second",
+    "Tokens per second over each stream (first to last token)",
+    ["route"],
+    buckets=(10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000),
+)
+STREAM_FRAMES = Histogram(
+    "stream_frames",
+    "Body frames (ASGI sends) per stream",
+    ["route"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+STREAM_TOKENS = Counter("stream_tokens_total", "Tokens streamed", ["route"])
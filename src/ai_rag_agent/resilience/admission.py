@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Mapping, NoReturn
+
+from ..observability.metrics import MULTIPROCESS
+from ..observability.resilience_metrics import (
+    ADMISSION_INFLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_QUEUE_WAIT,
+    ADMISSION_SHED,
+)
+
+if TYPE_CHECKING:
+    from ..app.settings import AdmissionClass, Settings
+
+# Liveness, readiness and scrapes: never queued, never shed
+PROBES = frozenset({"/health", "/ready", "/metrics"})
+
+
+class Shed(Exception):
+    """Admission control rejected the request; retry after ``retry_after_s``."""
+
+    def __init__(self, priority: str, reason: str, retry_after_s: float) -> None:
+        super().__init__(f"{priority}: {reason}")
+        self.priority = priority
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+    @property
+    def retry_after(self) -> int:
+        """Whole seconds, as the Retry-After header takes them."""
+        return max(1, math.ceil(self.retry_after_s))
+
+
+class PriorityClass:
+    """
+    ``concurrency`` slots and a FIFO queue of at most ``max_queue`` requests for one
+    priority class.
+
+    A slot is held for the whole request, streamed body included, and its hold time
+    feeds an EWMA (``smoothing``) of service time. A request that finds every slot
+    busy is shed at once if the queue is full, or if the estimated wait (requests
+    ahead of it, drained ``concurrency`` at a time at the smoothed service time) is
+    longer than its budget; otherwise it waits for at most its budget.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        concurrency: int,
+        max_queue: int,
+        queue_timeout_s: float,
+        smoothing: float = 0.1,
+    ) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.smoothing = smoothing
+        self._service_s: float | None = None
+        self._inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._wait = ADMISSION_QUEUE_WAIT.labels(priority=name)
+        self._gauges = (
+            ADMISSION_INFLIGHT.labels(priority=name),
+            ADMISSION_QUEUE_DEPTH.labels(priority=name),
+        )
+        if MULTIPROCESS:
+            self._publish()
+        else:
+            self._gauges[0].set_function(lambda: self._inflight)
+            self._gauges[1].set_function(lambda: len(self._waiters))
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def estimated_wait(self) -> float:
+        """Expected queue time for a request arriving now (0 when a slot is free)."""
+        if self._inflight < self.concurrency and not self._waiters:
+            return 0.0
+        return (len(self._waiters) + 1) / self.concurrency * (self._service_s or 0.0)
+
+    async def acquire(self, budget_s: float) -> None:
+        if self._inflight < self.concurrency and not self._waiters:
+            self._inflight += 1
+            if MULTIPROCESS:
+                self._publish()
+            return
+        estimate = self.estimated_wait()
+        if len(self._waiters) >= self.max_queue:
+            self._shed("queue_full", estimate)
+        if estimate > budget_s:
+            self._shed("deadline", estimate)
+        start = time.perf_counter()
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        if MULTIPROCESS:
+            self._publish()
+        try:
+            await asyncio.wait_for(fut, budget_s)
+        except asyncio.TimeoutError:
+            if not (fut.done() and not fut.cancelled()):
+                self._shed("queue_timeout", self.estimated_wait())
+        except asyncio.CancelledError:
+            # Slot may have been handed over just before the client went away
+            if fut.done() and not fut.cancelled():
+                self._inflight -= 1
+                self._grant()
+            raise
+        finally:
+            if fut in self._waiters:
+                self._waiters.remove(fut)
+            if MULTIPROCESS:
+                self._publish()
+        self._wait.observe(time.perf_counter() - start)
+
+    def release(self, held_s: float) -> None:
+        self._inflight -= 1
+        service = self._service_s
+        self._service_s = (
+            held_s if service is None else service + self.smoothing * (held_s - service)
+        )
+        self._grant()
+        if MULTIPROCESS:
+            self._publish()
+
+    def _grant(self) -> None:
+        while self._waiters and self._inflight < self.concurrency:
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self._inflight += 1
+            fut.set_result(None)
+
+    def _publish(self) -> None:
+        inflight, queued = self._gauges
+        inflight.set(self._inflight)
+        queued.set(len(self._waiters))
+
+    def _shed(self, reason: str, retry_after_s: float) -> NoReturn:
+        ADMISSION_SHED.labels(priority=self.name, reason=reason).inc()
+        raise Shed(self.name, reason, retry_after_s)
+
+
+class AdmissionController:
+    """Routes -> priority classes: longest matching path prefix, else ``default``."""
+
+    def __init__(
+        self,
+        classes: Mapping[str, AdmissionClass],
+        routes: Mapping[str, str],
+        default: str,
+    ) -> None:
+        self.classes = {
+            name: PriorityClass(
+                name,
+                concurrency=cfg.concurrency,
+                max_queue=cfg.max_queue,
+                queue_timeout_s=cfg.queue_timeout_s,
+            )
+            for name, cfg in classes.items()
+        }
+        for name in (*routes.values(), default):
+            if name not in self.classes:
+                raise ValueError(f"unknown admission class {name!r}")
+        self.routes = sorted(routes.items(), key=lambda kv: -len(kv[0]))
+        self.default = self.classes[default]
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> AdmissionController:
+        return cls(
+            settings.admission_classes,
+            settings.admission_routes,
+            settings.admission_default_class,
+        )
+
+    def classify(self, path: str) -> PriorityClass | None:
+        """The class a request to ``path`` queues in; None for probes."""
+        if path in PROBES:
+            return None
+        for prefix, name in self.routes:
+            if path.startswith(prefix):
+                return self.classes[name]
+        return self.default
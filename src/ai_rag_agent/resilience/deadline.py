@@ -0,0 +1,42 @@
+import time
+from contextvars import ContextVar, Token
+
+# Relative budget in ms (like grpc-timeout); absolute times would depend on client clocks
+DEADLINE_HEADER = "x-request-timeout-ms"
+
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+def parse_timeout_ms(value: str | None) -> float | None:
+    """Header value -> budget in seconds; None when absent or unparseable."""
+    if not value:
+        return None
+    try:
+        ms = float(value)
+    except ValueError:
+        return None
+    return ms / 1000.0 if ms > 0 else None
+
+
+def set_deadline(timeout_s: float) -> Token:
+    """Set the deadline for the current request; a nested deadline can only tighten it."""
+    deadline = time.monotonic() + timeout_s
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    return _deadline.set(deadline)
+
+
+def reset_deadline(token: Token) -> None:
+    _deadline.reset(token)
+
+
+def expires_at() -> float | None:
+    """The current request's deadline (``time.monotonic()`` clock), or None."""
+    return _deadline.get()
+
+
+def remaining() -> float | None:
+    """Seconds left before the current request's deadline, or None if it has none."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, NoReturn
+
+from ..observability.metrics import MULTIPROCESS
+from ..observability.resilience_metrics import (
+    LIMITER_INFLIGHT,
+    LIMITER_LIMIT,
+    LIMITER_QUEUE_DEPTH,
+    LIMITER_REJECTIONS,
+)
+
+if TYPE_CHECKING:
+    from .shared_state import SharedLimit
+
+
+class LimiterRejected(Exception):
+    """The adaptive limiter shed the call (wait queue full or queue timeout)."""
+
+    def __init__(self, target: str, reason: str):
+        super().__init__(f"{target}: {reason}")
+        self.target = target
+        self.reason = reason
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one dependency, tuned from observed latency.
+
+    Each completed call is a sample. Failures in ``drop_on`` (timeouts) and calls
+    slower than ``tolerance`` x the smoothed latency baseline (and ``min_latency_s``)
+    shrink the limit by ``backoff_ratio``; otherwise the limit grows by one while at
+    least half of it is in use. The baseline is an EWMA (``smoothing``), so after a
+    latency shift it catches up and the limit climbs again.
+
+    Callers over the limit wait in a FIFO queue of at most ``max_queue`` entries for
+    up to ``queue_timeout_s``; beyond that they get ``LimiterRejected`` straight away
+    instead of piling up behind a slow dependency.
+
+    With ``shared``, the limit lives in a file shared by all server workers: every
+    worker's samples move it, and every worker enforces it. Updates from different
+    workers are not serialised, so a concurrent sample may occasionally be lost.
+    """
+
+    def __init__(
+        self,
+        *,
+        target: str,
+        initial_limit: int = 5,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        max_queue: int = 50,
+        queue_timeout_s: float = 1.0,
+        backoff_ratio: float = 0.9,
+        tolerance: float = 2.0,
+        smoothing: float = 0.05,
+        min_latency_s: float = 0.001,
+        drop_on: tuple[type[BaseException], ...] = (asyncio.TimeoutError,),
+        shared: SharedLimit | None = None,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("need 1 <= min_limit <= initial_limit <= max_limit")
+        self.target = target
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.backoff_ratio = backoff_ratio
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.min_latency_s = min_latency_s
+        self.drop_on = drop_on
+        self._limit = float(initial_limit)
+        self._baseline_s: float | None = None
+        self._inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.shared = shared
+        if shared is not None:
+            learned = shared.get()  # another worker got here first
+            if learned is None:
+                shared.set(self._limit)
+            else:
+                self._limit = min(max_limit, max(min_limit, learned))
+        self._gauges = (
+            LIMITER_LIMIT.labels(target=target),
+            LIMITER_INFLIGHT.labels(target=target),
+            LIMITER_QUEUE_DEPTH.labels(target=target),
+        )
+        if MULTIPROCESS:
+            self._publish()
+        else:
+            # Read at scrape time, so acquire/release don't pay for gauge updates
+            self._gauges[0].set_function(lambda: self.limit)
+            self._gauges[1].set_function(lambda: self._inflight)
+            self._gauges[2].set_function(lambda: len(self._waiters))
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the body; the body's duration is the sample."""
+        await self.acquire()
+        start = time.perf_counter()
+        utilised = self._inflight * 2 >= self._limit
+        dropped = False
+        try:
+            yield
+        except self.drop_on:
+            dropped = True
+            raise
+        finally:
+            self.release(time.perf_counter() - start, dropped=dropped, utilised=utilised)
+
+    async def acquire(self) -> None:
+        if self._inflight < self.limit and not self._waiters:
+            self._inflight += 1
+            if MULTIPROCESS:
+                self._publish()
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        if MULTIPROCESS:
+            self._publish()
+        try:
+            await asyncio.wait_for(fut, self.queue_timeout_s)
+        except asyncio.TimeoutError:
+            if fut.done() and not fut.cancelled():
+                return  # granted in the same tick the timeout fired
+            self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            # Slot may have been handed over just before the caller went away
+            if fut.done() and not fut.cancelled():
+                self._inflight -= 1
+                self._grant()
+            raise
+        finally:
+            if fut in self._waiters:
+                self._waiters.remove(fut)
+            if MULTIPROCESS:
+                self._publish()
+
+    def release(self, rtt_s: float, *, dropped: bool = False, utilised: bool = True) -> None:
+        self._inflight -= 1
+        self._on_sample(rtt_s, dropped, utilised)
+        self._grant()
+        if MULTIPROCESS:
+            self._publish()
+
+    def _on_sample(self, rtt_s: float, dropped: bool, utilised: bool) -> None:
+        if self.shared is not None:
+            learned = self.shared.get()
+            if learned is not None:
+                self._limit = min(self.max_limit, max(self.min_limit, learned))
+        if dropped:
+            self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+        else:
+            baseline = self._baseline_s
+            # Below min_latency_s the ratio is scheduler noise, not a slowdown
+            slow = rtt_s > max(baseline * self.tolerance, self.min_latency_s) if baseline else False
+            if slow:
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+            elif utilised:
+                self._limit = min(self.max_limit, self._limit + 1)
+            self._baseline_s = (
+                rtt_s if baseline is None else baseline + self.smoothing * (rtt_s - baseline)
+            )
+        if self.shared is not None:
+            self.shared.set(self._limit)
+
+    def _publish(self) -> None:
+        limit, inflight, queued = self._gauges
+        limit.set(self.limit)
+        inflight.set(self._inflight)
+        queued.set(len(self._waiters))
+
+    def _grant(self) -> None:
+        # Hand freed (or newly allowed) slots to queued callers in FIFO order
+        while self._waiters and self._inflight < self.limit:
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self._inflight += 1
+            fut.set_result(None)
+
+    def _reject(self, reason: str) -> NoReturn:
+        LIMITER_REJECTIONS.labels(target=self.target, reason=reason).inc()
+        raise LimiterRejected(self.target, reason)
@@ -2,102 +2,158 @@
 from __future__ import annotations
 
 import asyncio
-import logging
 import os
+import random
 import time
+from collections import deque
 from datetime import timedelta
-from typing import Awaitable, TypeVar
+from functools import lru_cache, wraps
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Mapping, ParamSpec, TypeVar
 
 import structlog
 from aiobreaker import CircuitBreaker, CircuitBreakerError, CircuitBreakerState
-from tenacity import (
-    before_sleep_log,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_random_exponential,
-)
+from aiobreaker.listener import CircuitBreakerListener
 
 from ..ext.flaky_service import flaky_op
+from . import deadline
+from .limiter import AdaptiveLimiter, LimiterRejected
+from .shared_state import SharedBreakerStorage, SharedLimit, SharedState
+
+if TYPE_CHECKING:
+    from ..app.settings import TargetPolicy
 
 T = TypeVar("T")
+P = ParamSpec("P")
 log = structlog.get_logger()
 
 
-# --- Timeouts (unchanged) ---
+# --- Timeouts ---
 class TimeoutError(Exception):
     """Domain-specific timeout (distinct from asyncio.TimeoutError)."""
 
 
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline ran out (as opposed to the per-call timeout)."""
+
+
+def _close(awaitable: Awaitable | None) -> None:
+    # A coroutine we decided not to await; close it so it isn't reported as never awaited
+    close = getattr(awaitable, "close", None)
+    if callable(close):
+        close()
+
+
+def _check_deadline(awaitable: Awaitable | None, stage: str) -> float | None:
+    """Remaining request budget; raises DeadlineExceeded (without starting) if it's gone."""
+    left = deadline.remaining()
+    if left is not None and left <= 0:
+        _close(awaitable)
+        DEADLINE_EXCEEDED.labels(stage=stage).inc()
+        raise DeadlineExceeded("request deadline already passed")
+    return left
+
+
 async def with_timeout(awaitable: Awaitable[T], timeout_s: float) -> T:
+    """Bound the call by ``timeout_s``, or by the request deadline if that comes first."""
+    left = _check_deadline(awaitable, "timeout")
+    budget = timeout_s if left is None else min(timeout_s, left)
     try:
-        return await asyncio.wait_for(awaitable, timeout=timeout_s)
+        # asyncio.timeout runs in the caller's task; wait_for (<3.12) spawns one per call
+        async with asyncio.timeout(budget):
+            return await awaitable
     except asyncio.TimeoutError as e:
+        if budget < timeout_s:
+            DEADLINE_EXCEEDED.labels(stage="timeout").inc()
+            raise DeadlineExceeded(f"request deadline hit after {budget:.3f}s") from e
         raise TimeoutError(f"operation exceeded {timeout_s}s") from e
 
 
-# --- Retries (unchanged) ---
-def retryable():
-    return retry(
-        retry=retry_if_exception_type((TimeoutError, RuntimeError)),
-        wait=wait_random_exponential(multiplier=0.1, max=2.0),
-        stop=stop_after_attempt(3),
-        reraise=True,
-        before_sleep=before_sleep_log(log, log_level=logging.WARNING),
-    )
+# --- Budgets ---
+class TokenBudget:
+    """
+    Token bucket for extra load: every call credits ``ratio`` tokens (up to
+    ``max_tokens``) and every extra attempt (retry, hedge) spends a whole one.
+    """
 
+    def __init__(self, ratio: float, max_tokens: float) -> None:
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
 
-breaker = CircuitBreaker(
-    fail_max=2,
-    timeout_duration=timedelta(seconds=2),
-    name="flaky-op",
-)
+    def credit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
 
+    def try_spend(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
 
-@breaker
-async def flaky_through_breaker(*, mode: str, timeout_s: float):
-    # Counted as a breaker failure if this raises
-    return await with_timeout(flaky_op(mode=mode), timeout_s=timeout_s)
 
+# --- Retries ---
+# Don't start another attempt with less than this left on the request deadline
+RETRY_MIN_REMAINING_S = float(os.getenv("RETRY_MIN_REMAINING_S", "0.05"))
 
-def breaker_is_open() -> bool:
-    """Robust check across aiobreaker versions."""
-    try:
-        st = breaker.state  # enum CircuitBreakerState
-        if isinstance(st, CircuitBreakerState):
-            return st == CircuitBreakerState.OPEN
-        # fallback if state is string-like
-        return str(st).upper().endswith("OPEN")
-    except Exception:
-        return False
+
+def _deadline_too_close(backoff_s: float = 0.0) -> bool:
+    """True when, after ``backoff_s``, too little of the request deadline would be left."""
+    left = deadline.remaining()
+    if left is not None and left - backoff_s < RETRY_MIN_REMAINING_S:
+        DEADLINE_EXCEEDED.labels(stage="retry").inc()
+        return True
+    return False
+
+
+def _spend_retry(target: str, bucket: TokenBudget) -> bool:
+    if bucket.try_spend():
+        RETRY_ATTEMPTS.labels(target=target).inc()
+        return True
+    RETRY_BUDGET_EXHAUSTED.labels(target=target).inc()
+    return False
+
+
+def retryable(target: str) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """
+    Decorator: every call goes through ``TargetPolicies.call`` for ``target``, so it
+    gets that target's retry attempts and retry budget (and limiter, breaker and
+    timeout) from the policy registry.
+    """
+
+    def decorate(fn: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        @wraps(fn)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            return await get_policy_registry().get(target).call(lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorate
 
 
-@retryable()
 async def call_flaky_with_retry(*, mode: str, fail_times: int, key: str, timeout_s: float):
-    # If flaky_op raises, tenacity sees it and retries before control returns
-    return await with_timeout(
-        flaky_op(mode=mode, fail_times=fail_times, key=key), timeout_s=timeout_s
+    # Own target: the retry demo shouldn't trip (or be refused by) flaky-op's breaker
+    return (
+        await get_policy_registry()
+        .get("flaky-retry")
+        .call(lambda: flaky_op(mode=mode, fail_times=fail_times, key=key), timeout_s)
     )
 
 
-# --- Circuit breaker (FIX HERE) ---
-FAIL_MAX = int(os.getenv("CB_FAIL_MAX", "2"))
-RESET_TIMEOUT_S = float(os.getenv("CB_RESET_TIMEOUT_S", "2.0"))
+# --- Circuit breaker ---
+async def resilient_call(coro: Awaitable[T], timeout_s: float, target: str = "flaky-op") -> T:
+    """Timeout + the target's breaker (no bulkhead); see TargetPolicies.guarded."""
+    try:
+        return await get_policy_registry().get(target).guarded(lambda: coro, timeout_s)
+    finally:
+        _close(coro)  # no-op unless the breaker or deadline refused the call
 
-# aiobreaker expects "timeout_duration", not "reset_timeout"
-breaker = CircuitBreaker(
-    fail_max=FAIL_MAX,
-    timeout_duration=RESET_TIMEOUT_S,  # <-- changed kwarg
-    name="flaky-op",
-)
 
+async def flaky_through_breaker(*, mode: str, timeout_s: float):
+    # Counted as a breaker failure if this raises (DeadlineExceeded excepted)
+    return await resilient_call(flaky_op(mode=mode), timeout_s=timeout_s)
 
-async def resilient_call(coro: Awaitable[T], timeout_s: float) -> T:
-    async def _inner():
-        return await with_timeout(coro, timeout_s=timeout_s)
 
-    # If the circuit is open, aiobreaker raises CircuitBreakerError immediately.
-    return await breaker.call(_inner)
+def breaker_is_open(target: str = "flaky-op") -> bool:
+    return get_policy_registry().get(target).breaker.current_state == CircuitBreakerState.OPEN
 
 
 # --- Bulkhead (unchanged) ---
@@ -110,9 +166,131 @@ async def with_bulkhead(coro: Awaitable[T], sem: asyncio.Semaphore) -> T:
         return await coro
 
 
-# --- Metrics (optional; unchanged except we avoid referencing breaker.state directly) ---
+async def with_limiter(coro: Awaitable[T], limiter: AdaptiveLimiter) -> T:
+    """Bulkhead with an adaptive limit; raises LimiterRejected when the call is shed."""
+    try:
+        async with limiter.slot():
+            return await coro
+    finally:
+        _close(coro)  # no-op unless the call was shed before starting
+
+
+# --- Hedging ---
+class HedgePolicy:
+    """
+    When and how often to hedge calls to one target.
+
+    The hedge delay is the ``quantile`` of the last ``window`` winning latencies; until
+    ``min_samples`` have been seen it is ``delay_s`` (None: don't hedge yet). Hedges
+    spend tokens from a bucket credited ``budget_ratio`` per call, so they add at most
+    that fraction of extra load, with bursts of up to ``max_tokens``.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        *,
+        quantile: float = 0.95,
+        window: int = 512,
+        min_samples: int = 20,
+        delay_s: float | None = None,
+        budget_ratio: float = 0.05,
+        max_tokens: float = 10.0,
+    ) -> None:
+        self.target = target
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.delay_s = delay_s
+        self.budget = TokenBudget(budget_ratio, max_tokens)
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._cached_delay: float | None = None
+        self._stale = 0
+
+    def observe(self, latency_s: float) -> None:
+        self._latencies.append(latency_s)
+        self._stale += 1
+
+    def hedge_delay(self) -> float | None:
+        if len(self._latencies) < self.min_samples:
+            return self.delay_s
+        # Re-sorting the window on every call would dominate fast calls; refresh lazily
+        if self._cached_delay is None or self._stale >= 16:
+            ordered = sorted(self._latencies)
+            self._cached_delay = ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))]
+            self._stale = 0
+        return self._cached_delay
+
+    def credit(self) -> None:
+        self.budget.credit()
+
+    def try_spend(self) -> bool:
+        if self.budget.try_spend():
+            HEDGES.labels(target=self.target, outcome="sent").inc()
+            return True
+        HEDGES.labels(target=self.target, outcome="no_budget").inc()
+        return False
+
+
+async def hedged_call(
+    make_call: Callable[[], Awaitable[T]], policy: HedgePolicy, *, delay_s: float | None = None
+) -> T:
+    """
+    Run ``make_call()``; if it is still running after the hedge delay (``delay_s``, else
+    the policy's observed quantile) and the budget allows, start a second attempt. The
+    first success wins and the other attempt is cancelled; if both fail the last error
+    is raised. Put breaker/bulkhead/timeout inside ``make_call`` so every attempt goes
+    through them (a cancelled loser is not a breaker failure).
+    """
+    policy.credit()
+    delay = delay_s if delay_s is not None else policy.hedge_delay()
+    started: dict[asyncio.Future, tuple[float, str]] = {}
+
+    def launch(attempt: str) -> asyncio.Future:
+        task = asyncio.ensure_future(make_call())
+        started[task] = (time.perf_counter(), attempt)
+        return task
+
+    pending = {launch("primary")}
+    done: set[asyncio.Future] = set()
+    try:
+        if delay is not None:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done and policy.try_spend():
+                pending.add(launch("hedge"))
+        error: BaseException | None = None
+        while True:
+            for task in done:
+                if task.exception() is None:
+                    t0, attempt = started[task]
+                    policy.observe(time.perf_counter() - t0)
+                    if len(started) > 1:
+                        HEDGE_WINS.labels(target=policy.target, attempt=attempt).inc()
+                    return task.result()
+                error = task.exception()
+            if not pending:
+                assert error is not None
+                raise error
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+# --- Metrics (optional) ---
 try:
-    from ..observability.resilience_metrics import BREAKER_OPEN, ERRORS, LATENCY, TIMEOUTS
+    from ..observability.resilience_metrics import (
+        BREAKER_OPEN,
+        DEADLINE_EXCEEDED,
+        ERRORS,
+        HEDGE_WINS,
+        HEDGES,
+        LATENCY,
+        RETRY_ATTEMPTS,
+        RETRY_BUDGET_EXHAUSTED,
+        TIMEOUTS,
+    )
 except Exception:  # pragma: no cover
 
     class _Noop:
@@ -128,48 +306,207 @@ except Exception:  # pragma: no cover
         def set(self, *a, **k):
             pass
 
-    TIMEOUTS = ERRORS = LATENCY = BREAKER_OPEN = _Noop()  # type: ignore
+    TIMEOUTS = ERRORS = LATENCY = BREAKER_OPEN = HEDGES = HEDGE_WINS = _Noop()  # type: ignore
+    DEADLINE_EXCEEDED = RETRY_ATTEMPTS = RETRY_BUDGET_EXHAUSTED = _Noop()  # type: ignore
 
 
-async def measured_call(target: str, coro: Awaitable[T], timeout_s: float) -> T:
-    start = time.perf_counter()
+async def measured_call(target: str, coro: Awaitable[T], timeout_s: float | None = None) -> T:
+    """
+    One attempt through the target's limiter, breaker and timeout (``timeout_s``, else
+    the target's), with metrics.
+    """
     try:
-        return await resilient_call(coro, timeout_s=timeout_s)
-    except TimeoutError:
-        TIMEOUTS.labels(target=target).inc()
-        raise
-    except Exception as e:
-        ERRORS.labels(target=target, kind=type(e).__name__).inc()
-        raise
+        return await get_policy_registry().get(target).run(lambda: coro, timeout_s)
     finally:
-        LATENCY.labels(target=target).observe(time.perf_counter() - start)
-        # Try to set breaker-open gauge defensively (works even if attributes differ).
+        _close(coro)
+
+
+# --- Per-target registry ---
+class _BreakerGauge(CircuitBreakerListener):
+    # Push BREAKER_OPEN on transitions instead of polling breaker state on every call.
+    # aiobreaker moves open -> half-open lazily, on the first call after the reset timeout.
+    def state_change(self, breaker, old, new) -> None:
+        BREAKER_OPEN.labels(target=breaker.name).set(
+            1 if new.state == CircuitBreakerState.OPEN else 0
+        )
+
+
+_BREAKER_GAUGE = _BreakerGauge()
+
+
+class TargetPolicies:
+    """
+    Breaker, limiter, timeout and retry budget for one named upstream target. With
+    ``shared``, breaker state and the adaptive limit are shared with the other workers.
+    """
+
+    def __init__(self, name: str, policy: TargetPolicy, shared: SharedState | None = None) -> None:
+        self.name = name
+        self.policy = policy
+        self.breaker = CircuitBreaker(
+            fail_max=policy.breaker_fail_max,
+            timeout_duration=timedelta(seconds=policy.breaker_reset_s),
+            # A request running out of its own deadline says nothing about the target
+            exclude=[DeadlineExceeded],
+            listeners=[_BREAKER_GAUGE],
+            state_storage=None if shared is None else SharedBreakerStorage(shared, name),
+            name=name,
+        )
+        fixed = not policy.adaptive
+        self.limiter = AdaptiveLimiter(
+            target=name,
+            initial_limit=policy.concurrency,
+            min_limit=policy.concurrency if fixed else 1,
+            max_limit=policy.concurrency
+            if fixed
+            else max(policy.max_concurrency, policy.concurrency),
+            max_queue=policy.max_queue,
+            queue_timeout_s=policy.queue_timeout_s,
+            drop_on=(TimeoutError, asyncio.TimeoutError),
+            shared=None if shared is None or fixed else SharedLimit(shared, name),
+        )
+        self.retry_budget = TokenBudget(policy.retry_budget_ratio, policy.retry_budget_max)
+        # Bind label children once; labels() is a dict lookup under a lock per call
+        self._latency = LATENCY.labels(target=name)
+        self._timeouts = TIMEOUTS.labels(target=name)
+        # Another worker may already have opened a shared breaker
+        BREAKER_OPEN.labels(target=name).set(
+            1 if self.breaker.current_state == CircuitBreakerState.OPEN else 0
+        )
+
+    async def guarded(
+        self, make_call: Callable[[], Awaitable[T]], timeout_s: float | None = None
+    ) -> T:
+        """Breaker + timeout (``timeout_s`` or the target's), clamped to the request deadline."""
+        # Past the deadline: fail before touching the breaker (no call, no half-open probe)
+        _check_deadline(None, "breaker")
+        budget = self.policy.timeout_s if timeout_s is None else timeout_s
+        return await self.breaker.call_async(lambda: with_timeout(make_call(), budget))
+
+    async def run(self, make_call: Callable[[], Awaitable[T]], timeout_s: float | None = None) -> T:
+        """One attempt: limiter slot, then ``guarded``; records latency/timeouts/errors."""
+        start = time.perf_counter()
         try:
-            # Prefer dedicated API if present:
-            is_open = getattr(breaker, "is_open", None)
-            if callable(is_open):
-                state_open = 1 if breaker.is_open() else 0
-            else:
-                # Fallback: inspect a "state" property if it exists
-                st = getattr(breaker, "state", None)
-                name = getattr(st, "name", None) or str(st or "").lower()
-                state_open = 1 if (isinstance(name, str) and name.lower() == "open") else 0
-        except Exception:
-            state_open = 0
-        BREAKER_OPEN.labels(target=target).set(state_open)
-
-
-# Allow at most N concurrent calls to this dependency
+            async with self.limiter.slot():
+                return await self.guarded(make_call, timeout_s)
+        except TimeoutError:
+            self._timeouts.inc()
+            raise
+        except Exception as e:
+            ERRORS.labels(target=self.name, kind=type(e).__name__).inc()
+            raise
+        finally:
+            self._latency.observe(time.perf_counter() - start)
+
+    async def call(
+        self, make_call: Callable[[], Awaitable[T]], timeout_s: float | None = None
+    ) -> T:
+        """
+        ``run``, retried on timeouts and errors up to ``retry_attempts`` times with
+        jittered exponential backoff, but not once the request deadline is (nearly)
+        spent or the retry budget is empty, so a failing target sees at most
+        ~``retry_budget_ratio`` extra load instead of a retry storm. A plain loop: a
+        tenacity wrapper costs more per call than the limiter, breaker and timeout.
+        """
+        self.retry_budget.credit()
+        attempt = 1
+        while True:
+            try:
+                return await self.run(make_call, timeout_s)
+            except DeadlineExceeded:
+                raise
+            except (TimeoutError, RuntimeError) as e:
+                backoff = random.uniform(0, min(2.0, 0.1 * 2 ** (attempt - 1)))
+                # Sleeping into the deadline would swap this error for DeadlineExceeded
+                if (
+                    attempt >= self.policy.retry_attempts
+                    or _deadline_too_close(backoff)
+                    or not _spend_retry(self.name, self.retry_budget)
+                ):
+                    raise
+                log.warning("retrying", target=self.name, attempt=attempt, error=repr(e))
+            left = deadline.remaining()
+            await asyncio.sleep(backoff if left is None else min(backoff, left))
+            attempt += 1
+
+
+class PolicyRegistry:
+    """
+    Named targets -> TargetPolicies, built on first use from ``defaults`` plus that
+    target's ``overrides``. Lookups are a dict hit, so thousands of targets (e.g. one
+    per tenant upstream) cost memory per target but nothing extra per call.
+    """
+
+    def __init__(
+        self,
+        defaults: TargetPolicy,
+        overrides: Mapping[str, Mapping[str, Any]] | None = None,
+        shared: SharedState | None = None,
+    ) -> None:
+        self.defaults = defaults
+        self.overrides = dict(overrides or {})
+        self.shared = shared
+        self._targets: dict[str, TargetPolicies] = {}
+
+    def policy_for(self, name: str) -> TargetPolicy:
+        override = self.overrides.get(name)
+        if not override:
+            return self.defaults
+        return type(self.defaults).model_validate({**self.defaults.model_dump(), **override})
+
+    def get(self, name: str) -> TargetPolicies:
+        target = self._targets.get(name)
+        if target is None:
+            target = self._targets[name] = TargetPolicies(name, self.policy_for(name), self.shared)
+        return target
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._targets
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+
+@lru_cache(maxsize=1)
+def get_policy_registry() -> PolicyRegistry:
+    from ..app.settings import settings
+
+    path = settings.resilience_shared_state
+    return PolicyRegistry(
+        settings.resilience_defaults,
+        settings.resilience_targets,
+        SharedState(path, settings.resilience_shared_slots) if path else None,
+    )
+
+
+# Fixed bulkhead, kept for demo-bulkhead's mode=static comparison
 FLAKY_SEMAPHORE = asyncio.Semaphore(5)
 
+# Hedge flaky_op at its observed p95, adding at most ~5% extra calls
+FLAKY_HEDGE = HedgePolicy(
+    "flaky-op",
+    quantile=float(os.getenv("HEDGE_QUANTILE", "0.95")),
+    budget_ratio=float(os.getenv("HEDGE_BUDGET_RATIO", "0.05")),
+)
+
 __all__ = [
     "TimeoutError",
+    "DeadlineExceeded",
+    "TokenBudget",
     "with_timeout",
     "retryable",
-    "breaker",
     "resilient_call",
     "with_bulkhead",
     "DEFAULT_SEMAPHORE",
+    "AdaptiveLimiter",
+    "LimiterRejected",
+    "with_limiter",
+    "HedgePolicy",
+    "hedged_call",
+    "FLAKY_HEDGE",
     "measured_call",
+    "TargetPolicies",
+    "PolicyRegistry",
+    "get_policy_registry",
     "CircuitBreakerError",
 ]
@@ -0,0 +1,143 @@
+"""
+Breaker and limiter state shared by the workers of one server (``rag-serve``).
+
+One small memory-mapped file holds a fixed table of per-target slots. Every worker maps
+the same file, so a breaker opened by one worker is open in all of them, and the
+adaptive limit learned from any worker's samples is enforced by every worker.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from typing import Iterator
+
+from aiobreaker import CircuitBreakerState
+from aiobreaker.storage.base import CircuitBreakerStorage
+
+# key (blake2b of the target name; 0 = free), breaker state, fail counter,
+# opened_at (unix seconds, 0 = never), adaptive limit (0 = not learned yet)
+_SLOT = struct.Struct("<QB3xIdd")
+_STATE_OFFSET, _COUNTER_OFFSET, _OPENED_OFFSET, _LIMIT_OFFSET = 8, 12, 16, 24
+_STATES = [CircuitBreakerState.CLOSED, CircuitBreakerState.OPEN, CircuitBreakerState.HALF_OPEN]
+_CODES = {state: code for code, state in enumerate(_STATES)}
+
+
+def _key(name: str) -> int:
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "little") or 1
+
+
+class SharedState:
+    """
+    ``slots`` fixed 32-byte records in the file at ``path``, found by open addressing
+    on the target name's hash. Single fields are read and written in place without a
+    lock; slot allocation and read-modify-write updates take an ``flock`` on the file.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], slots: int = 1024) -> None:
+        self.path = os.fspath(path)
+        self.slots = slots
+        size = slots * _SLOT.size
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._mm = mmap.mmap(self._fd, size)
+        self._offsets: dict[str, int] = {}
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def slot(self, name: str) -> int:
+        """Byte offset of ``name``'s slot, claimed on first use by any worker."""
+        offset = self._offsets.get(name)
+        if offset is not None:
+            return offset
+        key = _key(name)
+        with self.locked():
+            for i in range(self.slots):
+                offset = ((key + i) % self.slots) * _SLOT.size
+                (found,) = struct.unpack_from("<Q", self._mm, offset)
+                if found == key:
+                    break
+                if found == 0:
+                    _SLOT.pack_into(self._mm, offset, key, 0, 0, 0.0, 0.0)
+                    break
+            else:
+                raise RuntimeError(f"shared state {self.path} is full ({self.slots} targets)")
+        self._offsets[name] = offset
+        return offset
+
+    def get(self, offset: int, field: int, fmt: str) -> float:
+        return struct.unpack_from(fmt, self._mm, offset + field)[0]
+
+    def set(self, offset: int, field: int, fmt: str, value: float) -> None:
+        struct.pack_into(fmt, self._mm, offset + field, value)
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+
+class SharedBreakerStorage(CircuitBreakerStorage):
+    """aiobreaker storage backed by one ``SharedState`` slot."""
+
+    def __init__(self, shared: SharedState, name: str) -> None:
+        super().__init__(name)
+        self._shared = shared
+        self._offset = shared.slot(name)
+
+    @property
+    def state(self) -> CircuitBreakerState:
+        return _STATES[int(self._shared.get(self._offset, _STATE_OFFSET, "<B"))]
+
+    @state.setter
+    def state(self, state: CircuitBreakerState) -> None:
+        self._shared.set(self._offset, _STATE_OFFSET, "<B", _CODES[state])
+
+    def increment_counter(self) -> None:
+        with self._shared.locked():
+            count = self._shared.get(self._offset, _COUNTER_OFFSET, "<I")
+            self._shared.set(self._offset, _COUNTER_OFFSET, "<I", count + 1)
+
+    def reset_counter(self) -> None:
+        self._shared.set(self._offset, _COUNTER_OFFSET, "<I", 0)
+
+    @property
+    def counter(self) -> int:
+        return int(self._shared.get(self._offset, _COUNTER_OFFSET, "<I"))
+
+    @property
+    def opened_at(self) -> datetime | None:
+        # aiobreaker compares against naive datetime.utcnow()
+        ts = self._shared.get(self._offset, _OPENED_OFFSET, "<d")
+        return datetime.fromtimestamp(ts, UTC).replace(tzinfo=None) if ts else None
+
+    @opened_at.setter
+    def opened_at(self, date_time: datetime) -> None:
+        ts = date_time.replace(tzinfo=UTC).timestamp()
+        self._shared.set(self._offset, _OPENED_OFFSET, "<d", ts)
+
+
+class SharedLimit:
+    """One target's adaptive limit in a ``SharedState`` slot (``AdaptiveLimiter.shared``)."""
+
+    def __init__(self, shared: SharedState, name: str) -> None:
+        self._shared = shared
+        self._offset = shared.slot(name)
+
+    def get(self) -> float | None:
+        value = self._shared.get(self._offset, _LIMIT_OFFSET, "<d")
+        return value or None
+
+    def set(self, value: float) -> None:
+        self._shared.set(self._offset, _LIMIT_OFFSET, "<d", value)
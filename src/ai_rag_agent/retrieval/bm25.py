@@ -0,0 +1,232 @@
+import hashlib
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .embedder import tokenize
+from .index import save_array
+
+_EMPTY = (np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64))
+
+
+def term_hash(term: str) -> int:
+    # 64-bit keys instead of a stored vocabulary: lookups are a searchsorted, and
+    # collisions are negligible at any realistic vocabulary size
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _doc_terms(text: str) -> Counter:
+    return Counter(term_hash(t) for t in tokenize(text))
+
+
+class BM25Index:
+    """
+    BM25 over array-backed posting lists (CSR layout, no per-term Python objects).
+
+    ``terms`` holds sorted 64-bit term hashes; term ``i``'s postings are
+    ``docs[offsets[i]:offsets[i+1]]`` (ascending row ids) with term frequencies in
+    ``tfs``. ``max_scores`` is each term's best possible contribution, which lets
+    ``search`` skip whole posting lists MaxScore-style. Every array is a plain ``.npy``
+    file, so a loaded index is memory-mapped and shared like the vector index.
+    """
+
+    kind = "bm25"
+
+    def __init__(
+        self,
+        terms: np.ndarray,
+        offsets: np.ndarray,
+        docs: np.ndarray,
+        tfs: np.ndarray,
+        doc_lens: np.ndarray,
+        max_scores: np.ndarray,
+        *,
+        k1: float = 1.2,
+        b: float = 0.75,
+        avgdl: float | None = None,
+    ) -> None:
+        self.terms = terms
+        self.offsets = offsets
+        self.docs = docs
+        self.tfs = tfs
+        self.doc_lens = doc_lens
+        self.max_scores = max_scores
+        self.k1 = k1
+        self.b = b
+        if avgdl is None:
+            avgdl = float(doc_lens.mean()) if len(doc_lens) else 1.0
+        self.avgdl = avgdl
+
+    # --- Build ---
+    @classmethod
+    def build(cls, texts: Iterable[str], *, k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        hashes: list[int] = []
+        rows: list[int] = []
+        counts: list[int] = []
+        lens: list[int] = []
+        for row, text in enumerate(texts):
+            bag = _doc_terms(text)
+            hashes.extend(bag.keys())
+            counts.extend(bag.values())
+            rows.extend([row] * len(bag))
+            lens.append(sum(bag.values()))
+        return cls._from_postings(
+            np.array(hashes, dtype=np.uint64),
+            np.array(rows, dtype=np.int64),
+            np.array(counts, dtype=np.int64),
+            np.array(lens, dtype=np.uint32),
+            k1=k1,
+            b=b,
+        )
+
+    @classmethod
+    def _from_postings(
+        cls,
+        hashes: np.ndarray,
+        rows: np.ndarray,
+        counts: np.ndarray,
+        doc_lens: np.ndarray,
+        *,
+        k1: float,
+        b: float,
+    ) -> "BM25Index":
+        order = np.lexsort((rows, hashes))
+        hashes, rows, counts = hashes[order], rows[order], counts[order]
+        terms, starts = np.unique(hashes, return_index=True)
+        offsets = np.append(starts, len(hashes)).astype(np.int64)
+        docs = rows.astype(np.int32)
+        tfs = np.minimum(counts, np.iinfo(np.uint16).max).astype(np.uint16)
+        index = cls(
+            terms, offsets, docs, tfs, doc_lens, np.zeros(len(terms), np.float32), k1=k1, b=b
+        )
+        if len(docs):
+            df = np.diff(offsets)
+            impact = np.repeat(index._idf(df), df) * index._tf_part(tfs, docs)
+            index.max_scores = np.maximum.reduceat(impact, offsets[:-1]).astype(np.float32)
+        return index
+
+    def add(self, texts: Sequence[str]) -> None:
+        """Append documents. Posting lists are rebuilt (idf and avgdl change anyway)."""
+        tail = BM25Index.build(texts, k1=self.k1, b=self.b)
+        df = np.diff(self.offsets)
+        merged = BM25Index._from_postings(
+            np.concatenate(
+                [np.repeat(self.terms, df), np.repeat(tail.terms, np.diff(tail.offsets))]
+            ),
+            np.concatenate([self.docs, tail.docs + self.ntotal]).astype(np.int64),
+            np.concatenate([self.tfs, tail.tfs]).astype(np.int64),
+            np.concatenate([self.doc_lens, tail.doc_lens]),
+            k1=self.k1,
+            b=self.b,
+        )
+        self.__dict__.update(merged.__dict__)
+
+    @property
+    def ntotal(self) -> int:
+        return int(len(self.doc_lens))
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.terms, self.offsets, self.docs, self.tfs, self.doc_lens, self.max_scores)
+        return int(sum(a.nbytes for a in arrays))
+
+    # --- Scoring ---
+    def _idf(self, df: np.ndarray) -> np.ndarray:
+        n = self.ntotal
+        return np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+    def _tf_part(self, tfs: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        tf = tfs.astype(np.float32)
+        norm = self.k1 * (1.0 - self.b + self.b * self.doc_lens[rows] / self.avgdl)
+        return tf * (self.k1 + 1.0) / (tf + norm.astype(np.float32))
+
+    def _lookup(self, query: str) -> np.ndarray:
+        """Term ids of the query's distinct terms that occur in the index."""
+        if len(self.terms) == 0:
+            return np.zeros(0, dtype=np.int64)
+        hashes = np.array(sorted(set(map(term_hash, tokenize(query)))), dtype=np.uint64)
+        pos = np.minimum(np.searchsorted(self.terms, hashes), len(self.terms) - 1)
+        return pos[self.terms[pos] == hashes].astype(np.int64)
+
+    def _score(self, term_ids: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Full BM25 scores of candidate ``rows`` (sorted) for the query terms."""
+        total = np.zeros(len(rows), dtype=np.float32)
+        df = self.offsets[term_ids + 1] - self.offsets[term_ids]
+        for t, idf in zip(term_ids, self._idf(df), strict=True):
+            lo, hi = int(self.offsets[t]), int(self.offsets[t + 1])
+            plist = self.docs[lo:hi]
+            pos = np.minimum(np.searchsorted(plist, rows), hi - lo - 1)
+            found = plist[pos] == rows
+            if found.any():
+                total[found] += idf * self._tf_part(self.tfs[lo:hi][pos[found]], rows[found])
+        return total
+
+    def search_one(
+        self, query: str, k: int, *, prune: bool = True
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k ``(scores, rows)`` for one query, highest first.
+
+        With ``prune`` (MaxScore), a first pass over the highest-bound term's postings
+        gives a score threshold; terms whose bounds together stay below it are
+        "non-essential": their (usually long, low-idf) lists are only probed for
+        candidates from the essential lists, never scanned. Results equal ``prune=False``.
+        """
+        term_ids = self._lookup(query)
+        if len(term_ids) == 0 or k <= 0:
+            return _EMPTY
+        bounds = self.max_scores[term_ids]
+        order = np.argsort(bounds, kind="stable")
+        term_ids, bounds = term_ids[order], bounds[order]
+
+        essential = term_ids
+        if prune and len(term_ids) > 1:
+            top = int(term_ids[-1])
+            seed = np.asarray(self.docs[self.offsets[top] : self.offsets[top + 1]])
+            seed_scores = self._score(term_ids, seed)
+            if len(seed_scores) >= k:
+                threshold = np.partition(seed_scores, len(seed_scores) - k)[len(seed_scores) - k]
+                # Slack for float32 rounding between summed bounds and summed scores
+                skip = np.searchsorted(np.cumsum(bounds), threshold * (1 - 1e-5), side="left")
+                essential = term_ids[min(int(skip), len(term_ids) - 1) :]
+
+        lists = [self.docs[self.offsets[t] : self.offsets[t + 1]] for t in essential]
+        rows = np.unique(np.concatenate(lists)).astype(np.int32)
+        scores = self._score(term_ids, rows)
+        if len(rows) > k:
+            part = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[part], scores[part]
+        # Score desc, then row asc: deterministic under ties
+        order = np.lexsort((rows, -scores))
+        return scores[order], rows[order].astype(np.int64)
+
+    def search(
+        self, queries: Sequence[str], k: int, *, prune: bool = True
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        return [self.search_one(q, k, prune=prune) for q in queries]
+
+    # --- Persist ---
+    def save(self, path: Path) -> None:
+        for name in ("terms", "offsets", "docs", "tfs", "doc_lens", "max_scores"):
+            save_array(path / f"bm25.{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        save_array(path / "bm25.params.npy", np.array([self.k1, self.b, self.avgdl]))
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "BM25Index":
+        def arr(name: str) -> np.ndarray:
+            return np.load(path / f"bm25.{name}.npy", mmap_mode="r" if mmap else None)
+
+        k1, b, avgdl = (float(x) for x in np.load(path / "bm25.params.npy"))
+        return cls(
+            arr("terms"),
+            arr("offsets"),
+            arr("docs"),
+            arr("tfs"),
+            arr("doc_lens"),
+            arr("max_scores"),
+            k1=k1,
+            b=b,
+            avgdl=avgdl,
+        )
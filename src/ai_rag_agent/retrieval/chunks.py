@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .index import save_array
+
+
+@dataclass(frozen=True)
+class Chunk:
+    id: str
+    doc_id: str
+    text: str
+    content_hash: str = ""
+
+
+class StringTable:
+    """
+    Variable-length UTF-8 strings packed into one byte blob plus an offsets array.
+
+    Both arrays are plain ``.npy`` files, so a loaded table can be memory-mapped and
+    shared across workers like the embedding matrix; strings are decoded on access.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "StringTable":
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(blob, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def extend(self, strings: Iterable[str]) -> None:
+        tail = StringTable.from_strings(strings)
+        self.blob = np.concatenate([self.blob, tail.blob])
+        self.offsets = np.concatenate([self.offsets, tail.offsets[1:] + self.offsets[-1]])
+
+    def __getitem__(self, i: int) -> str:
+        lo, hi = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.blob[lo:hi].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def save(self, path: Path, name: str) -> None:
+        save_array(path / f"{name}.blob.npy", self.blob)
+        save_array(path / f"{name}.offsets.npy", self.offsets)
+
+    @classmethod
+    def load(cls, path: Path, name: str, mmap: bool = True) -> "StringTable":
+        return cls(
+            np.load(path / f"{name}.blob.npy", mmap_mode="r" if mmap else None),
+            np.load(path / f"{name}.offsets.npy", mmap_mode="r" if mmap else None),
+        )
+
+
+class ChunkStore:
+    """Chunk ids, document ids, text and content hashes, addressed by index row."""
+
+    _COLUMNS = ("ids", "doc_ids", "texts", "hashes")
+
+    def __init__(
+        self, ids: StringTable, doc_ids: StringTable, texts: StringTable, hashes: StringTable
+    ) -> None:
+        self.ids = ids
+        self.doc_ids = doc_ids
+        self.texts = texts
+        self.hashes = hashes
+
+    @classmethod
+    def from_chunks(cls, chunks: Sequence[Chunk]) -> "ChunkStore":
+        return cls(
+            StringTable.from_strings(c.id for c in chunks),
+            StringTable.from_strings(c.doc_id for c in chunks),
+            StringTable.from_strings(c.text for c in chunks),
+            StringTable.from_strings(c.content_hash for c in chunks),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def extend(self, chunks: Sequence[Chunk]) -> None:
+        self.ids.extend(c.id for c in chunks)
+        self.doc_ids.extend(c.doc_id for c in chunks)
+        self.texts.extend(c.text for c in chunks)
+        self.hashes.extend(c.content_hash for c in chunks)
+
+    def __getitem__(self, row: int) -> Chunk:
+        return Chunk(
+            id=self.ids[row],
+            doc_id=self.doc_ids[row],
+            text=self.texts[row],
+            content_hash=self.hashes[row],
+        )
+
+    def save(self, path: Path) -> None:
+        for name in self._COLUMNS:
+            getattr(self, name).save(path, name)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "ChunkStore":
+        return cls(*(StringTable.load(path, name, mmap=mmap) for name in cls._COLUMNS))
@@ -0,0 +1,118 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+from ..observability.pipeline_metrics import CONTEXT_DROPPED, CONTEXT_TOKENS, CONTEXT_TOKENS_SAVED
+from .bm25 import term_hash
+from .embedder import tokenize
+from .service import Hit
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_SHIFTS = np.arange(64, dtype=np.uint64)
+
+
+class TokenCounter:
+    """
+    Stand-in for a model tokenizer: words and punctuation are pieces, and long words
+    cost one extra token per 4 characters (roughly what BPE vocabularies do). Counts
+    are memoised per text, since the same chunks come back request after request.
+    """
+
+    def __init__(self, max_entries: int = 65_536) -> None:
+        self.count = lru_cache(maxsize=max_entries)(self._count)
+
+    @staticmethod
+    def _count(text: str) -> int:
+        return sum(1 + (len(p) - 1) // 4 for p in _PIECE_RE.findall(text))
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over unigram and bigram features; near-duplicates differ in few bits."""
+    toks = tokenize(text)
+    feats = toks + [f"{a} {b}" for a, b in zip(toks, toks[1:], strict=False)]
+    if not feats:
+        return 0
+    hashes = np.array([term_hash(f) for f in feats], dtype=np.uint64)
+    votes = ((hashes[:, None] >> _SHIFTS) & np.uint64(1)).sum(axis=0, dtype=np.int64)
+    bits = np.packbits(2 * votes > len(feats), bitorder="little")
+    return int.from_bytes(bits.tobytes(), "little")
+
+
+@dataclass(frozen=True)
+class Context:
+    hits: list[Hit]  # the chunks that made it into the prompt, in rank order
+    tokens: int
+    over_budget: int  # candidates dropped because they did not fit
+    duplicates: int  # candidates (that fit) dropped as near-duplicates of a packed chunk
+    tokens_saved: int  # tokens of the dropped candidates
+
+
+class ContextAssembler:
+    """
+    Picks the prompt context from ranked candidates.
+
+    Walking the ranking best-first, a candidate is dropped when it would overflow
+    ``token_budget`` (smaller, lower-ranked chunks may still fit after it), or when its
+    SimHash is within ``max_distance`` bits of an already packed chunk. Packing
+    stops at ``max_chunks``. Each chunk costs ``overhead_tokens`` on top of its text
+    for the separator/citation header.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 1024,
+        *,
+        max_distance: int = 3,
+        overhead_tokens: int = 4,
+        counter: TokenCounter | None = None,
+        cache_size: int = 65_536,
+    ) -> None:
+        self.token_budget = token_budget
+        self.max_distance = max_distance
+        self.overhead_tokens = overhead_tokens
+        self.counter = counter or TokenCounter(cache_size)
+        self._signature = lru_cache(maxsize=cache_size)(simhash)
+
+    def assemble(self, hits: Sequence[Hit], max_chunks: int | None = None) -> Context:
+        limit = len(hits) if max_chunks is None else max_chunks
+        packed: list[Hit] = []
+        signatures = np.zeros(limit, dtype=np.uint64)
+        used = duplicates = over_budget = saved = 0
+        for hit in hits:
+            if len(packed) >= limit:
+                break
+            cost = self.counter.count(hit.text) + self.overhead_tokens
+            # Budget first: it is the cheaper check, and a chunk that cannot fit
+            # needs no signature
+            if used + cost > self.token_budget:
+                over_budget += 1
+                saved += cost
+                continue
+            sig = np.uint64(self._signature(hit.text))
+            if (np.bitwise_count(signatures[: len(packed)] ^ sig) <= self.max_distance).any():
+                duplicates += 1
+                saved += cost
+            else:
+                signatures[len(packed)] = sig
+                packed.append(hit)
+                used += cost
+
+        CONTEXT_TOKENS.observe(used)
+        CONTEXT_TOKENS_SAVED.observe(saved)
+        CONTEXT_DROPPED.labels(reason="duplicate").inc(duplicates)
+        CONTEXT_DROPPED.labels(reason="budget").inc(over_budget)
+        return Context(packed, used, over_budget, duplicates, saved)
+
+
+@lru_cache(maxsize=1)
+def get_context_assembler() -> ContextAssembler:
+    from ..app.settings import settings
+
+    return ContextAssembler(
+        settings.context_token_budget,
+        max_distance=settings.context_dedup_distance,
+        overhead_tokens=settings.context_overhead_tokens,
+    )
@@ -0,0 +1,51 @@
+import re
+import zlib
+from typing import Protocol, Sequence
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class Embedder(Protocol):
+    dim: int
+    model_id: str
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray: ...
+
+    def embed_one(self, text: str) -> np.ndarray: ...
+
+
+class HashingEmbedder:
+    """
+    Deterministic feature-hashing embedder.
+
+    Stand-in for a real embedding model: unigrams and bigrams are hashed (crc32, so the
+    result is stable across processes) into ``dim`` signed buckets and L2-normalised.
+    Good enough for lexical-ish similarity in tests, demos and benchmarks.
+    """
+
+    def __init__(self, dim: int = 256) -> None:
+        self.dim = dim
+        self.model_id = f"hashing-v1-{dim}"
+
+    def _features(self, text: str) -> list[str]:
+        toks = tokenize(text)
+        return toks + [f"{a} {b}" for a, b in zip(toks, toks[1:], strict=False)]
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feat in self._features(text):
+                h = zlib.crc32(feat.encode("utf-8"))
+                out[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
@@ -0,0 +1,124 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Rows of the database scored per matmul; bounds the (queries x block) score matrix.
+SCORE_BLOCK_ROWS = 262_144
+
+
+@dataclass(frozen=True)
+class SearchParams:
+    """Per-query knobs; each index kind reads the ones it understands."""
+
+    nprobe: int | None = None  # IVF: inverted lists probed
+    rescore: int | None = None  # quantized: candidates rescored = k * rescore
+    mode: str | None = None  # Retriever: "vector", "lexical" or "hybrid" (RRF of both)
+
+
+def save_array(path: Path, arr: np.ndarray) -> None:
+    """
+    Write an ``.npy`` file via rename, so processes that still have the old file
+    memory-mapped keep reading the old inode instead of a truncated file.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+
+
+def topk(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Row-wise top-k (highest first) of a 2-D score matrix.
+
+    Uses ``argpartition`` so only the k survivors per row are sorted. Rows with fewer than
+    k columns are padded with ``-inf`` scores and ``-1`` positions.
+    """
+    nq, n = scores.shape
+    if n == 0:
+        return np.full((nq, k), -np.inf, dtype=np.float32), np.full((nq, k), -1, np.int64)
+    if k < n:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        idx = np.take_along_axis(part, order, axis=1)
+    else:
+        idx = np.argsort(-scores, axis=1, kind="stable")
+    top = np.take_along_axis(scores, idx, axis=1).astype(np.float32, copy=False)
+    idx = idx.astype(np.int64, copy=False)
+    if idx.shape[1] < k:
+        pad = k - idx.shape[1]
+        top = np.pad(top, ((0, 0), (0, pad)), constant_values=-np.inf)
+        idx = np.pad(idx, ((0, 0), (0, pad)), constant_values=-1)
+    return top, idx
+
+
+def merge_topk(
+    a: tuple[np.ndarray, np.ndarray], b: tuple[np.ndarray, np.ndarray], k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Merge two (scores, ids) top-k results into one."""
+    scores = np.concatenate([a[0], b[0]], axis=1)
+    ids = np.concatenate([a[1], b[1]], axis=1)
+    top, pos = topk(scores, k)
+    return top, np.take_along_axis(ids, pos, axis=1)
+
+
+def as_queries(queries: np.ndarray) -> np.ndarray:
+    return np.atleast_2d(np.asarray(queries, dtype=np.float32))
+
+
+class FlatIndex:
+    """
+    Exact inner-product index over an (n, dim) float32 matrix.
+
+    Vectors are expected to be L2-normalised, so inner product == cosine similarity.
+    The matrix may be an ``np.memmap``: loaded indexes are opened read-only so every
+    worker process maps the same page-cache pages instead of holding a private copy.
+    """
+
+    kind = "flat"
+
+    def __init__(self, vectors: np.ndarray) -> None:
+        if vectors.ndim != 2:
+            raise ValueError("vectors must be a 2-D (n, dim) array")
+        self.vectors = vectors
+
+    @classmethod
+    def build(cls, vectors: np.ndarray) -> "FlatIndex":
+        return cls(as_queries(vectors))
+
+    @property
+    def ntotal(self) -> int:
+        return int(self.vectors.shape[0])
+
+    @property
+    def dim(self) -> int:
+        return int(self.vectors.shape[1])
+
+    def add(self, vectors: np.ndarray) -> None:
+        self.vectors = np.concatenate([self.vectors, as_queries(vectors)], axis=0)
+
+    def reconstruct(self, rows: np.ndarray) -> np.ndarray:
+        """Stored vectors for the given row ids."""
+        return np.asarray(self.vectors[rows], dtype=np.float32)
+
+    def search(
+        self, queries: np.ndarray, k: int, params: SearchParams | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Batched top-k search. Returns ``(scores, ids)``, both shaped (n_queries, k)."""
+        q = as_queries(queries)
+        best = topk(np.empty((q.shape[0], 0), dtype=np.float32), k)
+        for start in range(0, self.ntotal, SCORE_BLOCK_ROWS):
+            block = self.vectors[start : start + SCORE_BLOCK_ROWS]
+            scores, ids = topk(q @ block.T, k)
+            ids[ids >= 0] += start
+            best = (scores, ids) if start == 0 else merge_topk(best, (scores, ids), k)
+        return best
+
+    def save(self, path: Path) -> None:
+        save_array(path / "vectors.npy", np.ascontiguousarray(self.vectors, dtype=np.float32))
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "FlatIndex":
+        return cls(np.load(path / "vectors.npy", mmap_mode="r" if mmap else None))
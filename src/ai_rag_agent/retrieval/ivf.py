@@ -0,0 +1,176 @@
+from pathlib import Path
+
+import numpy as np
+
+from .index import SearchParams, as_queries, save_array, topk
+
+DEFAULT_NPROBE = 8
+_ASSIGN_BLOCK_ROWS = 65_536
+
+
+def assign_lists(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (by inner product) for every row of ``x``."""
+    out = np.empty(len(x), dtype=np.int64)
+    for start in range(0, len(x), _ASSIGN_BLOCK_ROWS):
+        block = x[start : start + _ASSIGN_BLOCK_ROWS]
+        out[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def train_centroids(x: np.ndarray, nlist: int, *, iters: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means: returns (nlist, dim) unit-norm centroids."""
+    x = np.asarray(x, dtype=np.float32)
+    if len(x) < nlist:
+        raise ValueError(f"need at least nlist={nlist} training vectors, got {len(x)}")
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(len(x), nlist, replace=False)].copy()
+    for _ in range(iters):
+        assign = assign_lists(x, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        empty = np.bincount(assign, minlength=nlist) == 0
+        if empty.any():
+            # Re-seed dead lists from random points rather than leaving them unused
+            sums[empty] = x[rng.choice(len(x), int(empty.sum()), replace=False)]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """
+    IVF-flat approximate index.
+
+    Vectors are grouped by nearest k-means centroid into inverted lists stored CSR-style
+    (``offsets`` into ``vectors``/``ids``), so a query only scores the ``nprobe`` lists
+    whose centroids are closest. ``add`` assigns new vectors to the existing centroids
+    and keeps them in an in-memory delta segment that is searched alongside the lists
+    and folded in by ``compact`` (done on ``save``); no retraining or rebuild needed.
+    """
+
+    kind = "ivf"
+
+    def __init__(
+        self, centroids: np.ndarray, offsets: np.ndarray, ids: np.ndarray, vectors: np.ndarray
+    ) -> None:
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+        self.vectors = vectors
+        self._delta_vectors = np.zeros((0, centroids.shape[1]), dtype=np.float32)
+        self._delta_lists = np.zeros(0, dtype=np.int64)
+        self._positions: np.ndarray | None = None
+
+    @classmethod
+    def empty(cls, centroids: np.ndarray) -> "IVFIndex":
+        nlist, dim = centroids.shape
+        return cls(
+            centroids,
+            np.zeros(nlist + 1, dtype=np.int64),
+            np.zeros(0, dtype=np.int64),
+            np.zeros((0, dim), dtype=np.float32),
+        )
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        nlist: int,
+        *,
+        train_size: int = 65_536,
+        iters: int = 10,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        rng = np.random.default_rng(seed)
+        sample = vectors
+        if len(vectors) > train_size:
+            sample = vectors[np.sort(rng.choice(len(vectors), train_size, replace=False))]
+        index = cls.empty(train_centroids(sample, nlist, iters=iters, seed=seed))
+        index.add(vectors)
+        index.compact()
+        return index
+
+    @property
+    def nlist(self) -> int:
+        return int(self.centroids.shape[0])
+
+    @property
+    def dim(self) -> int:
+        return int(self.centroids.shape[1])
+
+    @property
+    def ntotal(self) -> int:
+        return len(self.ids) + len(self._delta_lists)
+
+    def add(self, vectors: np.ndarray) -> None:
+        v = as_queries(vectors)
+        self._delta_vectors = np.concatenate([self._delta_vectors, v])
+        self._delta_lists = np.concatenate([self._delta_lists, assign_lists(v, self.centroids)])
+
+    def compact(self) -> None:
+        """Fold the delta segment into the inverted lists."""
+        if not len(self._delta_lists):
+            return
+        n_main = len(self.ids)
+        main_lists = np.repeat(np.arange(self.nlist), np.diff(self.offsets))
+        lists = np.concatenate([main_lists, self._delta_lists])
+        order = np.argsort(lists, kind="stable")
+        ids = np.concatenate([self.ids, n_main + np.arange(len(self._delta_lists))])
+        self.vectors = np.concatenate([self.vectors, self._delta_vectors])[order]
+        self.ids = ids[order]
+        self.offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(lists, minlength=self.nlist), out=self.offsets[1:])
+        self._delta_vectors = self._delta_vectors[:0]
+        self._delta_lists = self._delta_lists[:0]
+        self._positions = None
+
+    def reconstruct(self, rows: np.ndarray) -> np.ndarray:
+        """Stored vectors for the given row ids (undoes the list grouping)."""
+        self.compact()
+        if self._positions is None:
+            self._positions = np.empty(len(self.ids), dtype=np.int64)
+            self._positions[self.ids] = np.arange(len(self.ids))
+        return np.asarray(self.vectors[self._positions[rows]], dtype=np.float32)
+
+    def search(
+        self, queries: np.ndarray, k: int, params: SearchParams | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        q = as_queries(queries)
+        nprobe = min((params.nprobe if params else None) or DEFAULT_NPROBE, self.nlist)
+        _, probes = topk(q @ self.centroids.T, nprobe)
+        out_scores = np.full((len(q), k), -np.inf, dtype=np.float32)
+        out_ids = np.full((len(q), k), -1, dtype=np.int64)
+        n_main = len(self.ids)
+
+        for i, lists in enumerate(probes):
+            # Score list slices in place (views into the memmap, no gather copy)
+            spans = [(int(self.offsets[j]), int(self.offsets[j + 1])) for j in lists]
+            scores = [self.vectors[a:b] @ q[i] for a, b in spans if b > a]
+            ids = [self.ids[a:b] for a, b in spans if b > a]
+            if len(self._delta_lists):
+                rows = np.flatnonzero(np.isin(self._delta_lists, lists))
+                scores.append(self._delta_vectors[rows] @ q[i])
+                ids.append(n_main + rows)
+            if not scores:
+                continue
+            cand_ids = np.concatenate(ids)
+            top, pos = topk(np.concatenate(scores)[None, :], k)
+            found = pos[0] >= 0
+            out_scores[i] = top[0]
+            out_ids[i, found] = cand_ids[pos[0, found]]
+        return out_scores, out_ids
+
+    def save(self, path: Path) -> None:
+        self.compact()
+        save_array(path / "ivf.centroids.npy", self.centroids)
+        save_array(path / "ivf.offsets.npy", self.offsets)
+        save_array(path / "ivf.ids.npy", self.ids)
+        save_array(path / "ivf.vectors.npy", np.ascontiguousarray(self.vectors, dtype=np.float32))
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "IVFIndex":
+        return cls(
+            np.load(path / "ivf.centroids.npy"),
+            np.load(path / "ivf.offsets.npy"),
+            np.load(path / "ivf.ids.npy", mmap_mode="r" if mmap else None),
+            np.load(path / "ivf.vectors.npy", mmap_mode="r" if mmap else None),
+        )
@@ -0,0 +1,192 @@
+import mmap as _mmap
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+
+from .index import SearchParams, as_queries, merge_topk, save_array, topk
+
+# int8 rows widened to float32 per step; small enough to stay cache-resident
+_INT8_BLOCK_ROWS = 16_384
+
+
+# --- Codecs ---
+def fit_int8_scale(x: np.ndarray) -> np.ndarray:
+    """Symmetric per-dimension scale so the largest |value| maps to 127."""
+    return (np.maximum(np.abs(x).max(axis=0), 1e-12) / 127.0).astype(np.float32)
+
+
+def int8_encode(x: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(x / scale), -127, 127).astype(np.int8)
+
+
+def binary_encode(x: np.ndarray) -> np.ndarray:
+    """Sign bits packed into uint64 words (dim padded to a multiple of 64 with zeros)."""
+    bits = np.packbits(np.atleast_2d(x) > 0, axis=1)
+    pad = -bits.shape[1] % 8
+    if pad:
+        bits = np.pad(bits, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(bits).view(np.uint64)
+
+
+def hamming(codes: np.ndarray, q_code: np.ndarray) -> np.ndarray:
+    """Hamming distance from one packed query code to every row (XOR + popcount)."""
+    return np.bitwise_count(codes ^ q_code).sum(axis=1, dtype=np.uint32)
+
+
+def open_rescore_vectors(path: Path, mmap: bool = True) -> np.ndarray:
+    """
+    Open the float matrix for rescoring. Rescoring reads scattered rows, so kernel
+    readahead would fault in (and keep resident) neighbouring pages nobody asked for:
+    the file is mapped here, rather than by np.load, to madvise(MADV_RANDOM) it.
+    """
+    file = path / "vectors.npy"
+    if not mmap:
+        return np.load(file)
+    with open(file, "rb") as f:
+        if np.lib.format.read_magic(f) == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+        raw = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+    if hasattr(_mmap, "MADV_RANDOM"):
+        raw.madvise(_mmap.MADV_RANDOM)
+    flat = np.frombuffer(raw, dtype=dtype, count=int(np.prod(shape)), offset=offset)
+    return flat.reshape(shape, order="F" if fortran else "C")
+
+
+# --- Indexes ---
+class _RescoringIndex(ABC):
+    """
+    Scan compact codes for ``k * rescore`` candidates, then rescore only those rows
+    against the full-precision vectors. The float matrix stays memory-mapped on disk,
+    so its pages are touched for candidates only and resident memory is dominated by
+    the codes (int8: 4x smaller, binary: 32x smaller than float32).
+    """
+
+    kind = ""
+    default_rescore = 4
+
+    def __init__(self, codes: np.ndarray, vectors: np.ndarray) -> None:
+        self.codes = codes
+        self.vectors = vectors
+
+    @property
+    def ntotal(self) -> int:
+        return int(self.vectors.shape[0])
+
+    @property
+    def dim(self) -> int:
+        return int(self.vectors.shape[1])
+
+    @abstractmethod
+    def _encode(self, x: np.ndarray) -> np.ndarray: ...
+
+    @abstractmethod
+    def _candidates(self, q: np.ndarray, n: int) -> np.ndarray:
+        """Candidate rows for each query: (n_queries, n)."""
+
+    def add(self, vectors: np.ndarray) -> None:
+        v = as_queries(vectors)
+        self.codes = np.concatenate([self.codes, self._encode(v)])
+        self.vectors = np.concatenate([self.vectors, v])
+
+    def reconstruct(self, rows: np.ndarray) -> np.ndarray:
+        return np.asarray(self.vectors[rows], dtype=np.float32)
+
+    def search(
+        self, queries: np.ndarray, k: int, params: SearchParams | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        q = as_queries(queries)
+        factor = (params.rescore if params else None) or self.default_rescore
+        n_cand = min(self.ntotal, k * factor)
+        out_scores = np.full((len(q), k), -np.inf, dtype=np.float32)
+        out_ids = np.full((len(q), k), -1, dtype=np.int64)
+        if n_cand == 0:
+            return out_scores, out_ids
+        for i, cand in enumerate(self._candidates(q, n_cand)):
+            cand = np.sort(cand[cand >= 0])  # ascending rows -> sequential page reads
+            top, pos = topk((self.vectors[cand] @ q[i])[None, :], k)
+            found = pos[0] >= 0
+            out_scores[i] = top[0]
+            out_ids[i, found] = cand[pos[0, found]]
+        return out_scores, out_ids
+
+    def save(self, path: Path) -> None:
+        save_array(path / "quant.codes.npy", np.ascontiguousarray(self.codes))
+        save_array(path / "vectors.npy", np.ascontiguousarray(self.vectors, dtype=np.float32))
+
+
+class Int8Index(_RescoringIndex):
+    """Scalar-quantised (int8, per-dimension scale) codes with float rescoring."""
+
+    kind = "int8"
+    default_rescore = 4
+
+    def __init__(self, codes: np.ndarray, vectors: np.ndarray, scale: np.ndarray) -> None:
+        super().__init__(codes, vectors)
+        self.scale = scale
+
+    @classmethod
+    def build(cls, vectors: np.ndarray) -> "Int8Index":
+        v = as_queries(vectors)
+        scale = fit_int8_scale(v) if len(v) else np.ones(v.shape[1], dtype=np.float32)
+        return cls(int8_encode(v, scale), v, scale)
+
+    def _encode(self, x: np.ndarray) -> np.ndarray:
+        return int8_encode(x, self.scale)
+
+    def _candidates(self, q: np.ndarray, n: int) -> np.ndarray:
+        # q . (codes * scale) == (q * scale) . codes; cast per block to bound memory
+        qs = q * self.scale
+        best = topk(np.empty((len(q), 0), dtype=np.float32), n)
+        for start in range(0, len(self.codes), _INT8_BLOCK_ROWS):
+            block = self.codes[start : start + _INT8_BLOCK_ROWS].astype(np.float32)
+            scores, ids = topk(qs @ block.T, n)
+            ids[ids >= 0] += start
+            best = (scores, ids) if start == 0 else merge_topk(best, (scores, ids), n)
+        return best[1]
+
+    def save(self, path: Path) -> None:
+        super().save(path)
+        save_array(path / "quant.scale.npy", self.scale)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "Int8Index":
+        return cls(
+            np.load(path / "quant.codes.npy", mmap_mode="r" if mmap else None),
+            open_rescore_vectors(path, mmap),
+            np.load(path / "quant.scale.npy"),
+        )
+
+
+class BinaryIndex(_RescoringIndex):
+    """1-bit sign codes searched by packed-popcount Hamming distance, float rescoring."""
+
+    kind = "binary"
+    # Sign bits are coarse; a wide candidate pool keeps recall@10 near 1.0
+    default_rescore = 32
+
+    @classmethod
+    def build(cls, vectors: np.ndarray) -> "BinaryIndex":
+        v = as_queries(vectors)
+        return cls(binary_encode(v), v)
+
+    def _encode(self, x: np.ndarray) -> np.ndarray:
+        return binary_encode(x)
+
+    def _candidates(self, q: np.ndarray, n: int) -> np.ndarray:
+        q_codes = binary_encode(q)
+        out = np.empty((len(q), n), dtype=np.int64)
+        for i, q_code in enumerate(q_codes):
+            # Negate distances so topk's "highest first" means "closest first"
+            _, out[i] = topk(-hamming(self.codes, q_code).astype(np.int32)[None, :], n)
+        return out
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "BinaryIndex":
+        return cls(
+            np.load(path / "quant.codes.npy", mmap_mode="r" if mmap else None),
+            open_rescore_vectors(path, mmap),
+        )
@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import replace
+from functools import lru_cache
+from typing import Protocol, Sequence
+
+import numpy as np
+
+from ..cache.answer_cache import normalize_query
+from ..observability.cache_metrics import CACHE_ENTRIES, CACHE_EVICTIONS, CACHE_HITS, CACHE_MISSES
+from ..observability.pipeline_metrics import RERANK_CANDIDATES
+from .embedder import tokenize
+from .service import Hit
+
+
+class Scorer(Protocol):
+    """Scores ``texts`` against ``query`` (higher is better). Runs off the event loop."""
+
+    name: str
+
+    def score(self, query: str, texts: Sequence[str]) -> np.ndarray: ...
+
+
+class OverlapScorer:
+    """
+    Deterministic stand-in for a cross-encoder: the share of the query's distinct
+    terms found in the text, plus a smaller weight for matching query bigrams
+    (rewards phrases kept intact). Scores lie in [0, 1].
+    """
+
+    name = "overlap"
+
+    def score(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        q = tokenize(query)
+        terms = set(q)
+        bigrams = set(zip(q, q[1:], strict=False))
+        out = np.zeros(len(texts), dtype=np.float32)
+        if not terms:
+            return out
+        for i, text in enumerate(texts):
+            t = tokenize(text)
+            s = len(terms.intersection(t)) / len(terms)
+            if bigrams:
+                found = bigrams.intersection(zip(t, t[1:], strict=False))
+                s = 0.8 * s + 0.2 * len(found) / len(bigrams)
+            out[i] = s
+        return out
+
+
+SCORERS: dict[str, type] = {OverlapScorer.name: OverlapScorer}
+
+
+def query_key(query: str) -> bytes:
+    return hashlib.blake2b(normalize_query(query).encode("utf-8"), digest_size=8).digest()
+
+
+class ScoreCache:
+    """LRU of rerank scores keyed by (query hash, chunk id)."""
+
+    name = "rerank"
+
+    def __init__(self, max_entries: int = 50_000) -> None:
+        self.max_entries = max_entries
+        self._scores: OrderedDict[tuple[bytes, str], float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def get(self, qkey: bytes, chunk_id: str) -> float | None:
+        score = self._scores.get((qkey, chunk_id))
+        if score is None:
+            CACHE_MISSES.labels(cache=self.name).inc()
+            return None
+        self._scores.move_to_end((qkey, chunk_id))
+        CACHE_HITS.labels(cache=self.name, layer="exact").inc()
+        return score
+
+    def put(self, qkey: bytes, chunk_id: str, score: float) -> None:
+        self._scores[(qkey, chunk_id)] = score
+        self._scores.move_to_end((qkey, chunk_id))
+        while len(self._scores) > self.max_entries:
+            self._scores.popitem(last=False)
+            CACHE_EVICTIONS.labels(cache=self.name, reason="capacity").inc()
+        CACHE_ENTRIES.labels(cache=self.name).set(len(self._scores))
+
+
+class Reranker:
+    """
+    Rescores retrieved hits with a (CPU-heavy) ``Scorer`` and keeps the best ``k``.
+
+    Cached scores are reused; the rest are scored in batches of ``batch_size`` in
+    retrieval order on ``executor``, so the event loop never runs the scorer. Once a
+    batch adds nothing within ``margin`` of the current k-th best score, the top-k is
+    taken as stable and the remaining (lower-ranked) candidates are skipped.
+    """
+
+    def __init__(
+        self,
+        scorer: Scorer,
+        *,
+        cache: ScoreCache | None = None,
+        batch_size: int = 8,
+        margin: float = 0.1,
+        executor: Executor | None = None,
+    ) -> None:
+        self.scorer = scorer
+        self.cache = cache if cache is not None else ScoreCache()
+        self.batch_size = batch_size
+        self.margin = margin
+        self._executor = executor or ThreadPoolExecutor(2, thread_name_prefix="rerank")
+
+    async def rerank(self, query: str, hits: Sequence[Hit], k: int) -> list[Hit]:
+        qkey = query_key(query)
+        scores: dict[int, float] = {}
+        pending: list[int] = []
+        for i, hit in enumerate(hits):
+            cached = self.cache.get(qkey, hit.chunk_id)
+            if cached is None:
+                pending.append(i)
+            else:
+                scores[i] = cached
+        RERANK_CANDIDATES.labels(outcome="cached").inc(len(scores))
+
+        loop = asyncio.get_running_loop()
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start : start + self.batch_size]
+            texts = [hits[i].text for i in batch]
+            out = await loop.run_in_executor(self._executor, self.scorer.score, query, texts)
+            for i, s in zip(batch, out.tolist(), strict=True):
+                scores[i] = s
+                self.cache.put(qkey, hits[i].chunk_id, s)
+            RERANK_CANDIDATES.labels(outcome="scored").inc(len(batch))
+            if self._stable(scores, [scores[i] for i in batch], k):
+                RERANK_CANDIDATES.labels(outcome="skipped").inc(len(pending) - start - len(batch))
+                break
+
+        # Score desc, then retrieval rank: deterministic under ties
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))[:k]
+        return [replace(hits[i], score=scores[i]) for i in ranked]
+
+    def _stable(self, scores: dict[int, float], batch: list[float], k: int) -> bool:
+        if len(scores) <= len(batch) or len(scores) < k:
+            return False  # nothing to compare against yet
+        kth = sorted(scores.values(), reverse=True)[k - 1]
+        return max(batch) + self.margin <= kth
+
+
+@lru_cache(maxsize=1)
+def get_reranker() -> Reranker | None:
+    """Process-wide reranker; None when disabled."""
+    from ..app.settings import settings
+
+    if not settings.rerank_enabled:
+        return None
+    try:
+        scorer = SCORERS[settings.rerank_scorer]()
+    except KeyError as e:
+        raise ValueError(f"unknown rerank scorer: {settings.rerank_scorer!r}") from e
+    return Reranker(
+        scorer,
+        cache=ScoreCache(settings.rerank_cache_size),
+        batch_size=settings.rerank_batch_size,
+        margin=settings.rerank_margin,
+        executor=ThreadPoolExecutor(settings.rerank_workers, thread_name_prefix="rerank"),
+    )
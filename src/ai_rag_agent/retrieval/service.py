@@ -0,0 +1,249 @@
+import asyncio
+import json
+import math
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+import structlog
+
+from .bm25 import BM25Index
+from .chunks import Chunk, ChunkStore
+from .embedder import Embedder, HashingEmbedder
+from .index import FlatIndex, SearchParams
+from .ivf import IVFIndex
+from .quantize import BinaryIndex, Int8Index
+
+log = structlog.get_logger()
+
+INDEX_FORMAT_VERSION = 2  # v2: per-chunk content hashes
+INDEX_KINDS: dict[str, Any] = {
+    cls.kind: cls for cls in (FlatIndex, IVFIndex, Int8Index, BinaryIndex)
+}
+
+
+def load_index(path: Path, kind: str, mmap: bool = True):
+    try:
+        cls = INDEX_KINDS[kind]
+    except KeyError as e:
+        raise ValueError(f"unknown index kind: {kind!r}") from e
+    return cls.load(path, mmap=mmap)
+
+
+SEARCH_MODES = ("vector", "lexical", "hybrid")
+RRF_K = 60  # the usual reciprocal-rank-fusion constant; damps the weight of the top ranks
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[np.ndarray], k: int, rrf_k: int = RRF_K
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fuse ranked row lists (best first, ``-1`` padding ignored) by summing
+    ``1 / (rrf_k + rank)``. Rank-based, so BM25 and cosine scores need no calibration.
+    """
+    fused: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking.tolist(), start=1):
+            if row >= 0:
+                fused[row] = fused.get(row, 0.0) + 1.0 / (rrf_k + rank)
+    best = sorted(fused.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+    return (
+        np.array([s for _, s in best], dtype=np.float32),
+        np.array([r for r, _ in best], dtype=np.int64),
+    )
+
+
+def default_nlist(n: int) -> int:
+    # The usual IVF rule of thumb (~4*sqrt(n)) keeps both coarse and fine scans small
+    return max(1, min(n, int(4 * math.sqrt(n))))
+
+
+def build_index(kind: str, vectors: np.ndarray, *, nlist: int | None = None):
+    if kind == IVFIndex.kind:
+        return IVFIndex.build(vectors, nlist or default_nlist(len(vectors)))
+    try:
+        cls = INDEX_KINDS[kind]
+    except KeyError as e:
+        raise ValueError(f"unknown index kind: {kind!r}") from e
+    return cls.build(vectors)
+
+
+@dataclass(frozen=True)
+class Hit:
+    chunk_id: str
+    doc_id: str
+    text: str
+    score: float
+
+
+class Retriever:
+    """
+    Embeds queries and resolves index hits back to chunks.
+
+    With a ``lexical`` BM25 index alongside the vector index, searches can run in
+    ``vector``, ``lexical`` or ``hybrid`` mode (``SearchParams.mode``); hybrid fuses
+    both rankings with reciprocal-rank fusion, so exact identifiers and error codes
+    that embeddings blur still surface.
+    """
+
+    # Hybrid: candidates taken from each ranking before fusion, per requested hit
+    HYBRID_DEPTH = 4
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        index,
+        chunks: ChunkStore,
+        lexical: BM25Index | None = None,
+    ) -> None:
+        self.embedder = embedder
+        self.index = index
+        self.chunks = chunks
+        self.lexical = lexical
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    # --- Build / persist ---
+    @classmethod
+    def build(
+        cls,
+        chunks: Iterable[Chunk],
+        embedder: Embedder,
+        *,
+        kind: str = "flat",
+        nlist: int | None = None,
+        batch_size: int = 256,
+        lexical: bool = True,
+    ) -> "Retriever":
+        items = list(chunks)
+        blocks = [
+            embedder.embed([c.text for c in items[i : i + batch_size]])
+            for i in range(0, len(items), batch_size)
+        ]
+        vectors = np.concatenate(blocks) if blocks else np.zeros((0, embedder.dim), np.float32)
+        index = build_index(kind, vectors, nlist=nlist)
+        bm25 = BM25Index.build(c.text for c in items) if lexical else None
+        return cls(embedder, index, ChunkStore.from_chunks(items), bm25)
+
+    def add(self, chunks: Sequence[Chunk]) -> None:
+        """Append chunks; the index absorbs them without retraining."""
+        self.index.add(self.embedder.embed([c.text for c in chunks]))
+        if self.lexical is not None:
+            self.lexical.add([c.text for c in chunks])
+        self.chunks.extend(chunks)
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self.index.save(path)
+        self.chunks.save(path)
+        if self.lexical is not None:
+            self.lexical.save(path)
+        meta = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "kind": self.index.kind,
+            "lexical": self.lexical.kind if self.lexical is not None else None,
+            "count": len(self.chunks),
+            "dim": self.embedder.dim,
+            "model_id": self.embedder.model_id,
+        }
+        # Written last: a directory without meta.json is an incomplete build.
+        (path / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "Retriever":
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        if meta.get("format_version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"unsupported index format: {meta.get('format_version')!r}")
+        embedder = HashingEmbedder(dim=meta["dim"])
+        if embedder.model_id != meta["model_id"]:
+            raise ValueError(f"index built with unknown embedder {meta['model_id']!r}")
+        index = load_index(path, meta["kind"], mmap=mmap)
+        # Indexes saved before the lexical index existed simply have none
+        lexical = BM25Index.load(path, mmap=mmap) if meta.get("lexical") else None
+        return cls(embedder, index, ChunkStore.load(path, mmap=mmap), lexical)
+
+    # --- Query ---
+    def search_batch(
+        self, queries: Sequence[str], k: int, params: SearchParams | None = None
+    ) -> list[list[Hit]]:
+        if not queries or len(self.chunks) == 0:
+            return [[] for _ in queries]
+        mode = (params.mode if params else None) or "vector"
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"unknown search mode: {mode!r}")
+
+        results: list[tuple[np.ndarray, np.ndarray]]
+        if self.lexical is not None and mode == "lexical":
+            results = self.lexical.search(queries, k)
+        elif self.lexical is not None and mode == "hybrid":
+            depth = k * self.HYBRID_DEPTH
+            _, vec_ids = self.index.search(self.embedder.embed(queries), depth, params)
+            lex = self.lexical.search(queries, depth)
+            results = [
+                reciprocal_rank_fusion([v, lex_ids], k)
+                for v, (_, lex_ids) in zip(vec_ids, lex, strict=True)
+            ]
+        else:  # vector, or an index saved without a lexical part
+            scores, ids = self.index.search(self.embedder.embed(queries), k, params)
+            results = list(zip(scores, ids, strict=True))
+        return [
+            [
+                self._hit(int(row), float(score))
+                for score, row in zip(q_scores, q_ids, strict=True)
+                if row >= 0
+            ]
+            for q_scores, q_ids in results
+        ]
+
+    def search(self, query: str, k: int, params: SearchParams | None = None) -> list[Hit]:
+        return self.search_batch([query], k, params)[0]
+
+    def _hit(self, row: int, score: float) -> Hit:
+        chunk = self.chunks[row]
+        return Hit(chunk_id=chunk.id, doc_id=chunk.doc_id, text=chunk.text, score=score)
+
+
+@lru_cache(maxsize=1)
+def get_retriever() -> Retriever | None:
+    """
+    Process-wide retriever, opened (memory-mapped) from ``settings.index_dir``.
+    Returns None when no index is configured so callers can fall back.
+    """
+    from ..app.settings import settings
+    from ..cache.embedding_cache import CachedEmbedder, get_embedding_cache
+
+    if not settings.index_dir:
+        return None
+    path = Path(settings.index_dir)
+    if not (path / "meta.json").exists():
+        log.warning("index_missing", index_dir=str(path))
+        return None
+    retriever = Retriever.load(path, mmap=True)
+    cache = get_embedding_cache()
+    if cache is not None:  # repeated queries skip the embedding model
+        retriever.embedder = CachedEmbedder(retriever.embedder, cache)
+    log.info("index_loaded", index_dir=str(path), kind=retriever.index.kind, chunks=len(retriever))
+    return retriever
+
+
+_load_lock = threading.Lock()
+
+
+def open_retriever() -> Retriever | None:
+    """``get_retriever()`` for worker threads: concurrent cold callers share one load."""
+    # lru_cache does not hold back a second caller while the first is still loading
+    with _load_lock:
+        return get_retriever()
+
+
+async def load_retriever() -> Retriever | None:
+    """``get_retriever()`` for the event loop: a cold call opens the index in a thread."""
+    if get_retriever.cache_info().currsize:
+        return get_retriever()
+    return await asyncio.to_thread(open_retriever)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Collection, Mapping, Sequence
+
+import numpy as np
+
+from ..retrieval.chunks import Chunk
+from .store import PooledStore, StoredChunk, _metadata
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id text PRIMARY KEY,
+    doc_id text NOT NULL,
+    text text NOT NULL,
+    content_hash text NOT NULL,
+    metadata jsonb NOT NULL DEFAULT '{}',
+    embedding bytea NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_doc_id ON chunks (doc_id);
+"""
+COLUMNS = ("id", "doc_id", "text", "content_hash", "metadata", "embedding")
+
+# One round trip per lookup however many ids: the ids travel as a single text[] parameter
+GET_CHUNKS = (
+    "SELECT id, doc_id, text, content_hash, metadata FROM chunks WHERE id = ANY($1::text[])"
+)
+GET_VECTORS = "SELECT id, embedding FROM chunks WHERE id = ANY($1::text[])"
+UPSERT = """
+INSERT INTO chunks SELECT * FROM chunks_in
+ON CONFLICT (id) DO UPDATE SET
+    doc_id = EXCLUDED.doc_id,
+    text = EXCLUDED.text,
+    content_hash = EXCLUDED.content_hash,
+    metadata = EXCLUDED.metadata,
+    embedding = EXCLUDED.embedding
+"""
+
+
+class PostgresDocumentStore(PooledStore):
+    """
+    ``DocumentStore`` on Postgres through an asyncpg pool of ``min_size`` to
+    ``max_size`` connections. asyncpg prepares each statement once per connection and
+    caches it, so repeated lookups skip parsing and planning. ``put_chunks`` streams
+    the batch with binary COPY into a temporary table and upserts from there in the
+    same transaction.
+
+    asyncpg is an optional dependency, imported when the pool is first opened.
+    """
+
+    backend = "postgres"
+
+    def __init__(self, dsn: str, *, min_size: int = 1, max_size: int = 10) -> None:
+        super().__init__(max_size)
+        self.dsn = dsn
+        self.min_size = min_size
+        self._pool: Any = None
+
+    async def _open(self) -> None:
+        try:
+            import asyncpg
+        except ImportError as e:
+            raise RuntimeError("the postgres store needs asyncpg (pip install asyncpg)") from e
+        if self._pool is not None:
+            self._pool.terminate()  # opened on a previous event loop
+        self._pool = await asyncpg.create_pool(
+            self.dsn, min_size=self.min_size, max_size=self.pool_size
+        )
+        async with self._pool.acquire() as conn:
+            await conn.execute(SCHEMA)
+
+    def _checkout(self):
+        return self._pool.acquire()
+
+    async def put_chunks(
+        self,
+        chunks: Sequence[Chunk],
+        vectors: np.ndarray,
+        metadata: Sequence[Mapping[str, Any]] | None = None,
+    ) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        records = [
+            (c.id, c.doc_id, c.text, c.content_hash, meta, vec.tobytes())
+            for c, meta, vec in zip(chunks, _metadata(metadata, len(chunks)), vectors, strict=True)
+        ]
+        async with self.connection("put") as conn, conn.transaction():
+            await conn.execute(
+                "CREATE TEMP TABLE chunks_in (LIKE chunks INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            await conn.copy_records_to_table("chunks_in", records=records, columns=COLUMNS)
+            await conn.execute(UPSERT)
+
+    async def get_chunks(self, ids: Sequence[str]) -> dict[str, StoredChunk]:
+        if not ids:
+            return {}
+        async with self.connection("get") as conn:
+            rows = await conn.fetch(GET_CHUNKS, list(ids))
+        return {
+            r["id"]: StoredChunk(
+                r["id"], r["doc_id"], r["text"], r["content_hash"], json.loads(r["metadata"])
+            )
+            for r in rows
+        }
+
+    async def get_vectors(self, ids: Sequence[str]) -> dict[str, np.ndarray]:
+        if not ids:
+            return {}
+        async with self.connection("get_vectors") as conn:
+            rows = await conn.fetch(GET_VECTORS, list(ids))
+        return {r["id"]: np.frombuffer(r["embedding"], dtype=np.float32) for r in rows}
+
+    async def retain(self, ids: Collection[str]) -> int:
+        async with self.connection("retain") as conn:
+            status = await conn.execute(
+                "DELETE FROM chunks WHERE NOT (id = ANY($1::text[]))", list(ids)
+            )
+        return int(status.rsplit(" ", 1)[1])  # "DELETE <n>"
+
+    async def count(self) -> int:
+        async with self.connection("count") as conn:
+            return await conn.fetchval("SELECT count(*) FROM chunks")
+
+    async def aclose(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.close()
+        self._loop = self._opened = None
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Collection, Mapping, Protocol, Sequence
+
+import numpy as np
+import structlog
+
+from ..observability.storage_metrics import (
+    STORE_POOL_IN_USE,
+    STORE_POOL_MAX,
+    STORE_POOL_WAIT,
+    STORE_QUERY_LATENCY,
+)
+from ..retrieval.chunks import Chunk
+from ..retrieval.service import Hit
+
+log = structlog.get_logger()
+
+_SQL_VARS = 500  # ids per IN (...) query
+
+
+@dataclass(frozen=True)
+class StoredChunk:
+    id: str
+    doc_id: str
+    text: str
+    content_hash: str
+    metadata: Mapping[str, Any]
+
+
+class DocumentStore(Protocol):
+    """
+    System of record for chunks, their metadata and embeddings. The vector index holds
+    row ids and vectors for search; the store holds the text that hits resolve to.
+    """
+
+    backend: str
+
+    async def put_chunks(
+        self,
+        chunks: Sequence[Chunk],
+        vectors: np.ndarray,
+        metadata: Sequence[Mapping[str, Any]] | None = None,
+    ) -> None:
+        """Insert or replace ``chunks`` (by id) with their vectors, in bulk."""
+        ...
+
+    async def get_chunks(self, ids: Sequence[str]) -> dict[str, StoredChunk]:
+        """The stored chunks among ``ids``, fetched in one query."""
+        ...
+
+    async def get_vectors(self, ids: Sequence[str]) -> dict[str, np.ndarray]: ...
+
+    async def retain(self, ids: Collection[str]) -> int:
+        """Delete every chunk not in ``ids``; returns how many were deleted."""
+        ...
+
+    async def count(self) -> int: ...
+
+    async def aclose(self) -> None: ...
+
+
+class PooledStore(ABC):
+    """
+    Connection-pool bookkeeping shared by the stores: the pool is opened on first use
+    (again if the event loop changed), and every checkout records its wait time, the
+    connections in use and how long the operation held its connection.
+    """
+
+    backend = "base"
+
+    def __init__(self, pool_size: int) -> None:
+        self.pool_size = pool_size
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._opened: asyncio.Task | None = None
+        self._wait = STORE_POOL_WAIT.labels(backend=self.backend)
+        self._in_use = STORE_POOL_IN_USE.labels(backend=self.backend)
+        STORE_POOL_MAX.labels(backend=self.backend).set(pool_size)
+
+    @abstractmethod
+    async def _open(self) -> None: ...
+
+    @abstractmethod
+    def _checkout(self) -> Any:
+        """Async context manager yielding a raw connection."""
+
+    async def _ready(self) -> None:
+        loop = asyncio.get_running_loop()
+        task = self._opened
+        failed = task is not None and task.done() and (task.cancelled() or task.exception())
+        if self._loop is not loop or task is None or failed:
+            # Pools belong to the loop that opened them; concurrent first calls share one open
+            self._loop, self._opened = loop, loop.create_task(self._open())
+        assert self._opened is not None
+        await asyncio.shield(self._opened)
+
+    @asynccontextmanager
+    async def connection(self, op: str) -> AsyncIterator[Any]:
+        await self._ready()
+        t0 = time.perf_counter()
+        async with self._checkout() as conn:
+            t1 = time.perf_counter()
+            self._wait.observe(t1 - t0)
+            self._in_use.inc()
+            try:
+                yield conn
+            finally:
+                self._in_use.dec()
+                STORE_QUERY_LATENCY.labels(backend=self.backend, op=op).observe(
+                    time.perf_counter() - t1
+                )
+
+
+def _metadata(metadata: Sequence[Mapping[str, Any]] | None, n: int) -> list[str]:
+    if metadata is None:
+        return ["{}"] * n
+    if len(metadata) != n:
+        raise ValueError(f"{len(metadata)} metadata entries for {n} chunks")
+    return [json.dumps(m, separators=(",", ":")) for m in metadata]
+
+
+class SqliteDocumentStore(PooledStore):
+    """
+    ``DocumentStore`` in one SQLite file (WAL, so readers do not block the writer), for
+    tests and local runs. Queries run in worker threads on a pool of ``pool_size``
+    connections.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str | Path, pool_size: int = 4) -> None:
+        super().__init__(pool_size)
+        self.path = Path(path)
+        self._conns: list[sqlite3.Connection] = []
+        self._idle: asyncio.Queue[sqlite3.Connection] | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _connect_all(self) -> list[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conns = [self._connect() for _ in range(self.pool_size)]
+        conns[0].executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                id TEXT PRIMARY KEY,
+                doc_id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                metadata TEXT NOT NULL DEFAULT '{}',
+                embedding BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chunks_doc_id ON chunks (doc_id);
+            """
+        )
+        return conns
+
+    async def _open(self) -> None:
+        if not self._conns:
+            self._conns = await asyncio.to_thread(self._connect_all)
+        self._idle = asyncio.Queue()
+        for conn in self._conns:
+            self._idle.put_nowait(conn)
+
+    @asynccontextmanager
+    async def _checkout(self) -> AsyncIterator[sqlite3.Connection]:
+        assert self._idle is not None
+        conn = await self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def put_chunks(self, chunks, vectors, metadata=None) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        rows = [
+            (c.id, c.doc_id, c.text, c.content_hash, meta, vec.tobytes())
+            for c, meta, vec in zip(chunks, _metadata(metadata, len(chunks)), vectors, strict=True)
+        ]
+
+        def write(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+        async with self.connection("put") as conn:
+            await asyncio.to_thread(write, conn)
+
+    async def _select(self, op: str, columns: str, ids: Sequence[str]) -> list[tuple]:
+        def read(conn: sqlite3.Connection) -> list[tuple]:
+            out: list[tuple] = []
+            for i in range(0, len(ids), _SQL_VARS):
+                part = ids[i : i + _SQL_VARS]
+                sql = f"SELECT {columns} FROM chunks WHERE id IN ({','.join('?' * len(part))})"
+                out.extend(conn.execute(sql, part))
+            return out
+
+        if not ids:
+            return []
+        async with self.connection(op) as conn:
+            return await asyncio.to_thread(read, conn)
+
+    async def get_chunks(self, ids: Sequence[str]) -> dict[str, StoredChunk]:
+        rows = await self._select("get", "id, doc_id, text, content_hash, metadata", ids)
+        return {r[0]: StoredChunk(r[0], r[1], r[2], r[3], json.loads(r[4])) for r in rows}
+
+    async def get_vectors(self, ids: Sequence[str]) -> dict[str, np.ndarray]:
+        rows = await self._select("get_vectors", "id, embedding", ids)
+        return {key: np.frombuffer(blob, dtype=np.float32) for key, blob in rows}
+
+    async def retain(self, ids: Collection[str]) -> int:
+        keep = [(i,) for i in ids]
+
+        def prune(conn: sqlite3.Connection) -> int:
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep (id TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM keep")
+                conn.executemany("INSERT OR IGNORE INTO keep VALUES (?)", keep)
+                return conn.execute(
+                    "DELETE FROM chunks WHERE id NOT IN (SELECT id FROM keep)"
+                ).rowcount
+
+        async with self.connection("retain") as conn:
+            return await asyncio.to_thread(prune, conn)
+
+    async def count(self) -> int:
+        async with self.connection("count") as conn:
+            return await asyncio.to_thread(
+                lambda: conn.execute("SELECT count(*) FROM chunks").fetchone()[0]
+            )
+
+    async def aclose(self) -> None:
+        conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._loop = self._opened = self._idle = None
+
+
+async def hydrate_hits(store: DocumentStore, hit_lists: list[list[Hit]]) -> list[list[Hit]]:
+    """
+    Resolve the text of every hit, across all lists, from ``store`` in one batched
+    fetch. Hits whose chunk is no longer stored are dropped.
+    """
+    ids = list(dict.fromkeys(h.chunk_id for hits in hit_lists for h in hits))
+    if not ids:
+        return hit_lists
+    stored = await store.get_chunks(ids)
+    return [
+        [replace(h, text=stored[h.chunk_id].text) for h in hits if h.chunk_id in stored]
+        for hits in hit_lists
+    ]
+
+
+def build_document_store(backend: str) -> DocumentStore | None:
+    """A store for ``backend`` (none | sqlite | postgres), configured from settings."""
+    from ..app.settings import settings
+
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return SqliteDocumentStore(settings.store_sqlite_path, settings.store_pool_max_size)
+    if backend == "postgres":
+        from .postgres import PostgresDocumentStore
+
+        return PostgresDocumentStore(
+            settings.store_postgres_dsn,
+            min_size=settings.store_pool_min_size,
+            max_size=settings.store_pool_max_size,
+        )
+    raise ValueError(f"unknown store backend: {backend!r}")
+
+
+@lru_cache(maxsize=1)
+def get_document_store() -> DocumentStore | None:
+    """Process-wide document store; None when hits are served from the index files."""
+    from ..app.settings import settings
+
+    store = build_document_store(settings.store_backend)
+    if store is not None:
+        log.info("document_store", backend=store.backend)
+    return store
+
+
+async def close_document_store() -> None:
+    if get_document_store.cache_info().currsize:
+        store = get_document_store()
+        if store is not None:
+            await store.aclose()
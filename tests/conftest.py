@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_rag_agent.app.factory import create_app
+from ai_rag_agent.app.settings import settings
+from ai_rag_agent.cache.answer_cache import get_answer_cache
+from ai_rag_agent.cache.embedding_cache import get_embedding_cache
+from ai_rag_agent.resilience.policies import get_policy_registry
+from ai_rag_agent.retrieval.chunks import Chunk
+from ai_rag_agent.retrieval.context import get_context_assembler
+from ai_rag_agent.retrieval.embedder import HashingEmbedder
+from ai_rag_agent.retrieval.rerank import get_reranker
+from ai_rag_agent.retrieval.service import Retriever, get_retriever
+from ai_rag_agent.storage.store import get_document_store
+
+CHUNKS = [
+    Chunk(id="breaker.md#0", doc_id="breaker.md", text="The circuit breaker opens after failures"),
+    Chunk(id="retry.md#0", doc_id="retry.md", text="Retries use exponential backoff with jitter"),
+    Chunk(id="bulkhead.md#0", doc_id="bulkhead.md", text="A bulkhead caps concurrent calls"),
+]
+
+
+def _reset_singletons():
+    get_answer_cache.cache_clear()
+    get_embedding_cache.cache_clear()
+    get_retriever.cache_clear()
+    get_reranker.cache_clear()
+    get_context_assembler.cache_clear()
+    get_document_store.cache_clear()
+
+
+@pytest.fixture
+def indexed_app(tmp_path, monkeypatch):
+    """App served from a small on-disk index of CHUNKS."""
+    Retriever.build(CHUNKS, HashingEmbedder(dim=64)).save(tmp_path / "index")
+    monkeypatch.setattr(settings, "index_dir", str(tmp_path / "index"))
+    _reset_singletons()
+    yield TestClient(create_app())
+    _reset_singletons()
+
+
+@pytest.fixture
+def fresh_policies():
+    """A new policy registry (breakers, limiters, retry budgets) for the test."""
+    get_policy_registry.cache_clear()
+    yield get_policy_registry()
+    get_policy_registry.cache_clear()
@@ -0,0 +1,148 @@
+import asyncio
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from ai_rag_agent.app.factory import create_app
+from ai_rag_agent.app.settings import AdmissionClass, settings
+from ai_rag_agent.resilience.admission import AdmissionController, PriorityClass, Shed
+
+
+def _shed(priority, reason):
+    return (
+        REGISTRY.get_sample_value("admission_shed_total", {"priority": priority, "reason": reason})
+        or 0.0
+    )
+
+
+def test_sheds_when_estimated_wait_exceeds_the_budget():
+    async def run():
+        cls = PriorityClass("unit", concurrency=1, max_queue=10, queue_timeout_s=1.0)
+        await cls.acquire(1.0)
+        cls.release(0.5)  # service time: 0.5s per request
+        await cls.acquire(1.0)
+        with pytest.raises(Shed) as e:
+            await cls.acquire(0.2)  # one slot, 0.5s ahead of it
+        assert e.value.reason == "deadline" and e.value.retry_after == 1
+        waiter = asyncio.create_task(cls.acquire(1.0))  # fits: waits for the slot
+        await asyncio.sleep(0)
+        assert cls.queued == 1
+        cls.release(0.5)
+        await waiter
+        assert cls.inflight == 1 and cls.queued == 0
+
+    asyncio.run(run())
+
+
+def test_sheds_on_full_queue_and_queue_timeout():
+    async def run():
+        cls = PriorityClass("unit-q", concurrency=1, max_queue=1, queue_timeout_s=1.0)
+        await cls.acquire(1.0)
+        waiter = asyncio.create_task(cls.acquire(0.05))
+        await asyncio.sleep(0)
+        with pytest.raises(Shed, match="queue_full"):
+            await cls.acquire(1.0)
+        with pytest.raises(Shed, match="queue_timeout"):
+            await waiter
+        assert cls.queued == 0 and cls.inflight == 1
+
+    asyncio.run(run())
+
+
+def test_routes_map_to_classes_by_longest_prefix():
+    controller = AdmissionController.from_settings(settings)
+    assert controller.classify("/health") is None
+    assert controller.classify("/metrics") is None
+    assert controller.classify("/echo").name == "high"
+    assert controller.classify("/v1/answer").name == "normal"
+    assert controller.classify("/v1/answer:batch").name == "low"
+    assert controller.classify("/v1/demo-timeout").name == "low"
+    assert controller.classify("/unknown").name == settings.admission_default_class
+    with pytest.raises(ValueError, match="unknown admission class"):
+        AdmissionController({}, {"/x": "missing"}, "missing")
+
+
+def test_saturated_low_class_is_shed_while_probes_and_high_priority_pass(monkeypatch):
+    monkeypatch.setattr(
+        settings,
+        "admission_classes",
+        {
+            "high": AdmissionClass(concurrency=8, max_queue=8, queue_timeout_s=0.5),
+            "normal": AdmissionClass(concurrency=8, max_queue=8, queue_timeout_s=0.5),
+            "low": AdmissionClass(concurrency=1, max_queue=1, queue_timeout_s=0.5),
+        },
+    )
+    app = create_app()
+    slow = {"mode": "slow", "sleep_ms": 300, "timeout_ms": 1000}
+    before = _shed("low", "queue_full")
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+            hold = asyncio.create_task(client.get("/v1/demo-timeout", params=slow))
+            await asyncio.sleep(0.05)
+            # One in flight and one queued: the class is full, the next is shed at once
+            queued = asyncio.create_task(client.get("/v1/demo-timeout", params=slow))
+            await asyncio.sleep(0.05)
+            shed = await client.get("/v1/demo-timeout", params=slow)
+            health = await client.get("/health")
+            echo = await client.post("/echo", json={"message": "hi"})
+            return await hold, await queued, shed, health, echo
+
+    hold, queued, shed, health, echo = asyncio.run(run())
+    assert hold.status_code == queued.status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "1"
+    assert shed.json() == {"detail": "overloaded", "priority": "low", "reason": "queue_full"}
+    assert "x-request-id" in shed.headers
+    assert health.status_code == 200 and echo.status_code == 200
+    assert _shed("low", "queue_full") - before == 1
+
+
+def test_request_deadline_is_the_wait_budget(monkeypatch):
+    monkeypatch.setattr(
+        settings,
+        "admission_classes",
+        {**settings.admission_classes, "low": AdmissionClass(concurrency=1, queue_timeout_s=5)},
+    )
+    app = create_app()
+    slow = {"mode": "slow", "sleep_ms": 300, "timeout_ms": 1000}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+            hold = asyncio.create_task(client.get("/v1/demo-timeout", params=slow))
+            await asyncio.sleep(0.05)
+            r = await client.get(
+                "/v1/demo-timeout", params=slow, headers={"x-request-timeout-ms": "50"}
+            )
+            await hold
+            return r
+
+    r = asyncio.run(run())
+    assert r.status_code == 503 and r.json()["reason"] == "queue_timeout"
+
+
+def test_queue_timeout_caps_a_longer_deadline(monkeypatch):
+    monkeypatch.setattr(
+        settings,
+        "admission_classes",
+        {**settings.admission_classes, "low": AdmissionClass(concurrency=1, queue_timeout_s=0.05)},
+    )
+    app = create_app()
+    slow = {"mode": "slow", "sleep_ms": 300, "timeout_ms": 1000}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+            hold = asyncio.create_task(client.get("/v1/demo-timeout", params=slow))
+            await asyncio.sleep(0.05)
+            r = await client.get(
+                "/v1/demo-timeout", params=slow, headers={"x-request-timeout-ms": "5000"}
+            )
+            await hold
+            return r
+
+    r = asyncio.run(run())
+    assert r.status_code == 503 and r.json()["reason"] == "queue_timeout"
@@ -0,0 +1,95 @@
+import json
+
+from ai_rag_agent.retrieval.service import Retriever
+
+QUERIES = ["circuit breaker failures", "exponential backoff", "bulkhead concurrent calls"]
+
+
+def _lines(r):
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in r.text.splitlines()]
+
+
+def test_batch_streams_one_line_per_query_with_its_index(indexed_app, monkeypatch):
+    calls = []
+    search_batch = Retriever.search_batch
+
+    def spy(self, queries, k, params=None):
+        calls.append(len(queries))
+        return search_batch(self, queries, k, params)
+
+    monkeypatch.setattr(Retriever, "search_batch", spy)
+    queries = [{"query": q, "top_k": 1} for q in QUERIES * 4]
+    r = indexed_app.post("/v1/answer:batch", json={"queries": queries})
+    assert r.status_code == 200
+
+    lines = _lines(r)
+    assert sorted(line["index"] for line in lines) == list(range(len(queries)))
+    expected = ["breaker.md#0", "retry.md#0", "bulkhead.md#0"]
+    for line in lines:
+        assert line["citations"] == [expected[line["index"] % 3]]
+    # Concurrent queries were coalesced into shared search_batch calls
+    assert sum(calls) == len(queries) and len(calls) < len(queries)
+
+
+def test_batch_matches_single_query_endpoint(indexed_app):
+    single = indexed_app.post(
+        "/v1/answer", params={"stream": "false"}, json={"query": QUERIES[1], "top_k": 2}
+    ).json()
+    [line] = _lines(
+        indexed_app.post("/v1/answer:batch", json={"queries": [{"query": QUERIES[1], "top_k": 2}]})
+    )
+    assert (line["answer"], line["citations"]) == (single["answer"], single["citations"])
+
+
+def test_failed_query_is_reported_on_its_own_line(indexed_app, monkeypatch):
+    from ai_rag_agent.app.routers import answer
+
+    generate = answer._generate
+
+    async def flaky(payload, batched=False):
+        if payload.query == "boom":
+            raise RuntimeError("scorer crashed")
+        return await generate(payload, batched)
+
+    monkeypatch.setattr(answer, "_generate", flaky)
+    r = indexed_app.post(
+        "/v1/answer:batch", json={"queries": [{"query": "boom"}, {"query": QUERIES[0]}]}
+    )
+    by_index = {line["index"]: line for line in _lines(r)}
+    assert by_index[0] == {"index": 0, "error": "RuntimeError"}
+    assert by_index[1]["citations"][0] == "breaker.md#0"
+
+
+def test_batch_validation(indexed_app):
+    assert indexed_app.post("/v1/answer:batch", json={"queries": []}).status_code == 422
+    many = {"queries": [{"query": "x"}] * 1001}
+    assert indexed_app.post("/v1/answer:batch", json=many).status_code == 422
+
+
+def test_closing_the_stream_waits_for_cancelled_queries(monkeypatch):
+    import asyncio
+
+    from ai_rag_agent.app.routers import answer
+
+    unwound = []
+
+    async def slow(payload, batched=False):
+        if payload.query == "fast":
+            return answer.AnswerOut(answer="", citations=[]), "miss"
+        try:
+            await asyncio.sleep(10)
+        finally:
+            unwound.append(payload.query)
+
+    monkeypatch.setattr(answer, "_answer", slow)
+
+    async def main():
+        lines = answer._batch_lines(
+            [answer.AnswerIn(query=q) for q in ("fast", "slow1", "slow2")], concurrency=3
+        )
+        await anext(lines)
+        await lines.aclose()  # client disconnected after the first line
+        return sorted(unwound)
+
+    assert asyncio.run(main()) == ["slow1", "slow2"]
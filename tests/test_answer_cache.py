@@ -0,0 +1,124 @@
+import pytest
+from prometheus_client import REGISTRY
+from pydantic import ValidationError
+
+from ai_rag_agent.app.settings import Settings
+from ai_rag_agent.cache.answer_cache import AnswerCache
+from ai_rag_agent.retrieval.embedder import HashingEmbedder
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(**kw):
+    emb = HashingEmbedder(dim=64)
+    return AnswerCache(emb.embed_one, emb.dim, **kw)
+
+
+def _evictions(reason):
+    return (
+        REGISTRY.get_sample_value("cache_evictions_total", {"cache": "answer", "reason": reason})
+        or 0.0
+    )
+
+
+def test_exact_hit_ignores_case_and_whitespace():
+    cache = _cache()
+    cache.put("What is a bulkhead?", "caps concurrency", ["b#0"])
+    hit = cache.get("  what is   a BULKHEAD? ")
+    assert hit is not None and hit.layer == "exact"
+    assert hit.citations == ("b#0",)
+
+
+def test_semantic_hit_respects_threshold_and_variant():
+    cache = _cache(threshold=0.8)
+    cache.put("how does the circuit breaker open", "after failures", ["c#0"], variant="k=4")
+    hit = cache.get("how does the circuit breaker open up", variant="k=4")
+    assert hit is not None and hit.layer == "semantic"
+    assert cache.get("how does the circuit breaker open up", variant="k=8") is None
+    assert cache.get("exponential retry backoff", variant="k=4") is None
+
+
+def test_expired_entries_do_not_shadow_a_fresh_semantic_match():
+    clock = _Clock()
+    cache = _cache(threshold=0.8, ttl_s=10, clock=clock)
+    query = "how does the circuit breaker open up"
+    cache.put("how does the circuit breaker open", "stale", ["c#0"])
+    clock.now = 5
+    cache.put("how does the circuit breaker open now", "fresh", ["c#1"])
+    scores = [
+        float(cache.embed_query(q) @ cache.embed_query(query))
+        for q in ("how does the circuit breaker open", "how does the circuit breaker open now")
+    ]
+    assert scores[0] > scores[1] > 0.8  # the expired entry would be the best match
+    clock.now = 11
+    hit = cache.get(query)
+    assert hit is not None and hit.answer == "fresh"
+
+
+def test_given_vector_skips_the_embedder():
+    calls = []
+    emb = HashingEmbedder(dim=64)
+    cache = AnswerCache(lambda t: calls.append(t) or emb.embed_one(t), emb.dim)
+    vector = cache.embed_query("what is a bulkhead")
+    cache.put("what is a bulkhead", "caps calls", ["b#0"], vector=vector)
+    assert cache.fresh_exact("What is a BULKHEAD") and not cache.fresh_exact("bulkhead?")
+    assert cache.get("what is a bulkhead, exactly", vector=vector) is not None
+    assert len(calls) == 1
+
+
+def test_ttl_and_lru_capacity_eviction():
+    clock = _Clock()
+    cache = _cache(max_entries=2, ttl_s=10, threshold=1.1, clock=clock)
+    expired_before, capacity_before = _evictions("expired"), _evictions("capacity")
+
+    cache.put("a", "A", [])
+    cache.put("b", "B", [])
+    assert cache.get("a") is not None  # a is now most recently used
+    cache.put("c", "C", [])  # evicts b (LRU)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert _evictions("capacity") - capacity_before == 1
+
+    clock.now = 11
+    assert cache.get("a") is None
+    assert _evictions("expired") - expired_before == 1
+    assert len(cache) == 1
+
+
+def test_zero_capacity_is_rejected():
+    with pytest.raises(ValueError):
+        _cache(max_entries=0)
+    with pytest.raises(ValidationError):
+        Settings(answer_cache_max_entries=0)
+
+
+def test_memory_cap_bounds_bytes():
+    cache = _cache(max_bytes=2000, threshold=1.1)
+    for i in range(20):
+        cache.put(f"q{i}", "x" * 300, [f"d#{i}"])
+    assert cache.nbytes <= 2000
+    assert cache.get("q19") is not None
+    assert cache.get("q0") is None
+
+
+def test_answer_endpoint_replays_cached_answer_when_streaming(indexed_app):
+    body = {"query": "exponential backoff"}
+    first = indexed_app.post("/v1/answer", params={"stream": "false"}, json=body)
+    assert first.headers["x-cache"] == "miss"
+
+    with indexed_app.stream("POST", "/v1/answer?stream=true", json=body) as r:
+        assert r.headers["x-cache"] == "exact"
+        streamed = b"".join(r.iter_bytes()).decode()
+    assert streamed.strip() == first.json()["answer"]
+
+    again = indexed_app.post(
+        "/v1/answer", params={"stream": "false"}, json={"query": "Exponential  backoff?"}
+    )
+    assert again.headers["x-cache"] in {"exact", "semantic"}
+    assert again.json() == first.json()
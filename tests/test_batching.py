@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+import structlog
+
+from ai_rag_agent.ext.batch_backend import FixedCostBackend
+from ai_rag_agent.ext.batching import MicroBatcher
+from ai_rag_agent.resilience import deadline
+from ai_rag_agent.resilience.policies import DeadlineExceeded, TimeoutError
+
+
+def test_concurrent_calls_share_batches():
+    async def main():
+        backend = FixedCostBackend(call_ms=5, item_ms=0)
+        batcher = MicroBatcher(backend.run_batch, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(*[batcher.submit(str(i)) for i in range(20)])
+        await batcher.aclose()
+        return backend, results
+
+    backend, results = asyncio.run(main())
+    assert results == [f"out:{i}" for i in range(20)]
+    assert backend.calls == 3  # 8 + 8 + 4
+
+
+def test_lone_call_dispatches_after_max_wait():
+    async def main():
+        batcher = MicroBatcher(FixedCostBackend(call_ms=0).run_batch, max_wait_ms=10)
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        out = await batcher.submit("x")
+        await batcher.aclose()
+        return out, loop.time() - t0
+
+    out, elapsed = asyncio.run(main())
+    assert out == "out:x"
+    assert 0.005 < elapsed < 0.2
+
+
+def test_batch_errors_and_timeouts_reach_every_caller():
+    async def boom(items):
+        raise RuntimeError("backend down")
+
+    async def slow(items):
+        await asyncio.sleep(1)
+        return items
+
+    async def main():
+        failing = MicroBatcher(boom, max_wait_ms=1)
+        timing_out = MicroBatcher(slow, max_wait_ms=1, timeout_s=0.05)
+        errs = await asyncio.gather(
+            *[failing.submit(i) for i in range(3)],
+            *[timing_out.submit(i) for i in range(3)],
+            return_exceptions=True,
+        )
+        await failing.aclose()
+        await timing_out.aclose()
+        return errs
+
+    errs = asyncio.run(main())
+    assert all(isinstance(e, RuntimeError) for e in errs[:3])
+    assert all(isinstance(e, TimeoutError) for e in errs[3:])
+
+
+def test_batches_do_not_inherit_an_earlier_callers_context():
+    seen = []
+
+    async def record(items):
+        seen.append((deadline.remaining(), dict(structlog.contextvars.get_contextvars())))
+        return items
+
+    async def submit(batcher, item, timeout_s, request_id):
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+        token = deadline.set_deadline(timeout_s) if timeout_s else None
+        try:
+            return await batcher.submit(item)
+        finally:
+            if token is not None:
+                deadline.reset_deadline(token)
+
+    async def main():
+        batcher = MicroBatcher(record, max_wait_ms=1, timeout_s=1.0)
+        first = await asyncio.create_task(submit(batcher, "a", 0.05, "req-1"))
+        await asyncio.sleep(0.06)  # the first request's deadline has passed
+        second = await asyncio.create_task(submit(batcher, "b", None, "req-2"))
+        # A caller already past its deadline fails without joining a batch
+        with pytest.raises(DeadlineExceeded):
+            await asyncio.create_task(submit(batcher, "c", 0.0001, "req-3"))
+        await batcher.aclose()
+        return first, second
+
+    assert asyncio.run(main()) == ("a", "b")
+    (first_left, first_ctx), (second_left, second_ctx) = seen
+    assert first_left is not None and first_left <= 0.05
+    assert second_left is None
+    assert first_ctx == second_ctx == {}
+
+
+def test_bulkhead_caps_inflight_batches():
+    async def main():
+        active = peak = 0
+
+        async def tracked(items):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return items
+
+        batcher = MicroBatcher(
+            tracked, max_batch_size=2, max_wait_ms=0, semaphore=asyncio.Semaphore(2)
+        )
+        await asyncio.gather(*[batcher.submit(i) for i in range(12)])
+        await batcher.aclose()
+        return peak
+
+    assert asyncio.run(main()) == 2
+
+
+def test_rejects_bad_batch_size():
+    with pytest.raises(ValueError):
+        MicroBatcher(FixedCostBackend().run_batch, max_batch_size=0)
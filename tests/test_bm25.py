@@ -0,0 +1,109 @@
+import math
+from collections import Counter
+
+import numpy as np
+from conftest import CHUNKS
+
+from ai_rag_agent.retrieval.bm25 import BM25Index
+from ai_rag_agent.retrieval.chunks import Chunk
+from ai_rag_agent.retrieval.embedder import HashingEmbedder, tokenize
+from ai_rag_agent.retrieval.index import SearchParams
+from ai_rag_agent.retrieval.service import Retriever, reciprocal_rank_fusion
+
+
+def _corpus(n=400, vocab=300, seed=0):
+    rng = np.random.default_rng(seed)
+    # Zipf-ish word frequencies: a few very long posting lists, many short ones
+    p = 1.0 / np.arange(1, vocab + 1)
+    p /= p.sum()
+    return [
+        " ".join(f"w{w}" for w in rng.choice(vocab, size=rng.integers(5, 40), p=p))
+        for _ in range(n)
+    ]
+
+
+def _brute_force(texts, query, k1=1.2, b=0.75):
+    bags = [Counter(tokenize(t)) for t in texts]
+    avgdl = sum(sum(bag.values()) for bag in bags) / len(bags)
+    scores = []
+    for bag in bags:
+        dl = sum(bag.values())
+        s = 0.0
+        for term in set(tokenize(query)):
+            df = sum(term in other for other in bags)
+            if term in bag:
+                idf = math.log(1 + (len(bags) - df + 0.5) / (df + 0.5))
+                tf = bag[term]
+                s += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+        scores.append(s)
+    return np.array(scores)
+
+
+def test_scores_match_brute_force_and_pruning_is_exact():
+    texts = _corpus()
+    index = BM25Index.build(texts)
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        query = " ".join(f"w{w}" for w in rng.integers(0, 300, size=rng.integers(1, 6)))
+        scores, rows = index.search_one(query, 10)
+        full_scores, full_rows = index.search_one(query, 10, prune=False)
+        assert np.array_equal(rows, full_rows)
+
+        expected = _brute_force(texts, query)
+        assert np.allclose(scores, expected[rows], rtol=1e-4)
+        if len(rows):
+            assert scores[-1] >= np.sort(expected)[-len(rows)] - 1e-4
+
+
+def test_exact_identifier_beats_embeddings_in_hybrid():
+    chunks = [
+        *CHUNKS,
+        Chunk(id="errors.md#0", doc_id="errors.md", text="Upstream returned ERR_CONN_RESET_4471"),
+        Chunk(id="errors.md#1", doc_id="errors.md", text="Upstream returned a connection error"),
+    ]
+    retriever = Retriever.build(chunks, HashingEmbedder(dim=64))
+    query = "what does err_conn_reset_4471 mean"
+    lexical = retriever.search(query, k=1, params=SearchParams(mode="lexical"))
+    hybrid = retriever.search(query, k=2, params=SearchParams(mode="hybrid"))
+    assert lexical[0].chunk_id == "errors.md#0"
+    assert hybrid[0].chunk_id == "errors.md#0"
+
+
+def test_save_load_mmap_and_add(tmp_path):
+    texts = _corpus(n=200)
+    index = BM25Index.build(texts[:150])
+    index.add(texts[150:])
+    rebuilt = BM25Index.build(texts)
+    assert np.array_equal(index.docs, rebuilt.docs)
+    assert np.allclose(index.max_scores, rebuilt.max_scores)
+
+    rebuilt.save(tmp_path)
+    loaded = BM25Index.load(tmp_path)
+    assert isinstance(loaded.docs, np.memmap)
+    for q in ("w1 w7", "w42 w3 w250"):
+        assert np.array_equal(loaded.search_one(q, 5)[1], rebuilt.search_one(q, 5)[1])
+
+
+def test_rrf_rewards_agreement():
+    scores, rows = reciprocal_rank_fusion([np.array([1, 2, 3]), np.array([3, 1, -1])], k=3)
+    assert list(rows) == [1, 3, 2]
+    assert scores[0] == 1 / 61 + 1 / 62
+
+
+def test_retriever_without_lexical_index_falls_back_to_vectors(tmp_path):
+    Retriever.build(CHUNKS, HashingEmbedder(dim=64), lexical=False).save(tmp_path)
+    loaded = Retriever.load(tmp_path)
+    assert loaded.lexical is None
+    hits = loaded.search("circuit breaker", k=1, params=SearchParams(mode="hybrid"))
+    assert hits[0].chunk_id == "breaker.md#0"
+
+
+def test_answer_endpoint_accepts_search_mode(indexed_app):
+    for mode in ("lexical", "vector", "hybrid"):
+        r = indexed_app.post(
+            "/v1/answer",
+            params={"stream": "false"},
+            json={"query": "bulkhead concurrent calls", "mode": mode},
+        )
+        assert r.status_code == 200
+        assert r.json()["citations"][0] == "bulkhead.md#0"
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from conftest import CHUNKS
+
+from ai_rag_agent.app.settings import settings
+from ai_rag_agent.retrieval.chunks import Chunk
+from ai_rag_agent.retrieval.context import ContextAssembler, TokenCounter, simhash
+from ai_rag_agent.retrieval.embedder import HashingEmbedder
+from ai_rag_agent.retrieval.service import Hit, Retriever, get_retriever
+
+BASE = "the circuit breaker opens after five consecutive failures and stays open for thirty seconds"
+
+
+def _hit(i, text):
+    return Hit(chunk_id=f"c{i}", doc_id=f"d{i}", text=text, score=1.0 / (i + 1))
+
+
+def test_simhash_separates_near_duplicates_from_other_text():
+    near = simhash(BASE + " then half opens")
+    other = simhash("retries use exponential backoff with full jitter between attempts")
+    assert bin(simhash(BASE) ^ near).count("1") <= 12
+    assert bin(simhash(BASE) ^ other).count("1") > 20
+
+
+def test_token_counter_is_cached():
+    counter = TokenCounter()
+    # One token per piece, plus one per 4 characters past a word's first
+    assert counter.count("a bulkhead caps concurrent calls.") == 10
+    counter.count("a bulkhead caps concurrent calls.")
+    assert counter.count.cache_info().hits == 1
+
+
+def test_assembly_drops_duplicates_and_respects_the_budget():
+    hits = [
+        _hit(0, BASE),
+        _hit(1, BASE.replace("thirty", "30")),
+        _hit(2, "retries use exponential backoff with jitter " * 20),
+        _hit(3, "a bulkhead caps concurrent calls"),
+    ]
+    assembler = ContextAssembler(token_budget=60, max_distance=12)
+    context = assembler.assemble(hits)
+    assert [h.chunk_id for h in context.hits] == ["c0", "c3"]
+    assert (context.duplicates, context.over_budget) == (1, 1)
+    assert context.tokens <= 60
+    assert context.tokens_saved > 100
+
+    assert [h.chunk_id for h in assembler.assemble(hits, max_chunks=1).hits] == ["c0"]
+
+
+@pytest.fixture
+def dup_app(indexed_app, tmp_path, monkeypatch):
+    """indexed_app, but the index also holds a near-copy of the breaker chunk."""
+    copy = Chunk(id="breaker-copy.md#0", doc_id="breaker-copy.md", text=BASE)
+    original = Chunk(id="breaker.md#0", doc_id="breaker.md", text=BASE + ".")
+    Retriever.build([original, copy, *CHUNKS[1:]], HashingEmbedder(dim=64)).save(tmp_path / "dup")
+    monkeypatch.setattr(settings, "index_dir", str(tmp_path / "dup"))
+    get_retriever.cache_clear()
+    return indexed_app
+
+
+def test_citations_only_name_chunks_in_the_context(dup_app):
+    r = dup_app.post(
+        "/v1/answer",
+        params={"stream": "false"},
+        json={"query": "when does the circuit breaker open", "top_k": 2},
+    )
+    cites = r.json()["citations"]
+    assert len(cites) == 2
+    assert len({"breaker.md#0", "breaker-copy.md#0"} & set(cites)) == 1
+
+
+def test_answer_assembles_its_context_off_the_event_loop(indexed_app, monkeypatch):
+    calls = []
+    assemble = ContextAssembler.assemble
+
+    def spy(self, hits, max_chunks=None):
+        try:
+            asyncio.get_running_loop()
+            calls.append("loop")
+        except RuntimeError:
+            calls.append("thread")
+        return assemble(self, hits, max_chunks)
+
+    monkeypatch.setattr(ContextAssembler, "assemble", spy)
+    r = indexed_app.post("/v1/answer", params={"stream": "false"}, json={"query": "backoff"})
+    assert r.status_code == 200 and calls == ["thread"]
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_rag_agent.app.factory import create_app
+from ai_rag_agent.resilience import deadline, policies
+from ai_rag_agent.resilience.policies import (
+    DeadlineExceeded,
+    TimeoutError,
+    retryable,
+    with_timeout,
+)
+
+
+def test_header_parsing():
+    assert deadline.parse_timeout_ms("250") == 0.25
+    assert deadline.parse_timeout_ms(None) is None
+    assert deadline.parse_timeout_ms("soon") is None
+    assert deadline.parse_timeout_ms("-5") is None
+
+
+def test_with_timeout_is_clamped_by_the_deadline():
+    async def main():
+        token = deadline.set_deadline(0.05)
+        try:
+            t0 = time.perf_counter()
+            with pytest.raises(DeadlineExceeded):
+                await with_timeout(asyncio.sleep(1), timeout_s=5)
+            elapsed = time.perf_counter() - t0
+
+            await asyncio.sleep(0.01)
+            with pytest.raises(DeadlineExceeded):  # already expired: never started
+                await with_timeout(asyncio.sleep(0), timeout_s=5)
+        finally:
+            deadline.reset_deadline(token)
+        # Without a deadline the plain per-call timeout applies
+        with pytest.raises(TimeoutError) as plain:
+            await with_timeout(asyncio.sleep(1), timeout_s=0.01)
+        return elapsed, plain.value
+
+    elapsed, plain = asyncio.run(main())
+    assert elapsed < 0.5
+    assert not isinstance(plain, DeadlineExceeded)
+
+
+def test_nested_deadline_only_tightens():
+    async def main():
+        outer = deadline.set_deadline(0.1)
+        inner = deadline.set_deadline(10)
+        left = deadline.remaining()
+        deadline.reset_deadline(inner)
+        deadline.reset_deadline(outer)
+        return left, deadline.remaining()
+
+    left, after = asyncio.run(main())
+    assert left is not None and left <= 0.1
+    assert after is None
+
+
+def test_retry_budget_stops_retry_storm(fresh_policies):
+    # retryable follows the target's policy from the registry
+    fresh_policies.overrides["budget-test"] = {"retry_budget_ratio": 0.0, "retry_budget_max": 1.0}
+    attempts = 0
+
+    @retryable(target="budget-test")
+    async def always_fails():
+        nonlocal attempts
+        attempts += 1
+        raise RuntimeError("down")
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            asyncio.run(always_fails())
+    assert attempts == 2 + 1 + 1  # one budgeted retry, then first attempts only
+
+
+def test_backoff_longer_than_the_deadline_keeps_the_upstream_error(fresh_policies, monkeypatch):
+    monkeypatch.setattr(policies.random, "uniform", lambda lo, hi: hi)  # longest backoff
+    fresh_policies.overrides["backoff-test"] = {"retry_attempts": 5}
+    target = fresh_policies.get("backoff-test")
+    attempts = 0
+
+    async def fails():
+        nonlocal attempts
+        attempts += 1
+        raise RuntimeError("upstream down")
+
+    async def main():
+        token = deadline.set_deadline(0.12)  # room for the 0.1s first backoff only
+        try:
+            t0 = time.perf_counter()
+            with pytest.raises(RuntimeError, match="upstream down") as err:
+                await target.call(fails)
+            return time.perf_counter() - t0, err.value
+        finally:
+            deadline.reset_deadline(token)
+
+    elapsed, err = asyncio.run(main())
+    assert not isinstance(err, DeadlineExceeded)
+    assert attempts == 1 and elapsed < 0.05  # 0.12 - 0.1 < RETRY_MIN_REMAINING_S
+
+
+def test_retries_do_not_outlive_the_request_deadline(fresh_policies):
+    client = TestClient(create_app())
+    params = {"mode": "fail_then_ok", "fail_times": 1}
+    # Same failure, but only 30ms of budget: too little left to start the retry
+    r = client.get(
+        "/v1/demo-retry",
+        params={**params, "key": "deadline-short"},
+        headers={deadline.DEADLINE_HEADER: "30"},
+    )
+    assert r.status_code == 502
+    assert (
+        client.get("/v1/demo-retry", params={**params, "key": "deadline-none"}).status_code == 200
+    )
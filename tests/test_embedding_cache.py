@@ -0,0 +1,102 @@
+import numpy as np
+from conftest import CHUNKS, _reset_singletons
+from prometheus_client import REGISTRY
+
+from ai_rag_agent.app.settings import settings
+from ai_rag_agent.cache.answer_cache import get_answer_cache
+from ai_rag_agent.cache.embedding_cache import (
+    CachedEmbedder,
+    EmbeddingCache,
+    SqliteVectorStore,
+    content_key,
+    get_embedding_cache,
+)
+from ai_rag_agent.ingest.pipeline import ingest
+from ai_rag_agent.retrieval.embedder import HashingEmbedder
+from ai_rag_agent.retrieval.service import Retriever
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self, dim=32):
+        super().__init__(dim)
+        self.texts = []
+
+    def embed(self, texts):
+        self.texts.extend(texts)
+        return super().embed(texts)
+
+
+def _hits(layer):
+    return (
+        REGISTRY.get_sample_value("cache_hits_total", {"cache": "embedding", "layer": layer}) or 0
+    )
+
+
+def test_repeated_texts_are_embedded_once():
+    inner = CountingEmbedder()
+    embedder = CachedEmbedder(inner, EmbeddingCache(memory_entries=100))
+    texts = [c.text for c in CHUNKS]
+
+    first = embedder.embed(texts + [texts[0], "  " + texts[0] + "\n"])  # whitespace-normalised
+    assert inner.texts == texts
+    second = embedder.embed(texts)
+    assert inner.texts == texts
+    np.testing.assert_array_equal(first[:3], second)
+    np.testing.assert_array_equal(first[3], first[0])
+    np.testing.assert_allclose(second, HashingEmbedder(32).embed(texts))
+
+
+def test_disk_tier_survives_restarts_and_evicts_oldest(tmp_path):
+    keys = [content_key(f"text {i}", "m") for i in range(10)]
+    vectors = np.arange(40, dtype=np.float32).reshape(10, 4)
+    cache = EmbeddingCache(memory_entries=3, disk=SqliteVectorStore(tmp_path / "emb.db", 8))
+    cache.put_many(keys, vectors)
+    assert len(cache) == 3 and len(cache.disk) == 8
+
+    before = _hits("disk")
+    restarted = EmbeddingCache(disk=SqliteVectorStore(tmp_path / "emb.db", 8))
+    found = restarted.get_many(keys, dim=4)
+    assert found[:2] == [None, None]  # evicted first
+    np.testing.assert_array_equal(np.stack(found[2:]), vectors[2:])
+    assert _hits("disk") - before == 8
+    assert len(restarted) == 8  # promoted to memory
+    corrupt = EmbeddingCache(disk=restarted.disk)
+    assert corrupt.get_many(keys[2:3], dim=8) == [None]  # wrong record width: a miss
+
+
+def test_ingest_reuses_cached_embeddings(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for c in CHUNKS:
+        (docs / c.doc_id).write_text(c.text)
+    cache = EmbeddingCache(disk=SqliteVectorStore(tmp_path / "emb.db"))
+    first = ingest(docs, tmp_path / "a", workers=0, dim=32, embed_cache=cache)
+    assert (first.embedded, first.cached) == (3, 0)
+    # A fresh index (no previous one to reuse from) still skips the model
+    cold = EmbeddingCache(disk=SqliteVectorStore(tmp_path / "emb.db"))
+    second = ingest(docs, tmp_path / "b", workers=0, dim=32, embed_cache=cold)
+    assert (second.embedded, second.cached) == (0, 3)
+
+
+def test_answer_path_uses_the_cache(indexed_app):
+    before = _hits("memory")
+    r = indexed_app.post("/v1/answer", params={"stream": "false"}, json={"query": "bulkhead"})
+    assert r.status_code == 200
+    # The answer cache embeds the normalised query ("bulkhead" already is), so retrieval
+    # embedding the raw query hits the memory tier
+    assert _hits("memory") > before
+
+
+def test_answer_cache_never_touches_the_disk_tier(tmp_path, monkeypatch):
+    # Its lookups run on the event loop: a SQLite query there would block it
+    monkeypatch.setattr(settings, "embed_cache_path", str(tmp_path / "emb.db"))
+    _reset_singletons()
+    Retriever.build(CHUNKS, HashingEmbedder(dim=32)).save(tmp_path / "index")
+    monkeypatch.setattr(settings, "index_dir", str(tmp_path / "index"))
+    try:
+        cache, shared = get_answer_cache(), get_embedding_cache()
+        cache.put("what is a bulkhead", "caps calls", ["bulkhead.md#0"])
+        assert cache.get("What is a BULKHEAD") is not None
+        assert len(shared) == 1 and len(shared.disk) == 0
+    finally:
+        _reset_singletons()
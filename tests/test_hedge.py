@@ -0,0 +1,87 @@
+import asyncio
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_rag_agent.app.factory import create_app
+from ai_rag_agent.app.routers import resilience_demo
+from ai_rag_agent.resilience.policies import HedgePolicy, hedged_call
+
+
+def _scripted(*delays_s, fail=()):
+    """make_call whose n-th attempt sleeps delays_s[n] (and raises if n in fail)."""
+    state = {"n": 0, "cancelled": 0}
+
+    def make_call():
+        i = state["n"]
+        state["n"] += 1
+
+        async def attempt():
+            try:
+                await asyncio.sleep(delays_s[i])
+            except asyncio.CancelledError:
+                state["cancelled"] += 1
+                raise
+            if i in fail:
+                raise RuntimeError(f"attempt {i} failed")
+            return i
+
+        return attempt()
+
+    return make_call, state
+
+
+def test_slow_primary_is_hedged_and_loser_cancelled():
+    make_call, state = _scripted(1.0, 0.01)
+    policy = HedgePolicy("t")
+    out = asyncio.run(hedged_call(make_call, policy, delay_s=0.02))
+    assert out == 1
+    assert state == {"n": 2, "cancelled": 1}
+
+
+def test_fast_primary_and_missing_budget_send_no_hedge():
+    make_call, state = _scripted(0.0)
+    assert asyncio.run(hedged_call(make_call, HedgePolicy("t"), delay_s=0.05)) == 0
+    assert state["n"] == 1
+
+    broke = HedgePolicy("t", max_tokens=0.5)
+    make_call, state = _scripted(0.05, 0.0)
+    assert asyncio.run(hedged_call(make_call, broke, delay_s=0.01)) == 0
+    assert state["n"] == 1
+
+
+def test_hedge_rescues_failed_primary_and_errors_surface_when_both_fail():
+    make_call, _ = _scripted(0.05, 0.01, fail={0})
+    assert asyncio.run(hedged_call(make_call, HedgePolicy("t"), delay_s=0.01)) == 1
+
+    make_call, _ = _scripted(0.05, 0.01, fail={0, 1})
+    with pytest.raises(RuntimeError):
+        asyncio.run(hedged_call(make_call, HedgePolicy("t"), delay_s=0.01))
+
+
+def test_delay_follows_observed_quantile_and_budget_refills():
+    policy = HedgePolicy("t", quantile=0.9, min_samples=10, max_tokens=1.0, budget_ratio=0.5)
+    assert policy.hedge_delay() is None
+    for ms in range(1, 101):
+        policy.observe(ms / 1000)
+    assert policy.hedge_delay() == pytest.approx(0.091)
+
+    assert policy.try_spend() and not policy.try_spend()
+    policy.credit()
+    policy.credit()
+    assert policy.try_spend()
+
+
+def test_demo_hedge_cuts_tail_latency(monkeypatch, fresh_policies):
+    monkeypatch.setattr(resilience_demo, "FLAKY_HEDGE", HedgePolicy("flaky-op"))
+    random.seed(7)
+    client = TestClient(create_app())
+    r = client.get(
+        "/v1/demo-hedge",
+        params={"n": 200, "concurrency": 10, "sleep_ms": 5, "tail_ms": 300, "tail_p": 0.03},
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert body["hedges_sent"] > 0
+    assert body["hedged"]["p99_ms"] < body["unhedged"]["p99_ms"]
@@ -0,0 +1,122 @@
+import asyncio
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+from aiobreaker import CircuitBreakerError
+from prometheus_client import REGISTRY
+
+from ai_rag_agent.app.settings import UpstreamConfig, settings
+from ai_rag_agent.ext.http_client import UpstreamClient, UpstreamClients, UpstreamStatusError
+from ai_rag_agent.ext.upstream_stub import StubUpstream
+from ai_rag_agent.resilience.policies import TimeoutError, get_policy_registry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(
+        settings, "resilience_targets", {"stub": {"breaker_fail_max": 2, "timeout_s": 0.2}}
+    )
+    get_policy_registry.cache_clear()
+    yield get_policy_registry()
+    get_policy_registry.cache_clear()
+
+
+def _client(stub, name="stub"):
+    config = UpstreamConfig(base_url="http://stub")
+    return UpstreamClient(name, config, transport=httpx.ASGITransport(app=stub))
+
+
+def test_requests_go_through_the_breaker_and_timeout(registry):
+    stub = StubUpstream(latency_ms=0)
+    client = _client(stub)
+
+    async def run():
+        assert (await client.post("/embed", json={"texts": ["a"]})).json()["ok"]
+        assert (await client.get("/status/404")).status_code == 404  # not a failure
+        with pytest.raises(UpstreamStatusError):
+            await client.get("/status/503")
+        with pytest.raises(CircuitBreakerError):  # second failure opens the breaker
+            await client.get("/status/503")
+        with pytest.raises(CircuitBreakerError):
+            await client.get("/embed")
+        await client.aclose()
+
+    asyncio.run(run())
+    assert stub.requests == 4  # the last call never left the process
+    assert registry.get("stub").breaker.fail_counter == 2
+
+
+def test_timeout_comes_from_the_target_policy(registry):
+    client = _client(StubUpstream(latency_ms=500))
+
+    async def run():
+        with pytest.raises(TimeoutError):
+            await client.get("/slow")
+        await client.aclose()
+
+    t0 = time.perf_counter()
+    asyncio.run(run())
+    assert time.perf_counter() - t0 < 0.45
+
+
+def test_client_left_open_on_another_loop_is_an_error(registry):
+    client = _client(StubUpstream(latency_ms=0))
+    asyncio.run(client.get("/embed"))  # never closed
+    with pytest.raises(RuntimeError, match="another event loop"):
+        asyncio.run(client.get("/embed"))
+
+    async def close_and_reuse():
+        await client.aclose()
+        response = await client.get("/embed")
+        await client.aclose()
+        return response.status_code
+
+    # Closed (here on the wrong loop, harmless for the in-process transport): reopens
+    assert asyncio.run(close_and_reuse()) == 200
+    assert registry.get("stub").breaker.fail_counter == 0
+
+
+def test_unknown_upstream_is_an_error():
+    with pytest.raises(KeyError, match="unknown upstream"):
+        UpstreamClients({}).get("llm")
+
+
+def _serve(app):
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, sock.getsockname()[1]
+
+
+def _metric(name, upstream):
+    return REGISTRY.get_sample_value(name, {"upstream": upstream}) or 0
+
+
+def test_connections_are_pooled_and_reused(registry):
+    stub = StubUpstream(latency_ms=1)
+    server, thread, port = _serve(stub)
+    client = UpstreamClient("pooled", UpstreamConfig(base_url=f"http://127.0.0.1:{port}"))
+    opened = _metric("upstream_http_connections_opened_total", "pooled")
+    reused = _metric("upstream_http_connections_reused_total", "pooled")
+
+    async def run():
+        for _ in range(3):  # 3 waves of 4 concurrent calls share 4 connections
+            await asyncio.gather(*(client.get("/embed") for _ in range(4)))
+        await client.aclose()
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.should_exit = True
+        thread.join()
+    assert len(stub.connections) == 4
+    assert _metric("upstream_http_connections_opened_total", "pooled") - opened == 4
+    assert _metric("upstream_http_connections_reused_total", "pooled") - reused == 8
@@ -0,0 +1,63 @@
+from prometheus_client import REGISTRY
+
+from ai_rag_agent.ingest.cli import main as ingest_main
+from ai_rag_agent.ingest.pipeline import ingest, split_text
+from ai_rag_agent.retrieval.service import Retriever
+
+
+def _corpus(root):
+    (root / "sub").mkdir(parents=True)
+    (root / "breaker.md").write_text("# Breaker\n\nThe circuit breaker opens after failures.")
+    (root / "retry.txt").write_text("Retries use exponential backoff.\n\nJitter avoids herds.")
+    (root / "sub" / "bulkhead.md").write_text("A bulkhead caps concurrent calls.")
+    (root / "ignored.bin").write_bytes(b"\x00\x01")
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_split_text_packs_and_splits():
+    assert list(split_text("a\n\nb\n\nc", max_chars=10)) == ["a\n\nb\n\nc"]
+    assert list(split_text("aaaa\n\nbbbb", max_chars=5)) == ["aaaa", "bbbb"]
+    parts = list(split_text("x" * 25, max_chars=10, overlap=2))
+    assert all(len(p) <= 10 for p in parts) and "".join(p[:8] for p in parts).startswith("x" * 24)
+
+
+def test_ingest_builds_searchable_index(tmp_path):
+    _corpus(tmp_path / "docs")
+    stats = ingest(tmp_path / "docs", tmp_path / "index", workers=0, dim=64)
+    assert stats.documents == 3
+    assert stats.embedded == stats.chunks > 0
+
+    retriever = Retriever.load(tmp_path / "index")
+    assert {retriever.chunks[i].doc_id for i in range(len(retriever))} == {
+        "breaker.md",
+        "retry.txt",
+        "sub/bulkhead.md",
+    }
+    assert retriever.search("bulkhead concurrent", k=1)[0].chunk_id == "sub/bulkhead.md#0"
+
+
+def test_reingest_skips_unchanged_chunks(tmp_path):
+    docs, index = tmp_path / "docs", tmp_path / "index"
+    _corpus(docs)
+    first = ingest(docs, index, workers=0, dim=64)
+    reused_before = _sample("ingest_chunks_total", outcome="reused")
+
+    (docs / "sub" / "bulkhead.md").write_text("A bulkhead caps in-flight calls per dependency.")
+    second = ingest(docs, index, workers=0, dim=64, kind="ivf")
+
+    assert second.chunks == first.chunks
+    assert second.embedded == 1
+    assert second.reused == first.chunks - 1
+    assert _sample("ingest_chunks_total", outcome="reused") - reused_before == second.reused
+    retriever = Retriever.load(index)
+    assert retriever.index.kind == "ivf"
+    assert retriever.search("in-flight calls per dependency", k=1)[0].doc_id == "sub/bulkhead.md"
+
+
+def test_cli_with_process_pool(tmp_path):
+    _corpus(tmp_path / "docs")
+    ingest_main([str(tmp_path / "docs"), "--index-dir", str(tmp_path / "idx"), "--workers", "2"])
+    assert len(Retriever.load(tmp_path / "idx")) == 3
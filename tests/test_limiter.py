@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from ai_rag_agent.app.factory import create_app
+from ai_rag_agent.resilience.limiter import AdaptiveLimiter, LimiterRejected
+from ai_rag_agent.resilience.policies import TimeoutError, with_limiter
+
+
+def _limiter(**kw):
+    return AdaptiveLimiter(target="test", **kw)
+
+
+def test_limit_grows_when_busy_and_backs_off_on_latency_and_timeouts():
+    lim = _limiter(initial_limit=4, max_limit=10)
+    for _ in range(20):
+        lim._inflight += 1
+        lim.release(0.01)
+    assert lim.limit == 10
+
+    lim._inflight += 1
+    lim.release(0.1)  # 10x the baseline
+    assert lim.limit == 9
+
+    lim._inflight += 1
+    lim.release(0.01, dropped=True)
+    assert lim.limit == 8
+
+    lim._inflight += 1
+    lim.release(0.01, utilised=False)  # idle samples don't grow the limit
+    assert lim.limit == 8
+
+
+def test_queue_full_and_queue_timeout_reject():
+    async def main():
+        lim = _limiter(initial_limit=1, max_queue=1, queue_timeout_s=0.05)
+        gate = asyncio.Event()
+
+        async def hold():
+            async with lim.slot():
+                await gate.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(lim.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(LimiterRejected) as full:
+            await lim.acquire()
+        with pytest.raises(LimiterRejected) as timed_out:
+            await queued
+        gate.set()
+        await holder
+        return full.value.reason, timed_out.value.reason, lim.inflight, lim.queued
+
+    assert asyncio.run(main()) == ("queue_full", "queue_timeout", 0, 0)
+
+
+def test_queued_callers_get_slots_in_order_and_timeouts_count_as_drops():
+    async def main():
+        lim = _limiter(initial_limit=2, drop_on=(TimeoutError,))
+        order = []
+
+        async def op(i):
+            await asyncio.sleep(0.01)
+            order.append(i)
+
+        await asyncio.gather(*[with_limiter(op(i), lim) for i in range(6)])
+        drained = lim.inflight == 0 and order == list(range(6))
+
+        async def times_out():
+            raise TimeoutError("slow")
+
+        before = lim._limit
+        with pytest.raises(TimeoutError):
+            await with_limiter(times_out(), lim)
+        return drained, lim._limit < before
+
+    assert asyncio.run(main()) == (True, True)
+
+
+def test_demo_bulkhead_adaptive_mode_reports_limit_per_wave(fresh_policies):
+    client = TestClient(create_app())
+    r = client.get(
+        "/v1/demo-bulkhead",
+        params={"mode": "adaptive", "concurrency": 20, "sleep_ms": 10, "shift_ms": 60},
+    )
+    assert r.status_code == 200
+    phases = r.json()["phases"]
+    assert [p["sleep_ms"] for p in phases] == [10, 60, 10]
+    assert phases[1]["min_limit"] < phases[0]["limit"]
+    assert all(p["rejected"] == 0 for p in phases)
+    # /metrics exports the limit of the limiter the demo used
+    limit = REGISTRY.get_sample_value("adaptive_limiter_limit", {"target": "flaky-op"})
+    assert limit == phases[-1]["limit"] == fresh_policies.get("flaky-op").limiter.limit
+
+
+def test_demo_bulkhead_is_adaptive_by_default_and_bounds_concurrency(fresh_policies):
+    client = TestClient(create_app())
+    r = client.get("/v1/demo-bulkhead", params={"concurrency": 4, "sleep_ms": 1})
+    assert r.status_code == 200 and r.json()["mode"] == "adaptive"
+    assert client.get("/v1/demo-bulkhead", params={"concurrency": 0}).status_code == 422
@@ -0,0 +1,46 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _loadtest(*args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src")}
+    return subprocess.run(
+        [sys.executable, str(ROOT / "benchmarks" / "loadtest.py"), *args],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+
+def test_replay_reports_every_endpoint_and_gates_regressions(tmp_path):
+    out = tmp_path / "current.json"
+    run = _loadtest(
+        "run", "--requests", "150", "--warmup", "10", "--docs", "200", "--out", str(out)
+    )
+    assert run.returncode == 0, run.stderr
+    results = json.loads(out.read_text())
+    endpoints = results["endpoints"]
+    assert {"answer", "answer_stream", "answer_sse", "echo", "demo_timeout"} <= set(endpoints)
+    assert endpoints["_total"]["requests"] == 150
+    assert endpoints["echo"]["errors"] == 0
+    assert endpoints["answer_stream"]["ttfb_p50_ms"] <= endpoints["answer_stream"]["p50_ms"]
+    assert "ttfb_p50_ms" not in endpoints["answer"]
+
+    assert _loadtest("compare", str(out), str(out)).returncode == 0
+
+    # A baseline twice as fast on echo: the current run is a regression
+    faster = json.loads(out.read_text())
+    echo = faster["endpoints"]["echo"]
+    echo["p99_ms"] = echo["p99_ms"] / 2 - 1.0
+    echo["rps"] *= 2
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(faster))
+    gate = _loadtest("compare", str(baseline), str(out), "--tolerance", "0.2")
+    assert gate.returncode == 1
+    assert "echo: p99_ms" in gate.stdout and "echo: rps" in gate.stdout
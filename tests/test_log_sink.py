@@ -0,0 +1,109 @@
+import asyncio
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from ai_rag_agent.app import factory
+from ai_rag_agent.app.factory import create_app
+from ai_rag_agent.app.settings import settings
+from ai_rag_agent.observability import access_log
+from ai_rag_agent.observability.log_sink import QueueLogger, QueueLogSink
+
+
+class _CountingStream(io.StringIO):
+    writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+
+def test_lines_are_rendered_and_written_in_batches():
+    stream = _CountingStream()
+    sink = QueueLogSink(stream, batch_size=100, flush_interval_s=0.01)
+    logger = QueueLogger(sink)
+    for i in range(1000):
+        logger.info(message="evt", i=i)
+    sink.close()
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["i"] for line in lines] == list(range(1000))
+    assert stream.writes <= 1000 / 100 + 5
+
+
+class _Unrenderable:
+    def __repr__(self):
+        raise RuntimeError("no repr")
+
+
+def test_unrenderable_event_is_logged_as_valid_json():
+    stream = io.StringIO()
+    sink = QueueLogSink(stream, flush_interval_s=60)
+    sink.put({"message": "bad", "payload": _Unrenderable()})
+    sink.put({"message": "ok"})
+    sink.close()
+    failed, ok = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert failed == {"message": "log_render_failed", "error": "no repr"}
+    assert ok == {"message": "ok"}
+
+
+def test_full_buffer_drops_oldest_and_counts():
+    stream = io.StringIO()
+    # The writer only wakes on close: everything stays queued until then
+    sink = QueueLogSink(stream, max_lines=10, batch_size=1000, flush_interval_s=60)
+    for i in range(25):
+        sink.put({"i": i})
+    assert sink.dropped == 15
+    sink.close()
+    assert [json.loads(line)["i"] for line in stream.getvalue().splitlines()] == list(range(15, 25))
+
+    sink.put({"i": "late"})  # after close: written inline, not lost
+    assert stream.getvalue().endswith('{"i": "late"}\n')
+
+
+class _Recorder:
+    def __init__(self):
+        self.events = []
+
+    def info(self, event, **kw):
+        self.events.append(kw)
+
+
+def test_access_log_sampling_keeps_errors_and_slow_requests(monkeypatch):
+    rec = _Recorder()
+    monkeypatch.setattr(access_log, "logger", rec)
+    monkeypatch.setattr(settings, "access_log_sample_rate", 0.0)
+    client = TestClient(create_app())
+
+    for _ in range(20):
+        client.get("/health")
+    assert client.get("/missing").status_code == 404
+    assert [e["status_code"] for e in rec.events] == [404]
+
+    monkeypatch.setattr(settings, "access_log_slow_ms", 0.0)  # everything counts as slow
+    client.get("/health")
+    assert rec.events[-1]["path"] == "/health" and "sample_rate" not in rec.events[-1]
+
+    monkeypatch.setattr(settings, "access_log_slow_ms", 1e9)
+    monkeypatch.setattr(settings, "access_log_sample_rate", 0.5)
+    for _ in range(200):
+        client.get("/health")
+    kept = rec.events[2:]
+    assert 50 < len(kept) < 150
+    assert all(e["sample_rate"] == 0.5 for e in kept)
+
+
+def test_shutdown_flushes_logs_off_the_event_loop(monkeypatch):
+    flushed = []
+
+    def flush():
+        try:
+            asyncio.get_running_loop()
+            flushed.append("loop")
+        except RuntimeError:
+            flushed.append("thread")
+
+    monkeypatch.setattr(factory, "flush_logs", flush)
+    with TestClient(create_app()):
+        pass
+    assert flushed == ["thread"]
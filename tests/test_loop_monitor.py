@@ -0,0 +1,72 @@
+import asyncio
+import sys
+import time
+
+from prometheus_client import REGISTRY
+
+from ai_rag_agent.observability import loop_monitor
+from ai_rag_agent.observability.loop_monitor import LoopMonitor
+
+
+class _Recorder:
+    def __init__(self):
+        self.events = []
+
+    def warning(self, event, **kw):
+        self.events.append(kw)
+
+
+def _lag_count():
+    return REGISTRY.get_sample_value("event_loop_lag_seconds_count") or 0
+
+
+def busy_handler(seconds):
+    time.sleep(seconds)  # the synchronous call that stalls the loop
+
+
+def test_lag_is_recorded_and_blocking_stack_logged(monkeypatch):
+    rec = _Recorder()
+    monkeypatch.setattr(loop_monitor, "log", rec)
+    before = _lag_count()
+
+    async def request():
+        import structlog
+
+        structlog.contextvars.bind_contextvars(request_id="req-42")
+        await asyncio.sleep(0.03)
+        busy_handler(0.15)
+
+    async def run():
+        monitor = LoopMonitor(interval_s=0.01, block_threshold_s=0.05)
+        monitor.start()
+        await asyncio.create_task(request())
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(run())
+    assert monitor.blocked == 1 and len(rec.events) == 1  # once per stall
+    event = rec.events[0]
+    if sys.version_info >= (3, 12):  # Task.get_context
+        assert event["request_id"] == "req-42"
+    assert "busy_handler" in event["stack"]
+    assert event["blocked_ms"] >= 50
+    assert _lag_count() - before >= 5
+    assert REGISTRY.get_sample_value("event_loop_lag_seconds_bucket", {"le": "0.1"}) < (
+        REGISTRY.get_sample_value("event_loop_lag_seconds_bucket", {"le": "0.25"})
+    )
+
+
+def test_no_report_when_the_loop_keeps_up(monkeypatch):
+    rec = _Recorder()
+    monkeypatch.setattr(loop_monitor, "log", rec)
+
+    async def run():
+        monitor = LoopMonitor(interval_s=0.01, block_threshold_s=0.05)
+        monitor.start()
+        for _ in range(20):
+            await asyncio.sleep(0.005)
+        await monitor.stop()
+
+    asyncio.run(run())
+    assert rec.events == []
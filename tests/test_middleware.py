@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+
+from ai_rag_agent.app.factory import create_app
+from ai_rag_agent.observability import access_log
+
+
+class _Recorder:
+    def __init__(self):
+        self.events = []
+
+    def info(self, event, **kw):
+        self.events.append((event, kw))
+
+
+def test_request_id_generated_and_echoed(monkeypatch):
+    monkeypatch.setattr(access_log, "logger", _Recorder())
+    client = TestClient(create_app())
+
+    r = client.get("/health")
+    assert r.status_code == 200
+    assert r.headers["x-request-id"]
+
+    r2 = client.get("/health", headers={"x-request-id": "abc-123"})
+    assert r2.headers["x-request-id"] == "abc-123"
+
+
+def test_access_log_covers_streamed_body(monkeypatch):
+    rec = _Recorder()
+    monkeypatch.setattr(access_log, "logger", rec)
+    client = TestClient(create_app())
+
+    with client.stream("POST", "/v1/answer?stream=true", json={"query": "test"}) as r:
+        body = b"".join(r.iter_bytes())
+
+    event, fields = rec.events[-1]
+    assert event == "http_access"
+    assert fields["path"] == "/v1/answer"
+    assert fields["status_code"] == 200
+    assert fields["bytes_sent"] == len(body)
+    assert fields["request_id"] == r.headers["x-request-id"]
+    # The stub sleeps between tokens, so the full stream takes longer than the first byte
+    assert fields["duration_ms"] > fields["ttfb_ms"]
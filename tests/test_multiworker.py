@@ -0,0 +1,118 @@
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from aiobreaker import CircuitBreakerError, CircuitBreakerState
+
+from ai_rag_agent.app.serve import available_cpus
+from ai_rag_agent.app.settings import TargetPolicy
+from ai_rag_agent.resilience.limiter import AdaptiveLimiter
+from ai_rag_agent.resilience.policies import PolicyRegistry
+from ai_rag_agent.resilience.shared_state import SharedLimit, SharedState
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+async def _fail():
+    raise RuntimeError("down")
+
+
+def test_breaker_opened_by_one_worker_is_open_in_the_others(tmp_path):
+    # Two registries over the same file stand in for two worker processes
+    policy = TargetPolicy(breaker_fail_max=2, breaker_reset_s=30.0)
+    a = PolicyRegistry(policy, shared=SharedState(tmp_path / "state"))
+    b = PolicyRegistry(policy, shared=SharedState(tmp_path / "state"))
+    b.get("upstream")  # already built before the trip: must still see it
+
+    async def trip():
+        for _ in range(2):
+            with pytest.raises((RuntimeError, CircuitBreakerError)):
+                await a.get("upstream").run(_fail)
+
+    asyncio.run(trip())
+    assert b.get("upstream").breaker.current_state == CircuitBreakerState.OPEN
+    assert b.get("upstream").breaker.opens_at is not None
+    with pytest.raises(CircuitBreakerError):
+        asyncio.run(b.get("upstream").run(_fail))
+    assert b.get("other").breaker.current_state == CircuitBreakerState.CLOSED
+
+
+def test_adaptive_limit_is_shared(tmp_path):
+    def limiter():
+        shared = SharedLimit(SharedState(tmp_path / "state"), "upstream")
+        return AdaptiveLimiter(target="shared-test", initial_limit=20, shared=shared)
+
+    a, b = limiter(), limiter()
+    for _ in range(5):
+        a._inflight += 1
+        a.release(1.0, dropped=True)  # a's timeouts back the limit off...
+    b._inflight += 1
+    b.release(0.01, utilised=False)  # ...and b adopts it on its next sample
+    assert a.limit == b.limit == int(20 * 0.9**5)
+    assert limiter().limit == a.limit  # a late worker starts from the learned limit
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_worker_count_respects_the_cgroup_cpu_quota(tmp_path):
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("150000 100000\n")  # a 1.5 CPU limit
+    assert available_cpus(str(cpu_max)) == min(2, len(os.sched_getaffinity(0)))
+    cpu_max.write_text("max 100000\n")
+    assert available_cpus(str(cpu_max)) == len(os.sched_getaffinity(0))
+    assert available_cpus(str(tmp_path / "missing")) == len(os.sched_getaffinity(0))
+
+
+def test_rag_serve_aggregates_metrics_across_workers(tmp_path):
+    port = _free_port()
+    env = {**os.environ, "PYTHONPATH": str(SRC), "APP_ACCESS_LOG_SAMPLE_RATE": "0"}
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "ai_rag_agent.app.serve", "--workers", "2", "--host", "127.0.0.1"]
+        + ["--port", str(port), "--run-dir", str(tmp_path), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{base}/health")
+                break
+            except httpx.TransportError:
+                assert time.monotonic() < deadline, "rag-serve did not start"
+                time.sleep(0.2)
+        # Wait for both workers: each writes its own metric files on import
+        while len(list((tmp_path / "metrics").glob("counter_*.db"))) < 2:
+            assert time.monotonic() < deadline
+            time.sleep(0.2)
+
+        with httpx.Client(base_url=base) as client:  # new connections land on both workers
+            for _ in range(20):
+                httpx.get(f"{base}/health")
+            text = client.get("/metrics").text
+        line = next(
+            ln
+            for ln in text.splitlines()
+            if ln.startswith("http_requests_total{") and "/health" in ln
+        )
+        assert float(line.rsplit(" ", 1)[1]) == 21
+
+        assert httpx.get(f"{base}/v1/demo-breaker", params={"mode": "ok"}).status_code == 200
+        assert (tmp_path / "resilience.state").exists()
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=30) == 0
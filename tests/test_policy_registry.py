@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+from pydantic import ValidationError
+
+from ai_rag_agent.app.settings import TargetPolicy
+from ai_rag_agent.resilience.policies import (
+    CircuitBreakerError,
+    PolicyRegistry,
+    TimeoutError,
+)
+
+
+def _breaker_gauge(target):
+    return REGISTRY.get_sample_value("circuit_breaker_open", {"target": target})
+
+
+async def _fail():
+    raise RuntimeError("down")
+
+
+async def _ok():
+    return "ok"
+
+
+def test_overrides_merge_with_defaults_and_reject_typos():
+    registry = PolicyRegistry(
+        TargetPolicy(timeout_s=2.0), {"tenant-a": {"timeout_s": 0.1, "concurrency": 3}}
+    )
+    a, b = registry.get("tenant-a"), registry.get("tenant-b")
+    assert (a.policy.timeout_s, a.policy.concurrency, a.policy.max_queue) == (0.1, 3, 50)
+    assert b.policy.timeout_s == 2.0
+    assert registry.get("tenant-a") is a and len(registry) == 2
+
+    with pytest.raises(ValidationError):
+        PolicyRegistry(TargetPolicy(), {"x": {"timout_s": 1}}).get("x")
+
+
+def test_breakers_are_per_target_and_push_the_gauge():
+    registry = PolicyRegistry(TargetPolicy(breaker_fail_max=2, retry_attempts=1))
+    noisy, quiet = registry.get("reg-noisy"), registry.get("reg-quiet")
+
+    async def main():
+        for _ in range(2):
+            with pytest.raises((RuntimeError, CircuitBreakerError)):
+                await noisy.run(_fail)
+        with pytest.raises(CircuitBreakerError):
+            await noisy.run(_ok)
+        return await quiet.run(_ok)
+
+    assert asyncio.run(main()) == "ok"
+    assert _breaker_gauge("reg-noisy") == 1.0
+    assert _breaker_gauge("reg-quiet") == 0.0
+
+
+def test_target_timeout_and_retries():
+    registry = PolicyRegistry(TargetPolicy(timeout_s=0.02, retry_attempts=3))
+    target = registry.get("reg-slow")
+    attempts = 0
+
+    async def slow_then_ok():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            await asyncio.sleep(1)
+        return attempts
+
+    async def main():
+        with pytest.raises(TimeoutError):
+            await target.run(lambda: asyncio.sleep(1))
+        return await target.call(slow_then_ok)
+
+    assert asyncio.run(main()) == 3
+
+
+def test_fixed_bulkhead_keeps_its_limit():
+    target = PolicyRegistry(TargetPolicy(adaptive=False, concurrency=2)).get("reg-fixed")
+
+    async def main():
+        await asyncio.gather(*[target.run(lambda: asyncio.sleep(0.001)) for _ in range(20)])
+
+    asyncio.run(main())
+    assert target.limiter.limit == 2
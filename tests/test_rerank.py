@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+from prometheus_client import REGISTRY
+
+from ai_rag_agent.retrieval.rerank import OverlapScorer, Reranker, ScoreCache, query_key
+from ai_rag_agent.retrieval.service import Hit
+
+
+def _hits(texts):
+    return [Hit(chunk_id=f"c{i}", doc_id=f"d{i}", text=t, score=0.0) for i, t in enumerate(texts)]
+
+
+class CountingScorer(OverlapScorer):
+    def __init__(self):
+        self.batches = []
+        self.threads = set()
+
+    def score(self, query, texts):
+        self.batches.append(len(texts))
+        self.threads.add(threading.current_thread().name)
+        return super().score(query, texts)
+
+
+def test_overlap_scorer_prefers_full_phrase():
+    scores = OverlapScorer().score(
+        "circuit breaker opens", ["breaker opens circuit", "the circuit breaker opens", "retry"]
+    )
+    assert scores[1] == 1.0 and 0 < scores[0] < 1.0 and scores[2] == 0.0
+
+
+def test_rerank_reorders_and_caches_scores_off_the_loop():
+    scorer = CountingScorer()
+    reranker = Reranker(scorer, batch_size=2, margin=1.0)  # margin too wide to exit early
+    hits = _hits(["jitter", "backoff", "exponential backoff with jitter"])
+
+    first = asyncio.run(reranker.rerank("exponential backoff", hits, 2))
+    again = asyncio.run(reranker.rerank("Exponential  backoff", hits, 2))
+    assert [h.chunk_id for h in first] == ["c2", "c1"]
+    assert first == again
+    assert scorer.batches == [2, 1]  # second call served from the cache
+    assert all(name.startswith("rerank") for name in scorer.threads)
+
+
+def test_early_exit_once_top_k_is_stable():
+    scorer = CountingScorer()
+    reranker = Reranker(scorer, batch_size=2, margin=0.1)
+    hits = _hits(["bulkhead caps calls", "bulkhead caps", "retry", "jitter", "backoff", "x"])
+    top = asyncio.run(reranker.rerank("bulkhead caps calls", hits, 2))
+    assert [h.chunk_id for h in top] == ["c0", "c1"]
+    assert scorer.batches == [2, 2]  # the third batch was never scored
+
+
+def test_score_cache_evicts_least_recently_used():
+    cache = ScoreCache(max_entries=2)
+    q = query_key("q")
+    cache.put(q, "a", 1.0)
+    cache.put(q, "b", 2.0)
+    assert cache.get(q, "a") == 1.0
+    cache.put(q, "c", 3.0)
+    assert cache.get(q, "b") is None
+    assert len(cache) == 2 and cache.get(q, "a") == 1.0
+
+
+def test_answer_is_reranked_and_stages_are_timed(indexed_app):
+    def count(stage):
+        return REGISTRY.get_sample_value("rag_stage_seconds_count", {"stage": stage}) or 0.0
+
+    before = {s: count(s) for s in ("retrieve", "rerank", "generate")}
+    r = indexed_app.post(
+        "/v1/answer",
+        params={"stream": "false"},
+        json={"query": "circuit breaker failures", "top_k": 1, "mode": "vector"},
+    )
+    assert r.status_code == 200
+    assert r.json()["citations"] == ["breaker.md#0"]
+    assert all(count(s) == before[s] + 1 for s in before)
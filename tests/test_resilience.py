@@ -20,6 +20,12 @@ def test_retry_eventual_success():
     assert r.status_code == 200
 
 
+def test_retry_follows_the_target_policy(fresh_policies):
+    fresh_policies.overrides["flaky-retry"] = {"retry_attempts": 1}
+    r = client.get("/v1/demo-retry?mode=fail_then_ok&fail_times=1&key=no-retry")
+    assert r.status_code == 502
+
+
 def test_breaker_opens_and_half_opens():
     # two failures -> open
     client.get("/v1/demo-breaker?mode=fail")
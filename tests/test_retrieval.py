@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+from conftest import CHUNKS
+
+from ai_rag_agent.retrieval.chunks import Chunk
+from ai_rag_agent.retrieval.embedder import HashingEmbedder
+from ai_rag_agent.retrieval.index import FlatIndex, SearchParams, topk
+from ai_rag_agent.retrieval.ivf import IVFIndex
+from ai_rag_agent.retrieval.quantize import BinaryIndex, Int8Index, binary_encode, hamming
+from ai_rag_agent.retrieval.service import Retriever
+
+
+def _unit(rng, n, d):
+    v = rng.standard_normal((n, d)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def test_topk_matches_full_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.standard_normal((5, 100)).astype(np.float32)
+    top, idx = topk(scores, 7)
+    expected = np.argsort(-scores, axis=1)[:, :7]
+    assert np.array_equal(idx, expected)
+    assert np.allclose(top, np.take_along_axis(scores, expected, axis=1))
+
+
+def test_flat_search_pads_when_k_exceeds_n():
+    index = FlatIndex(_unit(np.random.default_rng(1), 3, 8))
+    scores, ids = index.search(index.vectors[:1], k=5)
+    assert ids[0, 0] == 0
+    assert list(ids[0, 3:]) == [-1, -1]
+    assert np.isneginf(scores[0, 3:]).all()
+
+
+def test_flat_search_blocks_are_merged(monkeypatch):
+    from ai_rag_agent.retrieval import index as index_mod
+
+    monkeypatch.setattr(index_mod, "SCORE_BLOCK_ROWS", 16)
+    vectors = _unit(np.random.default_rng(2), 100, 16)
+    queries = vectors[[3, 50, 99]]
+    _, ids = FlatIndex(vectors).search(queries, k=4)
+    expected = np.argsort(-(queries @ vectors.T), axis=1)[:, :4]
+    assert np.array_equal(ids, expected)
+
+
+def test_save_and_load_is_memory_mapped(tmp_path):
+    Retriever.build(CHUNKS, HashingEmbedder(dim=64)).save(tmp_path)
+    loaded = Retriever.load(tmp_path)
+    assert isinstance(loaded.index.vectors, np.memmap)
+    hits = loaded.search("how does the circuit breaker open", k=2)
+    assert hits[0].chunk_id == "breaker.md#0"
+    assert loaded.chunks[1] == CHUNKS[1]
+
+
+def test_answer_cites_retrieved_chunks(indexed_app):
+    r = indexed_app.post(
+        "/v1/answer", params={"stream": "false"}, json={"query": "exponential backoff", "top_k": 2}
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert body["citations"][0] == "retry.md#0"
+    assert len(body["citations"]) == 2
+    assert "backoff" in body["answer"]
+
+
+def test_ivf_full_probe_is_exact_and_partial_probe_recalls_well():
+    rng = np.random.default_rng(3)
+    vectors = _unit(rng, 2000, 32)
+    queries = vectors[:20]
+    index = IVFIndex.build(vectors, nlist=16)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :10]
+
+    _, exact = index.search(queries, 10, SearchParams(nprobe=16))
+    assert np.array_equal(exact, truth)
+
+    _, approx = index.search(queries, 10, SearchParams(nprobe=4))
+    recall = np.mean([len(set(a) & set(t)) / 10 for a, t in zip(approx, truth, strict=True)])
+    assert recall > 0.5
+    assert (approx[:, 0] == np.arange(20)).all()  # a query's own vector is always found
+
+
+def test_ivf_incremental_add_without_rebuild(tmp_path):
+    retriever = Retriever.build(CHUNKS * 4, HashingEmbedder(dim=64), kind="ivf", nlist=2)
+    centroids = retriever.index.centroids.copy()
+    new = Chunk(id="hedge.md#0", doc_id="hedge.md", text="Hedged requests trim tail latency")
+    retriever.add([new])
+
+    assert np.array_equal(retriever.index.centroids, centroids)
+    assert retriever.index.ntotal == len(CHUNKS) * 4 + 1
+    hit = retriever.search("hedged requests", k=1, params=SearchParams(nprobe=2))[0]
+    assert hit.chunk_id == "hedge.md#0"
+
+    retriever.save(tmp_path)
+    loaded = Retriever.load(tmp_path)
+    assert loaded.index.kind == "ivf"
+    assert loaded.search("hedged requests", k=1)[0].chunk_id == "hedge.md#0"
+
+
+def test_answer_accepts_nprobe(indexed_app):
+    r = indexed_app.post(
+        "/v1/answer", params={"stream": "false"}, json={"query": "bulkhead", "nprobe": 2}
+    )
+    assert r.status_code == 200
+    assert r.json()["citations"][0] == "bulkhead.md#0"
+
+
+def test_binary_hamming_matches_bit_count():
+    rng = np.random.default_rng(4)
+    x = rng.standard_normal((50, 100)).astype(np.float32)
+    codes = binary_encode(x)
+    assert codes.dtype == np.uint64 and codes.shape == (50, 2)
+    expected = ((x > 0) != (x[7] > 0)).sum(axis=1)
+    assert np.array_equal(hamming(codes, codes[7]), expected)
+
+
+@pytest.mark.parametrize("cls", [Int8Index, BinaryIndex])
+def test_quantized_index_rescoring_recall(cls, tmp_path):
+    rng = np.random.default_rng(5)
+    # Clustered data: like real embeddings, neighbours are much closer than random pairs
+    vectors = _unit(rng, 60, 64)[rng.integers(0, 60, 3000)] + 0.3 * _unit(rng, 3000, 64)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[:25]
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :10]
+
+    cls.build(vectors).save(tmp_path)
+    index = cls.load(tmp_path)
+    assert not index.vectors.flags.owndata and not index.vectors.flags.writeable  # mapped
+    scores, ids = index.search(queries, 10, SearchParams(rescore=20))
+    recall = np.mean([len(set(a) & set(t)) / 10 for a, t in zip(ids, truth, strict=True)])
+    assert recall > 0.9
+    # Returned scores are exact (rescored) inner products, not code approximations
+    assert np.allclose(scores[:, 0], np.einsum("ij,ij->i", queries, vectors[ids[:, 0]]))
+
+
+def test_quantized_retriever_roundtrip(tmp_path):
+    Retriever.build(CHUNKS, HashingEmbedder(dim=64), kind="binary").save(tmp_path)
+    loaded = Retriever.load(tmp_path)
+    assert loaded.index.kind == "binary"
+    assert loaded.search("circuit breaker", k=1)[0].chunk_id == "breaker.md#0"
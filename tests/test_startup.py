@@ -0,0 +1,92 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from conftest import _reset_singletons
+from fastapi.testclient import TestClient
+
+from ai_rag_agent.app.factory import create_app
+from ai_rag_agent.retrieval.service import Retriever, load_retriever
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+# Generous for a loaded CI box; the app currently imports in ~0.6s, first request ~10ms
+IMPORT_BUDGET_S = float(os.getenv("IMPORT_BUDGET_S", "2.0"))
+FIRST_REQUEST_BUDGET_S = float(os.getenv("FIRST_REQUEST_BUDGET_S", "0.5"))
+
+FIRST_REQUEST = """
+import time
+from ai_rag_agent.main import app
+from fastapi.testclient import TestClient
+t0 = time.perf_counter()
+assert TestClient(app).get("/health").status_code == 200
+print(time.perf_counter() - t0)
+"""
+
+
+def test_ready_reports_warmup(indexed_app):
+    with indexed_app as client:
+        assert client.get("/health").status_code == 200  # liveness doesn't wait
+        deadline = time.monotonic() + 10
+        while (r := client.get("/ready")).status_code == 503:
+            assert r.json()["status"] == "starting" and time.monotonic() < deadline
+            time.sleep(0.01)
+        body = r.json()
+    assert r.status_code == 200 and body["status"] == "ready"
+    assert set(body["steps"]) == {"retriever", "reranker", "context", "answer_cache"}
+
+
+def test_ready_is_503_without_lifespan():
+    assert TestClient(create_app()).get("/ready").status_code == 503
+
+
+def test_cold_retriever_loads_once_off_the_loop(indexed_app, monkeypatch):
+    loads = []
+    load = Retriever.load
+
+    def spy(path, mmap=True):
+        try:
+            asyncio.get_running_loop()
+            loads.append("loop")
+        except RuntimeError:
+            loads.append("thread")
+        time.sleep(0.05)  # both callers arrive while the index is still loading
+        return load(path, mmap=mmap)
+
+    monkeypatch.setattr(Retriever, "load", staticmethod(spy))
+
+    async def main():
+        return await asyncio.gather(load_retriever(), load_retriever())
+
+    first, second = asyncio.run(main())
+    assert first is second is not None and loads == ["thread"]
+    # Before warm-up, an answer opens the index from a worker thread too
+    loads.clear()
+    _reset_singletons()
+    r = indexed_app.post("/v1/answer", params={"stream": "false"}, json={"query": "backoff"})
+    assert r.status_code == 200 and loads == ["thread"]
+
+
+def test_import_and_first_request_budget():
+    env = {**os.environ, "PYTHONPATH": str(SRC), "APP_LOG_QUEUE_ENABLED": "false"}
+    env.pop("APP_ENABLE_TRACING", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", FIRST_REQUEST],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative_us, name = line.split("|")
+            if cumulative_us.strip().isdigit():
+                imported[name.strip()] = int(cumulative_us) / 1e6
+
+    # Tracing is off: none of the OpenTelemetry SDK/exporters may be loaded
+    assert not [m for m in imported if m.startswith("opentelemetry")]
+    assert imported["ai_rag_agent.main"] < IMPORT_BUDGET_S
+    assert float(proc.stdout.strip().splitlines()[-1]) < FIRST_REQUEST_BUDGET_S
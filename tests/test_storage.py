@@ -0,0 +1,131 @@
+import asyncio
+import os
+
+import numpy as np
+import pytest
+from conftest import CHUNKS
+from prometheus_client import REGISTRY
+
+from ai_rag_agent.app.settings import settings
+from ai_rag_agent.ingest.pipeline import ingest
+from ai_rag_agent.retrieval.chunks import Chunk
+from ai_rag_agent.retrieval.embedder import HashingEmbedder
+from ai_rag_agent.storage.postgres import PostgresDocumentStore
+from ai_rag_agent.storage.store import SqliteDocumentStore, get_document_store
+
+EMBEDDER = HashingEmbedder(dim=16)
+
+
+def _vectors(chunks):
+    return EMBEDDER.embed([c.text for c in chunks])
+
+
+async def _roundtrip(store):
+    meta = [{"source": c.doc_id} for c in CHUNKS]
+    await store.put_chunks(CHUNKS, _vectors(CHUNKS), meta)
+    ids = [c.id for c in CHUNKS]
+    found = await store.get_chunks([*ids, "missing#0"])
+    assert set(found) == set(ids)
+    assert found["retry.md#0"].text == CHUNKS[1].text
+    assert found["retry.md#0"].metadata == {"source": "retry.md"}
+    vectors = await store.get_vectors(ids)
+    np.testing.assert_array_equal(vectors["breaker.md#0"], _vectors(CHUNKS[:1])[0])
+
+    edited = Chunk(id="retry.md#0", doc_id="retry.md", text="Retries are capped")
+    await store.put_chunks([edited], _vectors([edited]))  # upsert by id
+    assert (await store.get_chunks(["retry.md#0"]))["retry.md#0"].text == "Retries are capped"
+    assert await store.retain({"retry.md#0"}) == 2
+    assert await store.count() == 1
+    await store.aclose()
+
+
+def test_sqlite_store_roundtrip(tmp_path):
+    asyncio.run(_roundtrip(SqliteDocumentStore(tmp_path / "store.db")))
+
+
+@pytest.mark.skipif(not os.environ.get("APP_TEST_POSTGRES_DSN"), reason="set APP_TEST_POSTGRES_DSN")
+def test_postgres_store_roundtrip():
+    pytest.importorskip("asyncpg")
+    store = PostgresDocumentStore(os.environ["APP_TEST_POSTGRES_DSN"], max_size=2)
+
+    async def run():
+        await store.retain(set())
+        await _roundtrip(store)
+
+    asyncio.run(run())
+
+
+def test_postgres_store_needs_asyncpg():
+    try:
+        import asyncpg  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        pytest.skip("asyncpg is installed")
+    with pytest.raises(RuntimeError, match="pip install asyncpg"):
+        asyncio.run(PostgresDocumentStore("postgresql://localhost/rag").count())
+
+
+def test_lookup_is_one_query_and_pool_waits_are_measured(tmp_path):
+    store = SqliteDocumentStore(tmp_path / "store.db", pool_size=1)
+    statements = []
+
+    def sample(name):
+        return REGISTRY.get_sample_value(name, {"backend": "sqlite"}) or 0.0
+
+    async def run():
+        await store.put_chunks(CHUNKS, _vectors(CHUNKS))
+        store._conns[0].set_trace_callback(statements.append)
+        waits = sample("store_pool_wait_seconds_count")
+        ids = [c.id for c in CHUNKS]
+        await asyncio.gather(store.get_chunks(ids), store.get_chunks(ids))
+        assert sample("store_pool_wait_seconds_count") - waits == 2
+        await store.aclose()
+
+    asyncio.run(run())
+    assert [s for s in statements if s.startswith("SELECT")] == [statements[0]] * 2
+    assert sample("store_pool_connections_in_use") == 0
+    assert sample("store_pool_connections_max") == 1
+
+
+def test_answers_resolve_text_from_the_store(indexed_app, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "store_backend", "sqlite")
+    monkeypatch.setattr(settings, "store_sqlite_path", str(tmp_path / "store.db"))
+    get_document_store.cache_clear()
+    store = get_document_store()
+    # The store is the system of record: edited text wins, an absent chunk is dropped
+    edited = Chunk(id="breaker.md#0", doc_id="breaker.md", text="Breakers open on failures")
+    asyncio.run(store.put_chunks([edited, CHUNKS[2]], _vectors([edited, CHUNKS[2]])))
+
+    r = indexed_app.post(
+        "/v1/answer", params={"stream": "false"}, json={"query": "circuit breaker failures"}
+    )
+    assert r.status_code == 200
+    assert r.json()["answer"] == "Breakers open on failures"
+    assert "retry.md#0" not in r.json()["citations"]
+
+    r = indexed_app.post("/v1/answer:batch", json={"queries": [{"query": "circuit breaker"}]})
+    assert "Breakers open on failures" in r.text
+
+
+def test_ingest_writes_store_and_prunes_removed_documents(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "breaker.md").write_text("The circuit breaker opens after failures.")
+    (docs / "retry.md").write_text("Retries use exponential backoff.")
+    path = tmp_path / "store.db"
+
+    stats = ingest(docs, tmp_path / "index", workers=0, dim=16, store=SqliteDocumentStore(path))
+    assert stats.stored == stats.chunks == 2 and stats.pruned == 0
+
+    (docs / "retry.md").unlink()
+    stats = ingest(docs, tmp_path / "index", workers=0, dim=16, store=SqliteDocumentStore(path))
+    assert stats.stored == 1 and stats.pruned == 1
+
+    async def stored():
+        store = SqliteDocumentStore(path)
+        found = await store.get_chunks(["breaker.md#0", "retry.md#0"])
+        await store.aclose()
+        return found
+
+    assert list(asyncio.run(stored())) == ["breaker.md#0"]
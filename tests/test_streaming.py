@@ -0,0 +1,117 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from ai_rag_agent.app.factory import create_app
+from ai_rag_agent.app.streaming import TokenStreamResponse, sse_event
+
+
+class Source:
+    """Token generator that records how far it got and whether it was closed."""
+
+    def __init__(self, n=None, delay_s=0.0, fail_at=None):
+        self.n, self.delay_s, self.fail_at = n, delay_s, fail_at
+        self.produced = 0
+        self.closed = False
+
+    async def tokens(self):
+        try:
+            while self.n is None or self.produced < self.n:
+                if self.produced == self.fail_at:
+                    raise RuntimeError("model crashed")
+                self.produced += 1
+                yield f"t{self.produced} "
+                await asyncio.sleep(self.delay_s)
+        finally:
+            self.closed = True
+
+
+async def _serve(response, *, disconnect_after=None, send_delay_s=0.0):
+    bodies = []
+
+    async def receive():
+        if disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("more_body"):
+            bodies.append(message["body"])
+            await asyncio.sleep(send_delay_s)
+
+    await response({"type": "http"}, receive, send)
+    return bodies
+
+
+def _streams(outcome):
+    return REGISTRY.get_sample_value("stream_total", {"route": "test", "outcome": outcome}) or 0
+
+
+def test_fast_tokens_are_coalesced_into_bounded_frames():
+    src = Source(n=2000)
+    resp = TokenStreamResponse(src.tokens(), max_frame_bytes=256, route="test")
+    frames = asyncio.run(_serve(resp))
+    assert b"".join(frames) == "".join(f"t{i} " for i in range(1, 2001)).encode()
+    assert len(frames) < 2000 / 10
+    assert all(len(f) < 256 + 8 for f in frames)
+
+
+def test_slow_tokens_are_flushed_after_the_interval():
+    src = Source(n=5, delay_s=0.03)
+    resp = TokenStreamResponse(src.tokens(), flush_interval_s=0.005, route="test")
+    assert len(asyncio.run(_serve(resp))) == 5
+
+
+def test_time_to_first_token_is_not_delayed_by_coalescing():
+    def ttft():
+        return (
+            REGISTRY.get_sample_value("stream_time_to_first_token_seconds_sum", {"route": "ttft"})
+            or 0
+        )
+
+    before = ttft()
+    src = Source(n=2, delay_s=0.3)
+    # The first frame waits out the flush interval; the first token did not
+    resp = TokenStreamResponse(src.tokens(), flush_interval_s=0.2, route="ttft")
+    asyncio.run(_serve(resp))
+    assert ttft() - before < 0.1
+
+
+def test_disconnect_cancels_generation():
+    before = _streams("disconnected")
+    src = Source(delay_s=0.001)
+    resp = TokenStreamResponse(src.tokens(), route="test")
+    asyncio.run(_serve(resp, disconnect_after=0.05))
+    produced = src.produced
+    assert src.closed and 0 < produced < 1000
+    assert _streams("disconnected") == before + 1
+
+
+def test_slow_reader_applies_backpressure():
+    src = Source(n=100_000)
+    resp = TokenStreamResponse(
+        src.tokens(), max_frame_bytes=64, max_buffered_tokens=32, route="test"
+    )
+    asyncio.run(_serve(resp, disconnect_after=0.1, send_delay_s=0.01))
+    # ~10 frames were read; the producer only ran ahead by the queue bound
+    assert src.produced < 10 * 16 + 32 + 16
+
+
+def test_sse_frames_and_error_event():
+    assert sse_event(b"a\nb", "done") == b"event: done\ndata: a\ndata: b\n\n"
+    src = Source(n=10, fail_at=3)
+    frames = asyncio.run(_serve(TokenStreamResponse(src.tokens(), sse=True, route="test")))
+    assert frames[0].startswith(b"data: t1 t2 t3")
+    assert frames[-1] == b"event: error\ndata: {}\n\n"
+
+
+def test_answer_endpoint_streams_sse():
+    client = TestClient(create_app())
+    with client.stream("POST", "/v1/answer", params={"format": "sse"}, json={"query": "test"}) as r:
+        assert r.headers["content-type"].startswith("text/event-stream")
+        body = b"".join(r.iter_bytes())
+    assert body.startswith(b"data: ")
+    assert b"data: placeholder \n\ndata: answer. \n\n" in body  # one token per 20ms: a frame each
+    assert body.endswith(b"event: done\ndata: {}\n\n")